@@ -0,0 +1,59 @@
+"""Benchmark of event loop latency during DLQuery.find and DLQuery.afind.
+
+Usage: python benchmarks/bench_async.py [records]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_async.py
+
+A heartbeat coroutine ticks every millisecond while a query runs; the
+worst gap between ticks is how long the event loop was blocked.
+"""
+
+import sys
+import time
+import asyncio
+
+from dlapp import DLQuery
+from bench_find import make_data
+
+
+async def heartbeat(gaps, stop):
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+
+
+async def measure(name, query_obj, coroutine_func):
+    gaps, stop = [], asyncio.Event()
+    task = asyncio.ensure_future(heartbeat(gaps, stop))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    result = await coroutine_func(query_obj)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await task
+    fmt = '{:>8.3f}s  max loop gap {:>8.3f}s  {} ({} results)'
+    print(fmt.format(elapsed, max(gaps), name, len(result)))
+
+
+async def blocking_find(query_obj):
+    return query_obj.find(lookup='hostname')
+
+
+async def async_find(query_obj):
+    return await query_obj.afind(lookup='hostname')
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    query_obj = DLQuery(make_data(total))
+    print('records : {}'.format(total))
+    asyncio.run(measure('find', query_obj, blocking_find))
+    asyncio.run(measure('afind', query_obj, async_find))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark of JSON and YAML parser backends.
+
+Usage: python benchmarks/bench_backends.py [records] [repeat]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_backends.py
+
+Each installed backend, and auto-selection, loads the same sample file with
+create_from_json_file or create_from_yaml_file.  YAML gets a tenth of the
+records because the pure-Python loader is slow.
+"""
+
+import os
+import sys
+import json
+import timeit
+import tempfile
+
+import yaml
+
+from bench_find import make_data
+from dlapp import create_from_json_file
+from dlapp import create_from_yaml_file
+from dlapp.factory import get_backend_names
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    with tempfile.TemporaryDirectory() as dirname:
+        json_file = os.path.join(dirname, 'sample.json')
+        with open(json_file, 'w') as stream:
+            json.dump(make_data(total), stream)
+        yaml_file = os.path.join(dirname, 'sample.yaml')
+        with open(yaml_file, 'w') as stream:
+            yaml.safe_dump(make_data(total // 10), stream)
+
+        for filetype, filename, func in [('json', json_file, create_from_json_file),
+                                         ('yaml', yaml_file, create_from_yaml_file)]:
+            size = os.path.getsize(filename) / 2 ** 20
+            print('{} : {:.1f} MiB, backends : {}'.format(
+                filetype, size, ', '.join(get_backend_names(filetype))))
+            # auto also checks a JSON document for integers beyond 64 bits
+            for backend in ['auto'] + get_backend_names(filetype):
+                elapsed = min(timeit.repeat(
+                    lambda: func(filename, backend=backend), number=1, repeat=repeat
+                ))
+                print('  {:<8} {:>7.3f}s  {:>7.1f} MiB/s'.format(
+                    backend, elapsed, size / elapsed), flush=True)
+
+
+if __name__ == '__main__':
+    main()
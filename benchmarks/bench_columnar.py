@@ -0,0 +1,91 @@
+"""Benchmark of CSV loading and search: a dict per row versus ColumnTable.
+
+Usage: python benchmarks/bench_columnar.py [rows]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_columnar.py
+
+Each mode runs in its own process.  Memory is the growth of resident
+set size after loading, because tracemalloc would slow a multi-million
+row load down several times.
+"""
+
+import os
+import sys
+import csv
+import time
+import tempfile
+import subprocess
+
+from dlapp import create_from_csv_file
+
+QUERIES = [
+    ('hostname=router-7', ''),
+    ('status=down', 'hostname, mtu'),
+    ('interface=Ethernet1', 'hostname where mtu gt 1500'),
+]
+
+MODES = {
+    'rows': dict(),
+    'columnar': dict(columnar=True),
+    'columnar+numeric': dict(columnar=True, numeric=True),
+}
+
+
+def get_rss():
+    """Get resident set size of this process in MiB."""
+    with open('/proc/self/statm') as stream:
+        return int(stream.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def write_csv(filename, total):
+    with open(filename, 'w', newline='') as stream:
+        writer = csv.writer(stream)
+        writer.writerow(['hostname', 'ip', 'interface', 'status', 'mtu'])
+        for i in range(total):
+            writer.writerow([
+                'router-{}'.format(i // 2),
+                '10.{}.{}.{}'.format(i // 65536 % 256, i // 256 % 256, i % 256),
+                'Ethernet{}'.format(i % 2),
+                'down' if i % 97 == 0 else 'up',
+                9000 if i % 5 == 0 else 1500,
+            ])
+
+
+def run_mode(filename, mode):
+    before = get_rss()
+    start = time.perf_counter()
+    query_obj = create_from_csv_file(filename, **MODES[mode])
+    load = time.perf_counter() - start
+    memory = get_rss() - before
+
+    elapsed = []
+    for lookup, select in QUERIES:
+        start = time.perf_counter()
+        total = len(query_obj.find(lookup=lookup, select=select))
+        elapsed.append((time.perf_counter() - start, total))
+    fmt = '{:<17} load {:>7.2f}s  memory {:>7.1f} MiB  find {}'
+    print(fmt.format(mode, load, memory, '  '.join(
+        '{:.2f}s ({})'.format(seconds, total) for seconds, total in elapsed
+    )), flush=True)
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--mode':
+        run_mode(sys.argv[3], sys.argv[2])
+        return
+
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000000
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'inventory.csv')
+        write_csv(filename, total)
+        size = os.path.getsize(filename) / 2 ** 20
+        print('rows : {}, file : {:.1f} MiB'.format(total, size))
+        print('queries : {}'.format(', '.join(repr(query) for query in QUERIES)))
+        for mode in MODES:
+            subprocess.run([sys.executable, __file__, '--mode', mode, filename],
+                           check=True)
+
+
+if __name__ == '__main__':
+    main()
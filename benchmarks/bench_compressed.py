@@ -0,0 +1,77 @@
+"""Benchmark of compressed input: a temporary decompressed file versus
+decompression while a parser reads a file.
+
+Usage: python benchmarks/bench_compressed.py [records]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_compressed.py
+
+Time and peak memory are measured in separate runs, because tracemalloc
+slows allocations down.  A temporary file also costs disk space of the
+decompressed size, which is not shown.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import tracemalloc
+
+from dlapp import create_from_json_file
+from dlapp import stream_find_json
+from dlapp.compressed import OPENERS
+from bench_find import make_data
+
+LOOKUP = 'hostname=router-7'
+
+
+def load_via_temp_file(filename, compression):
+    with tempfile.NamedTemporaryFile(suffix='.json') as temp:
+        with OPENERS[compression](filename, 'rb') as stream:
+            shutil.copyfileobj(stream, temp)
+        temp.flush()
+        return create_from_json_file(temp.name).find(lookup=LOOKUP)
+
+
+def load_directly(filename, compression):
+    return create_from_json_file(filename).find(lookup=LOOKUP)
+
+
+def stream_directly(filename, compression):
+    return stream_find_json(filename, lookup=LOOKUP)
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, len(result)
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as dirname:
+        data = json.dumps(make_data(total)).encode()
+        print('records : {}, json : {:.1f} MiB'.format(total, len(data) / 2 ** 20))
+        for compression, opener in OPENERS.items():
+            filename = os.path.join(dirname, 'inventory.json.' + compression)
+            with opener(filename, 'wb') as stream:
+                stream.write(data)
+            size = os.path.getsize(filename) / 2 ** 20
+            for name, func in [('temp file + load', load_via_temp_file),
+                               ('direct load', load_directly),
+                               ('stream_find_json', stream_directly)]:
+                elapsed, peak, count = measure(func, filename, compression)
+                fmt = '{:<5} {:>6.1f} MiB  {:<17} {:>7.3f}s  peak {:>7.1f} MiB  results {}'
+                print(fmt.format(compression, size, name, elapsed, peak, count), flush=True)
+
+
+if __name__ == '__main__':
+    main()
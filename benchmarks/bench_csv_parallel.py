@@ -0,0 +1,71 @@
+"""Benchmark of CSV loading: a single process versus a process pool.
+
+Usage: python benchmarks/bench_csv_parallel.py [rows] [workers]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_csv_parallel.py
+
+parallel_read_csv is called directly, so a pool is used even if the
+worker count exceeds CPU count.  A quarter of the rows have a quoted
+field with a newline, so workers also check their byte ranges.
+"""
+
+import os
+import sys
+import csv
+import time
+import tempfile
+
+from dlapp.csvfile import parallel_read_csv
+from dlapp.csvfile import read_csv_rows
+
+MODES = {
+    'rows': dict(),
+    'columnar': dict(columnar=True),
+}
+
+
+def write_csv(filename, total):
+    with open(filename, 'w', newline='') as stream:
+        writer = csv.writer(stream)
+        writer.writerow(['hostname', 'ip', 'description', 'status', 'mtu'])
+        for i in range(total):
+            writer.writerow([
+                'router-{}'.format(i // 2),
+                '10.{}.{}.{}'.format(i // 65536 % 256, i // 256 % 256, i % 256),
+                'uplink "core"\nport {}'.format(i) if i % 4 == 0 else 'port {}'.format(i),
+                'down' if i % 97 == 0 else 'up',
+                9000 if i % 5 == 0 else 1500,
+            ])
+        # a write-back of dirty pages would slow the first read down
+        stream.flush()
+        os.fsync(stream.fileno())
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'inventory.csv')
+        write_csv(filename, total)
+        size = os.path.getsize(filename) / 2 ** 20
+        print('rows : {}, file : {:.1f} MiB, cpus : {}, workers : {}'.format(
+            total, size, os.cpu_count(), workers))
+        for mode, kwargs in MODES.items():
+            start = time.perf_counter()
+            with open(filename, newline='') as stream:
+                expected_result = read_csv_rows(stream, **kwargs)
+            serial = time.perf_counter() - start
+            del expected_result
+
+            start = time.perf_counter()
+            result = parallel_read_csv(filename, workers=workers, **kwargs)
+            parallel = time.perf_counter() - start
+            assert len(result) == total
+            del result
+            fmt = '{:<9} serial {:>6.2f}s  parallel {:>6.2f}s  speedup {:.2f}x'
+            print(fmt.format(mode, serial, parallel, serial / parallel), flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark of CSV loading with a projection of fields a query needs
+against loading all fields.
+
+Usage: python benchmarks/bench_csv_projection.py [rows]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_csv_projection.py
+
+A file has twelve fields, like an inventory export.  A projection is
+derived from a query with get_query_columns, as the CLI does.  Time and
+peak memory of load + find are measured in separate runs, because
+tracemalloc slows allocations down.
+"""
+
+import os
+import sys
+import csv
+import time
+import tempfile
+import tracemalloc
+
+from dlapp import create_from_csv_file
+from dlapp.csvfile import get_query_columns
+
+FIELDS = ['hostname', 'ip', 'site', 'rack', 'vendor', 'model', 'serial',
+          'os_version', 'description', 'status', 'mtu', 'uptime']
+
+QUERIES = [
+    ('hostname=router-7', ''),
+    ('_wildcard(host*)', 'SELECT ip WHERE mtu eq 9000'),
+]
+
+
+def write_csv(filename, total):
+    with open(filename, 'w', newline='') as stream:
+        writer = csv.writer(stream)
+        writer.writerow(FIELDS)
+        for i in range(total):
+            writer.writerow([
+                'router-{}'.format(i),
+                '10.{}.{}.{}'.format(i // 65536 % 256, i // 256 % 256, i % 256),
+                'site-{}'.format(i % 40), 'rack-{}'.format(i % 400),
+                'vendor-{}'.format(i % 3), 'model-{}'.format(i % 12),
+                'SN{:010d}'.format(i * 7919), '17.{}.{}'.format(i % 9, i % 5),
+                'uplink to core port {}'.format(i), 'down' if i % 97 == 0 else 'up',
+                9000 if i % 5 == 0 else 1500, i * 13,
+            ])
+
+
+def load_and_find(filename, lookup, select, columnar, columns):
+    query_obj = create_from_csv_file(filename, columnar=columnar, columns=columns)
+    return query_obj.find(lookup=lookup, select=select)
+
+
+def measure(*args):
+    start = time.perf_counter()
+    result = load_and_find(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    load_and_find(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, len(result)
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'inventory.csv')
+        write_csv(filename, total)
+        size = os.path.getsize(filename) / 2 ** 20
+        print('rows : {}, fields : {}, file : {:.1f} MiB'.format(total, len(FIELDS), size))
+        fmt = '{:<8} {:<10} {:>7.3f}s  peak {:>7.1f} MiB  results {:<6} lookup={!r} select={!r}'
+        for lookup, select in QUERIES:
+            columns = get_query_columns(lookup, select)
+            for columnar in [False, True]:
+                mode = 'columnar' if columnar else 'rows'
+                for name, projection in [('all', None), ('projected', columns)]:
+                    elapsed, peak, count = measure(filename, lookup, select, columnar, projection)
+                    print(fmt.format(mode, name, elapsed, peak, count, lookup, select), flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Benchmark of depth-limited and breadth-first DLQuery.find.
+
+Usage: python benchmarks/bench_depth.py [records] [repeat]
+
+Only the last section has a nested name key and the nearest name key is
+the last key of the root dictionary, i.e. a depth-first search walks
+every section before its first match.
+"""
+
+import sys
+import timeit
+
+from dlapp import DLQuery
+
+QUERIES = [
+    dict(lookup='name', select='LIMIT 1'),
+    dict(lookup='name', select='LIMIT 1', order='bfs'),
+    dict(lookup='name'),
+    dict(lookup='name', max_depth=1),
+]
+
+
+def make_data(total):
+    """Create a deep configuration tree with a top-level name key."""
+    sections = [
+        {'id': i, 'block': {'rules': [{'match': {'label': 'rule-{}'.format(i)}}]}}
+        for i in range(total)
+    ]
+    sections[-1]['block']['rules'][0]['match']['name'] = 'last'
+    return dict(sections=sections, name='top')
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    query_obj = DLQuery(make_data(total))
+
+    print('records : {}'.format(total))
+    for kwargs in QUERIES:
+        timer = timeit.Timer(lambda: query_obj.find(**kwargs))
+        best = min(timer.repeat(repeat=repeat, number=1))
+        result = query_obj.find(**kwargs)
+        print('{:>8.3f}s  {} -> {}'.format(best, kwargs, result))
+
+
+if __name__ == '__main__':
+    main()
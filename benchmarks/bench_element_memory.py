@@ -0,0 +1,79 @@
+"""Measure memory cost of the Element tree with tracemalloc.
+
+Usage: python benchmarks/bench_element_memory.py [records]
+
+The script builds a list of device-like records, wraps it in
+``dlapp.collection.Element`` and ``dlapp.table.NodeTable`` and reports
+the bytes allocated per node of each representation, i.e. excluding
+the source data.
+"""
+
+import sys
+import tracemalloc
+
+from dlapp.collection import Element
+from dlapp.table import NodeTable
+
+
+def make_data(total):
+    """Create a list of device-like records."""
+    data = []
+    for i in range(total):
+        record = {
+            'hostname': 'router-{}'.format(i),
+            'ip': '10.0.{}.{}'.format(i // 256 % 256, i % 256),
+            'interfaces': [
+                {'name': 'Ethernet{}'.format(j), 'status': 'up', 'mtu': 1500}
+                for j in range(4)
+            ],
+            'tags': ['core', 'edge'],
+            'meta': {},
+        }
+        data.append(record)
+    return data
+
+
+def count_nodes(data):
+    """Count nodes of data including the root node."""
+    total = 1
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            children = list(node.values())
+        elif isinstance(node, list):
+            children = node
+        else:
+            continue
+        total += len(children)
+        stack.extend(children)
+    return total
+
+
+def measure(cls, data):
+    """Return a size in bytes allocated by building cls(data)."""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    obj = cls(data)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return after - before
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    data = make_data(total)
+    nodes = count_nodes(data)
+
+    print('records        : {}'.format(total))
+    print('nodes          : {}'.format(nodes))
+    for cls in [Element, NodeTable]:
+        size = measure(cls, data)
+        print('--- {}'.format(cls.__name__))
+        print('tree size      : {:.1f} MiB'.format(size / 1024 / 1024))
+        print('bytes per node : {:.1f}'.format(size / nodes))
+
+
+if __name__ == '__main__':
+    main()
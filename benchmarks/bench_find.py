@@ -0,0 +1,58 @@
+"""Micro-benchmark of DLQuery.find over a list of records.
+
+Usage: python benchmarks/bench_find.py [records] [repeat]
+
+Each query builds an Element tree of the whole document, walks it, and
+filters the matched records with a select statement.
+"""
+
+import sys
+import timeit
+
+from dlapp import DLQuery
+from dlapp.collection import List
+
+QUERIES = [
+    ('hostname', ''),
+    ('status=up', 'name, mtu'),
+    ('name=_wildcard(Ethernet[12])', 'name where mtu ge 1500'),
+]
+
+
+def make_data(total):
+    """Create a list of device-like records."""
+    data = []
+    for i in range(total):
+        record = {
+            'hostname': 'router-{}'.format(i),
+            'ip': '10.0.{}.{}'.format(i // 256 % 256, i % 256),
+            'interfaces': [
+                {'name': 'Ethernet{}'.format(j), 'status': 'up', 'mtu': 1500}
+                for j in range(2)
+            ],
+        }
+        data.append(record)
+    return data
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    query_obj = DLQuery(make_data(total))
+
+    lst = List(range(10))
+    timer = timeit.Timer(lambda: (lst.total, lst.is_empty, lst.append))
+    best = min(timer.repeat(repeat=repeat, number=100000))
+    print('{:>8.3f}s  100k x List.total, List.is_empty, List.append'.format(best))
+
+    print('records : {}'.format(total))
+    for lookup, select in QUERIES:
+        timer = timeit.Timer(
+            lambda: query_obj.find(lookup=lookup, select=select)
+        )
+        best = min(timer.repeat(repeat=repeat, number=1))
+        print('{:>8.3f}s  lookup={!r} select={!r}'.format(best, lookup, select))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Compare separate DLQuery.find calls with one DLQuery.find_many call.
+
+Usage: python benchmarks/bench_find_many.py [records]
+
+find_many compiles every lookup and walks the data once, so its cost
+grows with the number of matches rather than with the number of
+traversals.
+"""
+
+import sys
+import time
+
+from dlapp import DLQuery
+
+from bench_find import make_data
+
+LOOKUPS = [
+    ('hostname', ''),
+    ('ip=_wildcard(10.0.1.*)', ''),
+    ('status=up', 'name, mtu'),
+    ('name=_wildcard(Ethernet[12])', 'name where mtu ge 1500'),
+    ('mtu=gt(1000)', ''),
+    ('name=_regex(.*1)', 'status'),
+]
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    query_obj = DLQuery(make_data(total))
+
+    print('records : {}'.format(total))
+    print('{:>8}  {:>10}  {:>10}  {:>7}'.format('queries', 'find', 'find_many', 'speedup'))
+    for count in [1, 2, 5, 10, 30]:
+        queries = [LOOKUPS[i % len(LOOKUPS)] for i in range(count)]
+
+        start = time.perf_counter()
+        expected = [query_obj.find(lookup=lookup, select=select) for lookup, select in queries]
+        separate = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = query_obj.find_many(queries)
+        single = time.perf_counter() - start
+
+        assert result == expected
+        print('{:>8}  {:>9.3f}s  {:>9.3f}s  {:>6.1f}x'.format(
+            count, separate, single, separate / single))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark of JSON Lines search: load + find, line-by-line streaming,
+and a process pool over byte ranges of a file.
+
+Usage: python benchmarks/bench_jsonl.py [records] [workers]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_jsonl.py
+
+Time and peak memory are measured in separate runs, because tracemalloc
+slows allocations down.  Peak memory of the parallel mode is measured in
+the parent process only.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+from functools import partial
+
+from dlapp import create_from_jsonl_file
+from dlapp import stream_find_jsonl
+from dlapp.stream import parallel_find_jsonl
+from bench_find import make_data
+
+QUERIES = [
+    ('hostname=router-7', ''),
+    ('name=_wildcard(Ethernet1)', 'name where mtu ge 1500'),
+]
+
+
+def find_loaded(filename, lookup, select):
+    return create_from_jsonl_file(filename).find(lookup=lookup, select=select)
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, len(result)
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'records.jsonl')
+        with open(filename, 'w') as stream:
+            for record in make_data(total):
+                stream.write(json.dumps(record) + '\n')
+        size = os.path.getsize(filename) / 2 ** 20
+        fmt = 'records : {}, file : {:.1f} MiB, cpus : {}'
+        print(fmt.format(total, size, os.cpu_count()))
+
+        funcs = [
+            ('load + find', find_loaded),
+            ('stream_find_jsonl', stream_find_jsonl),
+            ('workers={}'.format(workers), partial(parallel_find_jsonl, workers=workers)),
+        ]
+        for lookup, select in QUERIES:
+            for name, func in funcs:
+                elapsed, peak, count = measure(func, filename, lookup, select)
+                fmt = '{:>8.3f}s  peak {:>7.1f} MiB  results {:<7} {:<18} lookup={!r} select={!r}'
+                print(fmt.format(elapsed, peak, count, name, lookup, select))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Benchmark of DLQuery.find with and without key summaries.
+
+Usage: python benchmarks/bench_key_summary.py [records] [repeat]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_key_summary.py
+"""
+
+import sys
+import timeit
+
+from dlapp import DLQuery
+from bench_path import make_data
+
+LOOKUPS = ['interfaces', 'name=_wildcard(Ethernet1)', 'level', 'hostname', 'missing']
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    query_obj = DLQuery(make_data(total))
+    summary_obj = DLQuery(query_obj.data)
+
+    timer = timeit.Timer(lambda: summary_obj.build_key_summary())
+    best = min(timer.repeat(repeat=repeat, number=1))
+    print('log records : {}'.format(total))
+    print('{:>8.3f}s  build_key_summary ({} bytes)'.format(
+        best, summary_obj.key_summary.memory_usage()))
+
+    for lookup in LOOKUPS:
+        for name, obj in [('no summary', query_obj), ('key summary', summary_obj)]:
+            timer = timeit.Timer(lambda: obj.find(lookup=lookup))
+            best = min(timer.repeat(repeat=repeat, number=1))
+            print('{:>8.3f}s  {:<12} lookup={!r}'.format(best, name, lookup))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark of file loaders: buffered text streams versus memory maps.
+
+Usage: python benchmarks/bench_mmap.py [records]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_mmap.py
+
+Each file is read once before timing, so both readers work on the page
+cache.  Throughput is a file size divided by a best time of three runs.
+Peak memory is measured by tracemalloc in a separate run and does not
+count mapped pages, which belong to the page cache.
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+from functools import partial
+
+import yaml
+
+from dlapp import create_from_csv_file
+from dlapp import create_from_json_file
+from dlapp import create_from_yaml_file
+from dlapp.mapped import MappedFile
+from bench_find import make_data
+
+
+def read_stream(filename):
+    with open(filename) as stream:
+        return stream.read()
+
+
+def read_mapped(filename):
+    with MappedFile(filename) as mapped:
+        return mapped.read_text()
+
+
+def measure(func, *args):
+    elapsed = []
+    for _ in range(3):
+        start = time.perf_counter()
+        func(*args)
+        elapsed.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(elapsed), peak / 2 ** 20
+
+
+def write_files(dirname, data):
+    json_file = os.path.join(dirname, 'inventory.json')
+    with open(json_file, 'w') as stream:
+        json.dump(data, stream)
+
+    csv_file = os.path.join(dirname, 'inventory.csv')
+    with open(csv_file, 'w', newline='') as stream:
+        writer = csv.writer(stream)
+        writer.writerow(['hostname', 'ip', 'interface', 'status', 'mtu'])
+        for record in data:
+            for interface in record['interfaces']:
+                writer.writerow([record['hostname'], record['ip'], interface['name'],
+                                 interface['status'], interface['mtu']])
+
+    yaml_file = os.path.join(dirname, 'inventory.yaml')
+    with open(yaml_file, 'w') as stream:
+        yaml.safe_dump(data[:len(data) // 20], stream)
+    return json_file, csv_file, yaml_file
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as dirname:
+        json_file, csv_file, yaml_file = write_files(dirname, make_data(total))
+        cases = [
+            ('read text', json_file, read_stream, read_mapped),
+            ('json', json_file, create_from_json_file,
+             partial(create_from_json_file, use_mmap=True)),
+            ('csv', csv_file, create_from_csv_file,
+             partial(create_from_csv_file, use_mmap=True)),
+            ('yaml', yaml_file, create_from_yaml_file,
+             partial(create_from_yaml_file, use_mmap=True)),
+        ]
+        print('records : {}'.format(total))
+        fmt = '{:<10} {:>8.1f} MiB  {:<6} {:>7.3f}s {:>7.1f} MiB/s  peak {:>7.1f} MiB'
+        for name, filename, stream_func, mapped_func in cases:
+            size = os.path.getsize(filename) / 2 ** 20
+            read_stream(filename)
+            for mode, func in [('stream', stream_func), ('mmap', mapped_func)]:
+                elapsed, peak = measure(func, filename)
+                print(fmt.format(name, size, mode, elapsed, size / elapsed, peak))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Benchmark of DLQuery.find with a process pool.
+
+Usage: python benchmarks/bench_parallel.py [records] [repeat]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_parallel.py
+"""
+
+import os
+import sys
+import timeit
+
+from dlapp import DLQuery
+from bench_find import make_data
+
+QUERIES = [
+    ('hostname', ''),
+    ('name=_wildcard(Ethernet[12])', 'name where mtu ge 1500'),
+]
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    query_obj = DLQuery(make_data(total))
+    cpus = os.cpu_count() or 1
+
+    print('records : {}, cpus : {}'.format(total, cpus))
+    for lookup, select in QUERIES:
+        for workers in sorted({1, 2, 4, cpus}):
+            timer = timeit.Timer(
+                lambda: query_obj.find(lookup=lookup, select=select, workers=workers)
+            )
+            best = min(timer.repeat(repeat=repeat, number=1))
+            fmt = '{:>8.3f}s  workers={:<3} lookup={!r} select={!r}'
+            print(fmt.format(best, workers, lookup, select))
+
+
+if __name__ == '__main__':
+    main()
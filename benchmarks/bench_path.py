@@ -0,0 +1,51 @@
+"""Benchmark of path-anchored lookups against a full-traversal lookup.
+
+Usage: python benchmarks/bench_path.py [records] [repeat]
+
+The document has a small devices branch and a large logs branch, so
+that a path lookup skips most of the document.
+"""
+
+import sys
+import timeit
+
+from dlapp import DLQuery
+
+QUERIES = [
+    ('hostname', '$.devices[*].hostname'),
+    ('name=_wildcard(Ethernet1)', '$.devices[*].interfaces[*].name=_wildcard(Ethernet1)'),
+]
+
+
+def make_data(total):
+    """Create a document with a small devices branch and a large logs branch."""
+    devices = [
+        {
+            'hostname': 'router-{}'.format(i),
+            'interfaces': [{'name': 'Ethernet{}'.format(j)} for j in range(4)],
+        }
+        for i in range(100)
+    ]
+    logs = [
+        {'seq': i, 'hostname': 'router-{}'.format(i % 100),
+         'detail': {'name': 'event-{}'.format(i), 'level': 'info'}}
+        for i in range(total)
+    ]
+    return dict(devices=devices, logs=logs)
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    query_obj = DLQuery(make_data(total))
+
+    print('log records : {}'.format(total))
+    for lookups in QUERIES:
+        for lookup in lookups:
+            timer = timeit.Timer(lambda: query_obj.find(lookup=lookup))
+            best = min(timer.repeat(repeat=repeat, number=1))
+            print('{:>8.3f}s  lookup={!r}'.format(best, lookup))
+
+
+if __name__ == '__main__':
+    main()
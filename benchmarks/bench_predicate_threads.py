@@ -0,0 +1,47 @@
+"""Benchmark of thread-pool evaluation of a blocking WHERE clause.
+
+Usage: python benchmarks/bench_predicate_threads.py [records] [delay_ms]
+
+CustomValidation.is_ipv4_address is wrapped with a sleep to simulate
+a validator which blocks on a local resolver or a cache file.
+"""
+
+import sys
+import time
+import timeit
+
+from dlapp import DLQuery
+from dlapp.collection import FilterMetrics
+from dlapp.validation import CustomValidation
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.001
+
+    is_ipv4_address = CustomValidation.is_ipv4_address
+
+    def blocking_is_ipv4_address(*args, **kwargs):
+        time.sleep(delay)
+        return is_ipv4_address(*args, **kwargs)
+
+    CustomValidation.is_ipv4_address = blocking_is_ipv4_address
+
+    data = [{'host': 'h{}'.format(i), 'ip': '10.0.{}.{}'.format(i // 256 % 256, i % 256)}
+            for i in range(total)]
+    query_obj = DLQuery(data)
+    select = 'host where ip is ipv4_address'
+
+    print('records : {}, delay : {:.1f} ms'.format(total, delay * 1000))
+    for workers in [None, 2, 4, 8, 16]:
+        metrics = FilterMetrics()
+        timer = timeit.Timer(
+            lambda: query_obj.find(lookup='host', select=select,
+                                   predicate_workers=workers, metrics=metrics)
+        )
+        best = min(timer.repeat(repeat=1, number=1))
+        print('{:>8.3f}s  predicate_workers={!r:<5} {!r}'.format(best, workers, metrics))
+
+
+if __name__ == '__main__':
+    main()
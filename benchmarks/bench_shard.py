@@ -0,0 +1,49 @@
+"""Benchmark of ShardedDLQuery against a single DLQuery.
+
+Usage: python benchmarks/bench_shard.py [records] [repeat]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_shard.py
+"""
+
+import os
+import sys
+import timeit
+
+from dlapp import DLQuery
+from dlapp import ShardedDLQuery
+from bench_find import make_data
+
+QUERIES = [
+    ('hostname', ''),
+    ('name=_wildcard(Ethernet[12])', 'name where mtu ge 1500'),
+]
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    data = make_data(total)
+    cpus = os.cpu_count() or 1
+
+    print('records : {}, cpus : {}'.format(total, cpus))
+    query_obj = DLQuery(data)
+    for lookup, select in QUERIES:
+        timer = timeit.Timer(lambda: query_obj.find(lookup=lookup, select=select))
+        best = min(timer.repeat(repeat=repeat, number=1))
+        fmt = '{:>8.3f}s  DLQuery         lookup={!r} select={!r}'
+        print(fmt.format(best, lookup, select))
+
+    for count in sorted({2, 4, cpus}):
+        with ShardedDLQuery(data, count=count) as sharded_obj:
+            for lookup, select in QUERIES:
+                timer = timeit.Timer(
+                    lambda: sharded_obj.find(lookup=lookup, select=select)
+                )
+                best = min(timer.repeat(repeat=repeat, number=1))
+                fmt = '{:>8.3f}s  shards={:<8} lookup={!r} select={!r}'
+                print(fmt.format(best, count, lookup, select))
+
+
+if __name__ == '__main__':
+    main()
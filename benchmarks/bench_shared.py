@@ -0,0 +1,115 @@
+"""Benchmark of per-worker memory and startup time of SharedDataset.
+
+Usage: python benchmarks/bench_shared.py [records] [workers]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_shared.py
+
+Each worker is a spawned process, like a web server worker which loads
+an inventory at startup.  A worker either parses a JSON file, attaches
+to a shared memory block, or memory-maps a dataset file, then runs the
+queries and reports its startup time and resident memory.  Workers run
+at the same time and means over workers are printed.  RssShmem and
+RssFile pages are shared by all workers; RssAnon pages are private.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import multiprocessing
+
+from dlapp import DLQuery
+from dlapp import SharedDataset
+from bench_find import make_data
+
+QUERIES = [
+    ('hostname=router-7', ''),
+    ('name=_wildcard(Ethernet1)', 'name where mtu ge 1500'),
+]
+
+
+def get_rss():
+    """Get RssAnon, RssFile, and RssShmem of this process in MiB."""
+    rss = dict()
+    with open('/proc/self/status') as stream:
+        for line in stream:
+            if line.startswith(('RssAnon', 'RssFile', 'RssShmem')):
+                name, size, _ = line.split()
+                rss[name.rstrip(':')] = int(size) / 1024
+    return rss
+
+
+def run_worker(mode, source, queue):
+    start = time.perf_counter()
+    if mode == 'json':
+        with open(source) as stream:
+            query_obj = DLQuery(json.load(stream))
+    elif mode == 'shm':
+        query_obj = SharedDataset.attach(source)
+    else:
+        query_obj = SharedDataset.open(source)
+    startup = time.perf_counter() - start
+
+    elapsed = []
+    for lookup, select in QUERIES:
+        start = time.perf_counter()
+        query_obj.find(lookup=lookup, select=select)
+        elapsed.append(time.perf_counter() - start)
+    queue.put((startup, elapsed, get_rss()))
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    context = multiprocessing.get_context('spawn')
+    data = make_data(total)
+
+    with tempfile.TemporaryDirectory() as dirname:
+        json_file = os.path.join(dirname, 'inventory.json')
+        with open(json_file, 'w') as stream:
+            json.dump(data, stream)
+        dataset_file = os.path.join(dirname, 'inventory.dlds')
+
+        start = time.perf_counter()
+        SharedDataset.save(data, dataset_file)
+        print('records : {}, workers : {}'.format(total, workers))
+        fmt = 'json {:.1f} MiB, dataset {:.1f} MiB, serialized in {:.3f}s'
+        print(fmt.format(os.path.getsize(json_file) / 2 ** 20,
+                         os.path.getsize(dataset_file) / 2 ** 20,
+                         time.perf_counter() - start))
+        dataset = SharedDataset.create(data)
+        del data
+
+        try:
+            for mode, source in [('json', json_file), ('shm', dataset.name),
+                                 ('mmap', dataset_file)]:
+                queue = context.Queue()
+                processes = [
+                    context.Process(target=run_worker, args=(mode, source, queue))
+                    for _ in range(workers)
+                ]
+                for process in processes:
+                    process.start()
+                reports = [queue.get() for _ in processes]
+                for process in processes:
+                    process.join()
+
+                n = len(reports)
+                startup = sum(report[0] for report in reports) / n
+                elapsed = [sum(report[1][i] for report in reports) / n
+                           for i in range(len(QUERIES))]
+                rss = {name: sum(report[2].get(name, 0) for report in reports) / n
+                       for name in ('RssAnon', 'RssFile', 'RssShmem')}
+                fmt = ('{:<5} startup {:>7.3f}s  find {}  RssAnon {:>7.1f} MiB  '
+                       'RssFile {:>6.1f} MiB  RssShmem {:>6.1f} MiB')
+                print(fmt.format(mode, startup,
+                                 ' '.join('{:>7.3f}s'.format(i) for i in elapsed),
+                                 rss['RssAnon'], rss['RssFile'], rss['RssShmem']))
+        finally:
+            dataset.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark of reloading a file from a snapshot cache against parsing it.
+
+Usage: python benchmarks/bench_snapshot.py [records]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_snapshot.py
+
+Each format is parsed once into a temporary cache, which saves a snapshot,
+and then reloaded.  The last rows also build all indexes and save them
+with save_snapshot, so that a reload skips building them.  YAML gets a
+tenth of the records because the pure-Python loader is slow.
+"""
+
+import os
+import sys
+import json
+import timeit
+import tempfile
+
+import yaml
+
+from dlapp import SnapshotCache
+from dlapp import create_from_csv_file
+from dlapp import create_from_json_file
+from dlapp import create_from_yaml_file
+from bench_find import make_data
+
+
+def build_indexes(query_obj):
+    query_obj.build_trigram_index()
+    query_obj.build_token_index()
+    query_obj.build_node_table()
+    query_obj.build_key_summary()
+    return query_obj
+
+
+def write_files(dirname, total):
+    data = make_data(total)
+    json_file = os.path.join(dirname, 'sample.json')
+    with open(json_file, 'w') as stream:
+        json.dump(data, stream)
+    yaml_file = os.path.join(dirname, 'sample.yaml')
+    with open(yaml_file, 'w') as stream:
+        yaml.safe_dump(make_data(total // 10), stream)
+    csv_file = os.path.join(dirname, 'sample.csv')
+    with open(csv_file, 'w') as stream:
+        stream.write('hostname,ip,name,status,mtu\n')
+        for device in data:
+            for interface in device['interfaces']:
+                stream.write('{},{},{},{},{}\n'.format(device['hostname'], device['ip'],
+                                                       interface['name'], interface['status'],
+                                                       interface['mtu']))
+    return [('json', json_file, create_from_json_file),
+            ('yaml', yaml_file, create_from_yaml_file),
+            ('csv', csv_file, create_from_csv_file)]
+
+
+def measure(func):
+    return min(timeit.repeat(func, number=1, repeat=3))
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as dirname:
+        cache = SnapshotCache(directory=os.path.join(dirname, 'cache'))
+        fmt = '{:<5} {:>6.1f} MiB  {:<22} {:>7.3f}s  {:>7.3f}s  snapshot {:>6.1f} MiB'
+        print('{:<5} {:>10}  {:<22} {:>8}  {:>8}'.format('type', 'file', 'case', 'parse', 'reload'))
+        for filetype, filename, func in write_files(dirname, total):
+            size = os.path.getsize(filename) / 2 ** 20
+            parse = measure(lambda: func(filename))
+            query_obj = func(filename, cache=cache)
+            reload = measure(lambda: func(filename, cache=cache))
+            snapshot_size = os.path.getsize(query_obj.snapshot.path) / 2 ** 20
+            print(fmt.format(filetype, size, 'data', parse, reload, snapshot_size), flush=True)
+
+            parse = measure(lambda: build_indexes(func(filename)))
+            build_indexes(query_obj).save_snapshot()
+            reload = measure(lambda: func(filename, cache=cache))
+            snapshot_size = os.path.getsize(query_obj.snapshot.path) / 2 ** 20
+            print(fmt.format(filetype, size, 'data + all indexes', parse, reload, snapshot_size),
+                  flush=True)
+
+
+if __name__ == '__main__':
+    main()
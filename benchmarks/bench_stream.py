@@ -0,0 +1,66 @@
+"""Benchmark of stream_find_json against json.load with DLQuery.find.
+
+Usage: python benchmarks/bench_stream.py [records]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_stream.py
+
+Time and peak memory are measured in separate runs, because tracemalloc
+slows allocations down.  Peak memory includes parsed data, matched
+results, and buffers of the streaming tokenizer.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+
+from dlapp import DLQuery
+from dlapp import stream_find_json
+from bench_find import make_data
+
+QUERIES = [
+    ('hostname=router-7', ''),
+    ('hostname', 'limit 1'),
+    ('name=_wildcard(Ethernet1)', 'name where mtu ge 1500'),
+]
+
+
+def find_loaded(filename, lookup, select):
+    with open(filename) as stream:
+        return DLQuery(json.load(stream)).find(lookup=lookup, select=select)
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, len(result)
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'inventory.json')
+        with open(filename, 'w') as stream:
+            json.dump(make_data(total), stream)
+        size = os.path.getsize(filename) / 2 ** 20
+        print('records : {}, file : {:.1f} MiB'.format(total, size))
+
+        for lookup, select in QUERIES:
+            for name, func in [('json.load + find', find_loaded),
+                               ('stream_find_json', stream_find_json)]:
+                elapsed, peak, count = measure(func, filename, lookup, select)
+                fmt = '{:>8.3f}s  peak {:>7.1f} MiB  results {:<7} {:<17} lookup={!r} select={!r}'
+                print(fmt.format(elapsed, peak, count, name, lookup, select))
+
+
+if __name__ == '__main__':
+    main()
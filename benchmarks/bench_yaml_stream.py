@@ -0,0 +1,71 @@
+"""Benchmark of stream_find_yaml against loading all YAML documents.
+
+Usage: python benchmarks/bench_yaml_stream.py [documents]
+
+Run from the benchmarks directory with PYTHONPATH set to the repository
+root, i.e. PYTHONPATH=.. python bench_yaml_stream.py
+
+A file has one device record per document, like a dump of manifests.
+Both ways use the same auto-selected YAML loader.  Time and peak memory
+are measured in separate runs, because tracemalloc slows allocations down.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+import yaml
+
+from dlapp import DLQuery
+from dlapp import stream_find_yaml
+from dlapp.factory import get_backend
+from bench_find import make_data
+
+QUERIES = [
+    ('hostname=router-7', ''),
+    ('hostname', 'limit 1'),
+    ('name=_wildcard(Ethernet1)', 'name where mtu ge 1500'),
+]
+
+
+def find_loaded(filename, lookup, select):
+    loader = get_backend('yaml')[1]
+    with open(filename) as stream:
+        documents = list(yaml.load_all(stream, Loader=loader))
+    return DLQuery(documents).find(lookup=lookup, select=select)
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, len(result)
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = os.path.join(dirname, 'devices.yaml')
+        with open(filename, 'w') as stream:
+            yaml.safe_dump_all(make_data(total), stream, sort_keys=False)
+        size = os.path.getsize(filename) / 2 ** 20
+        print('documents : {}, file : {:.1f} MiB, loader : {}'.format(
+            total, size, get_backend('yaml')[0]))
+
+        for lookup, select in QUERIES:
+            for name, func in [('load_all + find', find_loaded),
+                               ('stream_find_yaml', stream_find_yaml)]:
+                elapsed, peak, count = measure(func, filename, lookup, select)
+                fmt = '{:>8.3f}s  peak {:>7.2f} MiB  results {:<7} {:<17} lookup={!r} select={!r}'
+                print(fmt.format(elapsed, peak, count, name, lookup, select))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,19 @@ This module
 - initialize a query instance from DLQuery class
 - or create a query instance from create_from_csv_file,
   create_from_csv_data, create_from_json_file, create_from_json_data,
-  create_from_yaml_file, or create_from_yaml_data functions.
+  create_from_jsonl_file, create_from_jsonl_data,
+  create_from_yaml_file, or create_from_yaml_data functions.  A CSV file
+  can be loaded column by column with columnar=True (see ColumnTable).
+  JSON and YAML use the fastest installed parser backend, e.g. orjson
+  or libyaml, unless backend is given (see register_backend).
+- or reload a parsed file, and indexes saved with save_snapshot, from an
+  on-disk snapshot with cache=True of a create_from_*_file function
+  (see SnapshotCache).
+- or create a query instance per document of a multi-document YAML file
+  with iter_from_yaml_file or iter_from_yaml_data.
+- or search a JSON file while it is being parsed with stream_find_json,
+  a JSON Lines file line by line with stream_find_jsonl, or a YAML file
+  document by document with stream_find_yaml.
 
 A query instance has find method to traverse entire dictionary or list
 to extract a list of records based on a lookup and select-statement.
@@ -71,12 +83,27 @@ Snippet 6: using lookup and select-statement to select c with WHERE clause
 """
 
 from dlapp.dlquery import DLQuery         # noqa
+from dlapp.shard import ShardedDLQuery    # noqa
+from dlapp.shared import SharedDataset    # noqa
+from dlapp.columnar import ColumnTable    # noqa
+from dlapp.snapshot import SnapshotCache  # noqa
 from dlapp.factory import create_from_yaml_file   # noqa
 from dlapp.factory import create_from_yaml_data   # noqa
+from dlapp.factory import iter_from_yaml_file     # noqa
+from dlapp.factory import iter_from_yaml_data     # noqa
 from dlapp.factory import create_from_json_file   # noqa
 from dlapp.factory import create_from_json_data   # noqa
+from dlapp.factory import create_from_jsonl_file  # noqa
+from dlapp.factory import create_from_jsonl_data  # noqa
 from dlapp.factory import create_from_csv_file    # noqa
 from dlapp.factory import create_from_csv_data    # noqa
+from dlapp.factory import acreate_from_yaml_file  # noqa
+from dlapp.factory import acreate_from_json_file  # noqa
+from dlapp.factory import acreate_from_csv_file   # noqa
+from dlapp.factory import register_backend        # noqa
+from dlapp.stream import stream_find_json        # noqa
+from dlapp.stream import stream_find_jsonl       # noqa
+from dlapp.stream import stream_find_yaml        # noqa
 
 from dlapp.validation import RegexValidation      # noqa
 from dlapp.validation import OpValidation         # noqa
@@ -93,12 +120,27 @@ __all__ = [
     'DLQuery',
     'OpValidation',
     'RegexValidation',
+    'ShardedDLQuery',
+    'SharedDataset',
+    'ColumnTable',
+    'SnapshotCache',
+    'acreate_from_csv_file',
+    'acreate_from_json_file',
+    'acreate_from_yaml_file',
     'create_from_csv_file',
     'create_from_csv_data',
     'create_from_json_file',
     'create_from_json_data',
+    'create_from_jsonl_file',
+    'create_from_jsonl_data',
     'create_from_yaml_file',
     'create_from_yaml_data',
+    'iter_from_yaml_file',
+    'iter_from_yaml_data',
+    'register_backend',
+    'stream_find_json',
+    'stream_find_jsonl',
+    'stream_find_yaml',
     'version',
     'edition'
 ]
@@ -4,6 +4,10 @@ import yaml
 import json
 import re
 from functools import partial
+from itertools import islice
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 from pprint import pprint
 from dlapp.argumenthelper import validate_argument_type
 from dlapp import utils
@@ -15,6 +19,7 @@ from dlapp.exceptions import ListIndexError
 from dlapp.exceptions import ResultError
 from dlapp.exceptions import LookupClsError
 from dlapp.exceptions import ObjectArgumentError
+from dlapp.exceptions import ArgumentError
 
 
 class List(list):
@@ -31,8 +36,12 @@ class List(list):
     -----
     ListIndexError: if a list is out of range.
     """
-    def __getattribute__(self, attr):
-        match = re.match(r'index(?P<index>_?[0-9]+)$', attr)
+    _index_pattern = re.compile(r'index(?P<index>_?[0-9]+)$')
+
+    def __getattr__(self, attr):
+        # only called when a normal attribute lookup fails, so that
+        # append, total, is_empty, ... do not pay for matching indexN.
+        match = self._index_pattern.match(attr)
         if match:
             index = match.group('index').replace('_', '-')
             try:
@@ -41,8 +50,8 @@ class List(list):
             except Exception as ex:
                 raise ListIndexError(str(ex))
         else:
-            value = super().__getattribute__(attr)
-            return value
+            fmt = '{!r} object has no attribute {!r}'
+            raise AttributeError(fmt.format(type(self).__name__, attr))
 
     @property
     def is_empty(self):
@@ -90,6 +99,8 @@ class Result:
     -----
     ResultError: if parent is not instance of None or Result.
     """
+    __slots__ = ('data', 'parent')
+
     def __init__(self, data, parent=None):
         self.parent = None
         self.data = data
@@ -102,7 +113,7 @@ class Result:
         ----------
         parent (Result): a Result instance.
         """
-        if parent is None or isinstance(parent, self.__class__):
+        if parent is None or isinstance(parent, Result):
             self.parent = parent
         else:
             msg = 'parent argument must be Result instance or None.'
@@ -114,18 +125,514 @@ class Result:
         return isinstance(self.parent, Result)
 
 
+EMPTY_CHILDREN = ()
+
+CONTAINER_TYPES = (dict, list, tuple, set)
+
+
+def get_frame(data, depth=0):
+    """Get a traversal frame of a container, i.e. [dict or None for a list,
+    an iterator of items, a lazily created Result of dict, a depth]."""
+    if isinstance(data, dict):
+        return [data, iter(data.items()), None, depth]
+    return [None, iter(data), None, depth]
+
+
+def get_parent_result(frame):
+    """Get a Result of a dict frame which is shared by its found records."""
+    if frame[2] is None:
+        frame[2] = Result(frame[0])
+    return frame[2]
+
+
+def get_prune(key_summary, lookup_objs):
+    """Get a function which returns True if a container cannot contain
+    a key of any lookup, otherwise, None if nothing can be pruned."""
+    if key_summary is None:
+        return None
+    masks = set()
+    for lookup_obj in lookup_objs:
+        lst = key_summary.get_masks(lookup_obj)
+        if lst is None:
+            return None
+        masks.update(lst)
+
+    get_mask = key_summary.masks.get
+    if len(masks) == 1:
+        key_mask = masks.pop()
+        # a container which is not summarized gets -1, i.e. all bits are set
+        return lambda node: get_mask(id(node), -1) & key_mask != key_mask
+    may_contain = key_summary.may_contain
+    return lambda node: not may_contain(node, masks)
+
+
+def iter_found_records(data, lookup_obj, key_summary=None, max_depth=None,
+                       stop=None):
+    """Search a lookup in a dictionary or list and lazily yield found
+    records in document order, i.e. the same order as ``Element.find_``.
+
+    Parameters
+    ----------
+    data (dict, list): a dict, dict-like, list, or list-like instance.
+    lookup_obj (LookupCls): a LookupCls instance.
+    key_summary (KeySummary): key summaries of data to skip containers
+            which cannot contain a matched key.  Default is None.
+    max_depth (int): a maximum depth of matched key.  Keys of data are
+            at depth 1 and a list item adds a level.  Default is None.
+    stop (threading.Event): a stop flag which ends traversal at the next
+            container once it is set.  Default is None.
+
+    Returns
+    -------
+    generator: a generator of Result instances which parent holds a record.
+    """
+    is_right = lookup_obj.is_right
+    left_cache = dict()
+    prune = get_prune(key_summary, [lookup_obj])
+    if prune and prune(data) or (max_depth is not None and max_depth < 1):
+        return
+
+    stack = [get_frame(data)]
+    while stack:
+        if stop is not None and stop.is_set():
+            return
+        frame = stack[-1]
+        parent = frame[0]
+        depth = frame[3] + 1
+        is_descended = max_depth is None or depth < max_depth
+        for item in frame[1]:
+            if parent is None:
+                if is_descended and isinstance(item, CONTAINER_TYPES) and item:
+                    if prune and prune(item):
+                        continue
+                    stack.append(get_frame(item, depth))
+                    break
+                continue
+
+            key, value = item
+            is_left_matched = left_cache.get(key)
+            if is_left_matched is None:
+                is_left_matched = lookup_obj.is_left_matched(key)
+                left_cache[key] = is_left_matched
+            if is_left_matched:
+                if not is_right or lookup_obj.is_right_matched(value):
+                    yield Result(value, parent=get_parent_result(frame))
+            if is_descended and isinstance(value, CONTAINER_TYPES) and value:
+                if prune and prune(value):
+                    continue
+                stack.append(get_frame(value, depth))
+                break
+        else:
+            stack.pop()
+
+
+def iter_found_records_bfs(data, lookup_obj, key_summary=None, max_depth=None,
+                           stop=None):
+    """Search a lookup in a dictionary or list and lazily yield found
+    records in breadth-first order, i.e. the nearest records first.
+
+    Parameters
+    ----------
+    data (dict, list): a dict, dict-like, list, or list-like instance.
+    lookup_obj (LookupCls): a LookupCls instance.
+    key_summary (KeySummary): key summaries of data to skip containers
+            which cannot contain a matched key.  Default is None.
+    max_depth (int): a maximum depth of matched key.  Keys of data are
+            at depth 1 and a list item adds a level.  Default is None.
+    stop (threading.Event): a stop flag which ends traversal at the next
+            container once it is set.  Default is None.
+
+    Returns
+    -------
+    generator: a generator of Result instances which parent holds a record.
+    """
+    is_right = lookup_obj.is_right
+    left_cache = dict()
+    prune = get_prune(key_summary, [lookup_obj])
+    if prune and prune(data) or (max_depth is not None and max_depth < 1):
+        return
+
+    queue = deque([(data, 0)])
+    while queue:
+        if stop is not None and stop.is_set():
+            return
+        node, depth = queue.popleft()
+        depth += 1
+        is_descended = max_depth is None or depth < max_depth
+        if isinstance(node, dict):
+            parent = None
+            for key, value in node.items():
+                is_left_matched = left_cache.get(key)
+                if is_left_matched is None:
+                    is_left_matched = lookup_obj.is_left_matched(key)
+                    left_cache[key] = is_left_matched
+                if is_left_matched:
+                    if not is_right or lookup_obj.is_right_matched(value):
+                        parent = parent or Result(node)
+                        yield Result(value, parent=parent)
+                if is_descended and isinstance(value, CONTAINER_TYPES) and value:
+                    if not prune or not prune(value):
+                        queue.append((value, depth))
+        elif is_descended:
+            for item in node:
+                if isinstance(item, CONTAINER_TYPES) and item:
+                    if not prune or not prune(item):
+                        queue.append((item, depth))
+
+
+def iter_path_records(data, lookup_obj, max_depth=None, stop=None):
+    """Search a path-anchored lookup and lazily yield found records in
+    document order.  Only branches matching the path are visited.
+
+    Parameters
+    ----------
+    data (dict, list): a dict, dict-like, list, or list-like instance.
+    lookup_obj (LookupCls): a LookupCls instance which has a path.
+    max_depth (int): a maximum depth of matched key.  Default is None.
+    stop (threading.Event): a stop flag which ends traversal at the next
+            container once it is set.  Default is None.
+
+    Returns
+    -------
+    generator: a generator of Result instances which parent holds a record.
+    """
+    segments = lookup_obj.path
+    last = len(segments) - 1
+    is_right = lookup_obj.is_right
+
+    def walk_(node_, i_, depth_=1):
+        if max_depth is not None and depth_ > max_depth:
+            return
+        if stop is not None and stop.is_set():
+            return
+        selector, recursive = segments[i_]
+        if isinstance(node_, dict):
+            is_dict, items = True, node_.items()
+        else:
+            is_dict, items = False, enumerate(node_)
+            if isinstance(selector, int) and not recursive:
+                size = len(node_)
+                if not -size <= selector < size:
+                    return
+                selector = selector % size
+                items = [(selector, node_[selector])]
+
+        parent = None
+        for key, value in items:
+            if selector is None:
+                is_matched = True
+            else:
+                is_matched = is_dict == isinstance(selector, str) and key == selector
+            if is_matched and i_ == last:
+                if is_dict and (not is_right or lookup_obj.is_right_matched(value)):
+                    parent = parent or Result(node_)
+                    yield Result(value, parent=parent)
+            elif is_matched and isinstance(value, CONTAINER_TYPES) and value:
+                yield from walk_(value, i_ + 1, depth_ + 1)
+            if recursive and isinstance(value, CONTAINER_TYPES) and value:
+                yield from walk_(value, i_, depth_ + 1)
+
+    if isinstance(data, CONTAINER_TYPES) and data:
+        yield from walk_(data, 0)
+
+
+def iter_lookup_records(data, lookup_obj, key_summary=None, max_depth=None,
+                        order='dfs', stop=None):
+    """Search a lookup with a path-anchored traversal if lookup has a path,
+    otherwise, with a depth-first or breadth-first traversal.  A path
+    lookup is always searched in document order."""
+    if lookup_obj.path:
+        return iter_path_records(data, lookup_obj, max_depth=max_depth, stop=stop)
+    func = iter_found_records_bfs if order == 'bfs' else iter_found_records
+    return func(data, lookup_obj, key_summary=key_summary, max_depth=max_depth,
+                stop=stop)
+
+
+def validate_search_order(order):
+    """Validate a search order, i.e. dfs or bfs, and return it in lowercase."""
+    order = str(order).lower()
+    if order not in ('dfs', 'bfs'):
+        fmt = 'order must be dfs or bfs, but got {!r}.'
+        raise ArgumentError(fmt.format(order))
+    return order
+
+
+def iter_found_records_many(data, lookup_objs, key_summary=None):
+    """Search many lookups in a single pass over a dictionary or list and
+    lazily yield found records in document order.
+
+    Parameters
+    ----------
+    data (dict, list): a dict, dict-like, list, or list-like instance.
+    lookup_objs (list): a list of LookupCls instances.  A None item is skipped.
+    key_summary (KeySummary): key summaries of data to skip containers
+            which cannot contain a matched key.  Default is None.
+
+    Returns
+    -------
+    generator: a generator of (position of lookup, Result) pairs.
+    """
+    left_cache = dict()
+    prune = get_prune(key_summary, [obj for obj in lookup_objs if obj])
+    if prune and prune(data):
+        return
+
+    stack = [get_frame(data)]
+    while stack:
+        frame = stack[-1]
+        parent = frame[0]
+        for item in frame[1]:
+            if parent is None:
+                if isinstance(item, CONTAINER_TYPES) and item:
+                    if prune and prune(item):
+                        continue
+                    stack.append(get_frame(item))
+                    break
+                continue
+
+            key, value = item
+            matched_lookups = left_cache.get(key)
+            if matched_lookups is None:
+                matched_lookups = [
+                    (i, lookup_obj, lookup_obj.is_right)
+                    for i, lookup_obj in enumerate(lookup_objs)
+                    if lookup_obj and lookup_obj.is_left_matched(key)
+                ]
+                left_cache[key] = matched_lookups
+            for i, lookup_obj, is_right in matched_lookups:
+                if not is_right or lookup_obj.is_right_matched(value):
+                    yield i, Result(value, parent=get_parent_result(frame))
+            if isinstance(value, CONTAINER_TYPES) and value:
+                if prune and prune(value):
+                    continue
+                stack.append(get_frame(value))
+                break
+        else:
+            stack.pop()
+
+
+class FilterMetrics:
+    """Timing metrics of applying a select statement to found records.
+
+    Attributes
+    ----------
+    workers (int): a number of predicate threads.  1 means inline evaluation.
+    total (int): a number of evaluated records.
+    selected (int): a number of selected records.
+    elapsed (float): wall-clock seconds from first to last evaluated record.
+    predicate_time (float): seconds spent on evaluating all records.
+    max_predicate_time (float): seconds of the slowest evaluation.
+
+    Properties
+    ----------
+    average_predicate_time -> float
+    """
+    def __init__(self):
+        self.workers = 1
+        self.total = 0
+        self.selected = 0
+        self.elapsed = 0.0
+        self.predicate_time = 0.0
+        self.max_predicate_time = 0.0
+
+    def __repr__(self):
+        fmt = ('{}(workers={}, total={}, selected={}, elapsed={:.6f}, '
+               'predicate_time={:.6f}, max_predicate_time={:.6f})')
+        return fmt.format(type(self).__name__, self.workers, self.total,
+                          self.selected, self.elapsed, self.predicate_time,
+                          self.max_predicate_time)
+
+    @property
+    def average_predicate_time(self):
+        """Return average seconds of evaluating a record."""
+        return self.predicate_time / self.total if self.total else 0.0
+
+    def add(self, is_selected, duration):
+        """Record an evaluation of a record."""
+        self.total += 1
+        self.selected += 1 if is_selected else 0
+        self.predicate_time += duration
+        self.max_predicate_time = max(self.max_predicate_time, duration)
+
+
+def select_record(item, select_obj, on_exception=False):
+    """Apply a parsed select statement to a found record.
+
+    Parameters
+    ----------
+    item (Result): a Result instance which parent holds a record.
+    select_obj (SelectParser): a parsed SelectParser instance.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+    Returns
+    -------
+    tuple: (is_selected, selected value).
+    """
+    predicate = select_obj.predicate
+    if callable(predicate) and not predicate(item.parent.data, on_exception=on_exception):
+        return False, None
+
+    if select_obj.is_zero_select:
+        return True, item.data
+    elif select_obj.is_all_select:
+        return True, item.parent.data
+    else:
+        new_data = item.parent.data.fromkeys(select_obj.columns)
+        is_added = True
+        for key in new_data:
+            is_added &= key in item.parent.data
+            new_data[key] = item.parent.data.get(key, None)
+        return is_added, new_data
+
+
+def select_record_timed(item, select_obj, on_exception=False):
+    """Apply a parsed select statement to a found record and measure it.
+
+    Returns
+    -------
+    tuple: (is_selected, selected value, seconds).
+    """
+    start = perf_counter()
+    is_selected, value = select_record(item, select_obj,
+                                       on_exception=on_exception)
+    return is_selected, value, perf_counter() - start
+
+
+def iter_select_records_threaded(records, select_obj, on_exception=False,
+                                 workers=2):
+    """Apply a parsed select statement to records in a bounded thread pool
+    and lazily yield (is_selected, value, seconds) in order of records.
+    At most two evaluations per thread are in flight."""
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for item in records:
+                future = executor.submit(select_record_timed, item, select_obj,
+                                         on_exception=on_exception)
+                pending.append(future)
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def iter_filter_records(records, select_obj, on_exception=False,
+                        workers=None, metrics=None):
+    """Lazily filter records based on a parsed select statement.
+
+    Parameters
+    ----------
+    records (iterable): Result instances which parent holds a record.
+    select_obj (SelectParser): a parsed SelectParser instance.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+    workers (int): a number of threads to evaluate a WHERE clause, e.g.
+            a custom validator which blocks on I/O.  Default is None.
+    metrics (FilterMetrics): a FilterMetrics instance to collect timing
+            metrics.  Default is None.
+
+    Returns
+    -------
+    generator: a generator of filtered records.
+    """
+    is_threaded = bool(workers) and workers > 1 and callable(select_obj.predicate)
+    if not is_threaded and metrics is None:
+        for item in records:
+            is_selected, value = select_record(item, select_obj,
+                                               on_exception=on_exception)
+            if is_selected:
+                yield value
+        return
+
+    metrics = FilterMetrics() if metrics is None else metrics
+    if is_threaded:
+        metrics.workers = workers
+        results = iter_select_records_threaded(records, select_obj,
+                                               on_exception=on_exception,
+                                               workers=workers)
+    else:
+        results = (select_record_timed(item, select_obj, on_exception=on_exception)
+                   for item in records)
+
+    start = perf_counter()
+    try:
+        for is_selected, value, duration in results:
+            metrics.add(is_selected, duration)
+            if is_selected:
+                yield value
+    finally:
+        results.close()
+        metrics.elapsed += perf_counter() - start
+
+
+def filter_records(records, select_statement, on_exception=False,
+                   token_index=None, workers=None, metrics=None):
+    """Filter a list of records based on select statement
+
+    Parameters
+    ----------
+    records (list): a list of Result instances which parent holds a record.
+    select_statement (str): a select statement.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+    token_index (TokenIndex): a token index of data.  Default is None.
+    workers (int): a number of threads to evaluate a WHERE clause.
+            Default is None.
+    metrics (FilterMetrics): a FilterMetrics instance to collect timing
+            metrics.  Default is None.
+
+    Returns
+    -------
+    List: list of filtered records.
+    """
+    select_obj = SelectParser(select_statement,
+                              on_exception=on_exception,
+                              token_index=token_index)
+    select_obj.parse_statement()
+    result = List(iter_filter_records(records, select_obj,
+                                      on_exception=on_exception,
+                                      workers=workers, metrics=metrics))
+    return result
+
+
+def get_limit(select_obj, limit=None):
+    """Get the smaller limit of a LIMIT clause and a limit argument.
+
+    Parameters
+    ----------
+    select_obj (SelectParser): a parsed SelectParser instance.
+    limit (int): a maximum number of result.  Default is None.
+
+    Returns
+    -------
+    int: a limit, or None if there is no limit.
+    """
+    limits = [i for i in [select_obj.limit, limit] if i is not None]
+    return min(int(i) for i in limits) if limits else None
+
+
 class Element(Result):
     """Element class.
 
     Attributes
     ----------
     data (any): a data.
-    index (str): a index value of data if data is list or dictionary.
+    index (str, int): a key of dictionary or a position of list item.
     parent (Element): an Element instance.
     on_exception (bool): raise `Exception` if set True, otherwise, return False.
     type (str): datatype name of data.
+    children (tuple): child elements.  Empty elements share EMPTY_CHILDREN.
 
+    Notes
+    -----
+    Element uses __slots__ and a tuple of children to keep a wrapper
+    tree compact.  Children are built on first access, so that searching
+    with find or iterfind does not build a tree at all.  Run
+    benchmarks/bench_element_memory.py to measure bytes per node.
     """
+    __slots__ = ('index', 'type', 'on_exception', '_children')
+
     def __init__(self, data, index='', parent=None, on_exception=False):
         super().__init__(data, parent=parent)
         self.index = index
@@ -152,34 +659,47 @@ class Element(Result):
         return result
 
     def _build(self, data):
-        self.children = None
-        self.value = None
+        self._children = None
         if isinstance(data, dict):
             self.type = 'dict'
-            lst = List()
-            for index, val in data.items():
-                elm = Element(val, index=index, parent=self)
-                lst.append(elm)
-            self.children = lst or None
         elif isinstance(data, (list, tuple, set)):
             self.type = 'list'
-            lst = List()
-            for i, item in enumerate(data):
-                index = '__index__{}'.format(i)
-                elm = Element(item, index=index, parent=self)
-                lst.append(elm)
-            self.children = lst or None
         elif isinstance(data, (int, float, bool, str)) or data is None:
             self.type = type(data).__name__
-            self.value = data
+            self._children = EMPTY_CHILDREN
         else:
             self.type = 'object'
-            self.value = data
+            self._children = EMPTY_CHILDREN
+
+    @property
+    def children(self):
+        """Return a tuple of child elements."""
+        if self._children is None:
+            if not self.data:
+                self._children = EMPTY_CHILDREN
+            elif self.type == 'dict':
+                self._children = tuple(
+                    Element(val, index=index, parent=self)
+                    for index, val in self.data.items()
+                )
+            else:
+                self._children = tuple(
+                    Element(item, index=i, parent=self)
+                    for i, item in enumerate(self.data)
+                )
+        return self._children
+
+    @property
+    def value(self):
+        """Return data of a scalar or object element, otherwise, None."""
+        return None if self.type in ('dict', 'list') else self.data
 
     @property
     def has_children(self):
         """Return True if an element has children."""
-        return bool(self.children)
+        if self._children is None:
+            return bool(self.data)
+        return bool(self._children)
 
     @property
     def is_element(self):
@@ -206,47 +726,29 @@ class Element(Result):
         """Return True if an element is a list type."""
         return self.type == 'dict'
 
-    def filter_result(self, records, select_statement):
+    def filter_result(self, records, select_statement, token_index=None,
+                      workers=None, metrics=None):
         """Filter a list of records based on select statement
 
         Parameters
         ----------
         records (List): a list of record.
         select_statement (str): a select statement.
+        token_index (TokenIndex): a token index of data.  Default is None.
+        workers (int): a number of threads to evaluate a WHERE clause, i.e.
+                a concurrency limit of this query.  Result order is kept.
+                Default is None.
+        metrics (FilterMetrics): a FilterMetrics instance to collect timing
+                metrics.  Default is None.
 
         Returns
         -------
         List: list of filtered records.
         """
-        result = List()
-        select_obj = SelectParser(select_statement,
-                                  on_exception=self.on_exception)
-        select_obj.parse_statement()
-
-        if callable(select_obj.predicate):
-            lst = List()
-            for record in records:
-                is_found = select_obj.predicate(record.parent.data,
-                                                on_exception=self.on_exception)
-                if is_found:
-                    lst.append(record)
-        else:
-            lst = records[:]
-
-        if select_obj.is_zero_select:
-            for item in lst:
-                result.append(item.data)
-        elif select_obj.is_all_select:
-            for item in lst:
-                result.append(item.parent.data)
-        else:
-            for item in lst:
-                new_data = item.parent.data.fromkeys(select_obj.columns)
-                is_added = True
-                for key in new_data:
-                    is_added &= key in item.parent.data
-                    new_data[key] = item.parent.data.get(key, None)
-                is_added and result.append(new_data)
+        result = filter_records(records, select_statement,
+                                on_exception=self.on_exception,
+                                token_index=token_index,
+                                workers=workers, metrics=metrics)
         return result
 
     def find_(self, node, lookup_obj, result):
@@ -273,22 +775,150 @@ class Element(Result):
                     if child.is_element:
                         self.find_(child, lookup_obj, result)
 
-    def find(self, lookup, select=''):
+    def iterfind(self, lookup, select='', limit=None, trigram_index=None,
+                 token_index=None, key_summary=None, max_depth=None,
+                 order='dfs', predicate_workers=None, metrics=None, stop=None):
+        """Lazily search a lookup and yield filtered records in document
+        order or breadth-first order.  Traversal stops as soon as limit
+        records are produced and never descends beyond max_depth.
+
+        Parameters
+        ---------
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        limit (int): a maximum number of result.  Default is None.
+        trigram_index (TrigramIndex): a trigram index of data.  Default is None.
+        token_index (TokenIndex): a token index of data.  Default is None.
+        key_summary (KeySummary): key summaries of data.  Default is None.
+        max_depth (int): a maximum depth of matched key.  Keys of data are
+                at depth 1 and a list item adds a level.  Default is None.
+        order (str): dfs for document order or bfs for nearest records
+                first.  Default is dfs.
+        predicate_workers (int): a number of threads to evaluate a WHERE
+                clause.  Default is None.
+        metrics (FilterMetrics): a FilterMetrics instance to collect timing
+                metrics.  Default is None.
+        stop (threading.Event): a stop flag which ends traversal once it
+                is set.  Default is None.
+
+        Returns
+        -------
+        generator: a generator of filtered records.
+        """
+        order = validate_search_order(order)
+        lkup_obj = LookupCls(lookup)
+        lkup_obj.apply_trigram_index(trigram_index)
+        select_obj = SelectParser(select, on_exception=self.on_exception,
+                                  token_index=token_index)
+        select_obj.parse_statement()
+        limit = get_limit(select_obj, limit=limit)
+
+        if (limit is not None and limit <= 0) or not self.has_children:
+            return
+
+        records = iter_lookup_records(self.data, lkup_obj,
+                                      key_summary=key_summary,
+                                      max_depth=max_depth, order=order,
+                                      stop=stop)
+        result = iter_filter_records(records, select_obj,
+                                     on_exception=self.on_exception,
+                                     workers=predicate_workers, metrics=metrics)
+        for total, item in enumerate(result, 1):
+            yield item
+            if total == limit:
+                return
+
+    def find_many(self, queries, trigram_index=None, token_index=None,
+                  key_summary=None):
+        """Search many queries in a single pass over data.
+
+        Parameters
+        ---------
+        queries (list): a list of (lookup, select) pairs.
+        trigram_index (TrigramIndex): a trigram index of data.  Default is None.
+        token_index (TokenIndex): a token index of data.  Default is None.
+        key_summary (KeySummary): key summaries of data.  Default is None.
+
+        Returns
+        -------
+        list: a list of List, i.e. a result per query which is identical
+                to a result of find method.
+        """
+        lookup_objs, select_objs, limits = [], [], []
+        for lookup, select in queries:
+            lkup_obj = LookupCls(lookup)
+            lkup_obj.apply_trigram_index(trigram_index)
+            select_obj = SelectParser(select, on_exception=self.on_exception,
+                                      token_index=token_index)
+            select_obj.parse_statement()
+            lookup_objs.append(lkup_obj)
+            select_objs.append(select_obj)
+            limits.append(get_limit(select_obj))
+
+        result = [List() for _ in lookup_objs]
+        if not self.has_children:
+            return result
+
+        # path-anchored lookups only visit their own branches
+        for i, lookup_obj in enumerate(lookup_objs):
+            if lookup_obj.path:
+                records = iter_path_records(self.data, lookup_obj)
+                lst = iter_filter_records(records, select_objs[i],
+                                          on_exception=self.on_exception)
+                result[i].extend(islice(lst, limits[i]))
+                lookup_objs[i] = None
+
+        pending = sum(1 for i, limit in enumerate(limits)
+                      if lookup_objs[i] and (limit is None or limit > 0))
+        if not pending:
+            return result
+
+        records = iter_found_records_many(self.data, lookup_objs,
+                                          key_summary=key_summary)
+        for i, record in records:
+            limit, lst = limits[i], result[i]
+            if limit is not None and len(lst) >= limit:
+                continue
+            is_selected, value = select_record(record, select_objs[i],
+                                               on_exception=self.on_exception)
+            is_selected and lst.append(value)
+            if limit is not None and len(lst) >= limit:
+                pending -= 1
+                if not pending:
+                    break
+        return result
+
+    def find(self, lookup, select='', trigram_index=None, token_index=None,
+             limit=None, key_summary=None, max_depth=None, order='dfs',
+             predicate_workers=None, metrics=None):
         """recursively search a lookup.
 
         Parameters
         ---------
         lookup (str): a search pattern.
-        select (str): a select statement.
+        select (str): a select statement.  It can have a LIMIT clause.
+        trigram_index (TrigramIndex): a trigram index of data.  Default is None.
+        token_index (TokenIndex): a token index of data.  Default is None.
+        limit (int): a maximum number of result.  Default is None.
+        key_summary (KeySummary): key summaries of data.  Default is None.
+        max_depth (int): a maximum depth of matched key.  Default is None.
+        order (str): dfs or bfs.  Default is dfs.
+        predicate_workers (int): a number of threads to evaluate a WHERE
+                clause.  Default is None.
+        metrics (FilterMetrics): a FilterMetrics instance to collect timing
+                metrics.  Default is None.
 
         Returns
         -------
         List: list of record
         """
-        records = List()
-        lkup_obj = LookupCls(lookup)
-        self.find_(self, lkup_obj, records)
-        result = self.filter_result(records, select)
+        result = List(self.iterfind(lookup, select=select, limit=limit,
+                                    trigram_index=trigram_index,
+                                    token_index=token_index,
+                                    key_summary=key_summary,
+                                    max_depth=max_depth, order=order,
+                                    predicate_workers=predicate_workers,
+                                    metrics=metrics))
         return result
 
 
@@ -510,6 +1140,8 @@ class LookupCls:
     right (str, callable): a right lookup that uses to match a value of
             dictionary.  It that can be regular expression pattern
             or a callable function, i.e. Predicate function.
+    path (list): (selector, recursive) segments of a path-anchored
+            left lookup, otherwise, None.
 
     Notes
     -----
@@ -553,11 +1185,29 @@ class LookupCls:
             abc=empty(), i.e. searches key name is abc and its value is empty.
             abc=ipv4_address(), i.e. searches key name is abc and its value is IPv4 address.
             abc=date(), i.e. search key name is abc and its value is date such as 2021-06-16.
+
+        case 5: lookup='$.devices[*].hostname'
+            a left lookup starting with $. or $[ is anchored to a path, a
+            subset of JSONPath.  Search only descends into branches matching the path.
+                $.devices[*].hostname   hostname of every item of devices
+                $.devices[0].hostname   hostname of first item of devices
+                $.devices.*.hostname    * matches any key or any list item
+                $..interfaces[*].name   .. matches a key at any depth
+                $['a.b'].c              quoted key for special characters
+            A last segment must select a key.  Other keys starting with $,
+            e.g. $ref or $schema, are searched as normal keys.
+            A path lookup also supports a right lookup, e.g.
+                $.devices[*].hostname=_wildcard(r*)
     """
     def __init__(self, lookup):
         self.lookup = str(lookup)
         self.left = None
         self.right = None
+        self.path = None
+        self.trigram_index = None
+        self.right_candidates = None
+        self._left_regex = None
+        self._right_regex = None
         self.process()
 
     @property
@@ -686,6 +1336,60 @@ class LookupCls:
             fmt = 'Failed to parse this lookup : {!r}'
             raise LookupClsError(fmt.format(text))
 
+    @classmethod
+    def is_path(cls, text):
+        """Return True if a left lookup is path-anchored, i.e. it starts
+        with $. or $[ .  Other keys starting with $, e.g. $ref, are
+        searched as normal keys."""
+        return bool(re.match(r'\s*[$]\s*[.\[]', str(text)))
+
+    @classmethod
+    def parse_path(cls, text):
+        """Parse a path-anchored left lookup.
+
+        Parameters
+        ----------
+            text (str): a path lookup, e.g. $.devices[*].hostname.
+
+        Returns
+        -------
+        list: a list of (selector, recursive) segments.  A selector is a key,
+                a position of list item, or None for any key or item.
+                A last segment must select a key, i.e. [0] or [*] is invalid.
+        """
+        fmt = 'Failed to parse this path lookup : {!r}'
+        pattern = r'''(?x)
+            (?P<sep>[.]{1,2})?
+            (
+                \[[ ]*(?P<index>-?[0-9]+|[*])[ ]*\]
+                | \[[ ]*(?P<quote>["'])(?P<quoted>.*?)(?P=quote)[ ]*\]
+                | (?P<name>[^.\[\]]+)
+            )
+        '''
+        segments, is_item = [], False
+        pos, total = 1, len(text)
+        while pos < total:
+            match = re.compile(pattern).match(text, pos)
+            is_valid = match and match.end() > pos
+            is_valid = is_valid and (match.group('sep') or not match.group('name'))
+            if not is_valid:
+                raise LookupClsError(fmt.format(text))
+
+            index, name = match.group('index'), match.group('name')
+            if match.group('quote'):
+                selector = match.group('quoted')
+            elif index is not None:
+                selector = None if index == '*' else int(index)
+            else:
+                selector = None if name.strip() == '*' else name.strip()
+            segments.append((selector, match.group('sep') == '..'))
+            is_item = index is not None
+            pos = match.end()
+
+        if not segments or is_item:
+            raise LookupClsError(fmt.format(text))
+        return segments
+
     def process(self):
         """Parse a lookup to two expressions: a left expression and
         a right expression.
@@ -695,16 +1399,51 @@ class LookupCls:
 
         left, *lst = self.lookup.split('=', maxsplit=1)
         left = left.strip()
-        if left:
+        if self.is_path(left):
+            self.path = self.parse_path(left)
+            key = self.path[-1][0]
+            self.left = None if key is None else '^{}$'.format(re.escape(key))
+        elif left:
             self.left = self.parse(left)
         if lst:
             self.right = self.parse(lst[0])
+        self._left_regex = self.compile(self.left)
+        self._right_regex = self.compile(self.right)
+
+    @classmethod
+    def compile(cls, pattern):
+        """Compile a parsed pattern, otherwise, return None."""
+        if not pattern or not isinstance(pattern, str):
+            return None
+        try:
+            return re.compile(pattern)
+        except Exception as ex:     # noqa
+            return None
+
+    def apply_trigram_index(self, trigram_index):
+        """Narrow candidates of a right regular expression by trigram index.
+
+        Parameters
+        ----------
+        trigram_index (TrigramIndex): a trigram index instance.
+        """
+        self.trigram_index = None
+        self.right_candidates = None
+        if trigram_index is None or not isinstance(self.right, str):
+            return
+
+        candidates = trigram_index.get_candidates(self.right)
+        if candidates is not None:
+            self.trigram_index = trigram_index
+            self.right_candidates = candidates
 
     def is_left_matched(self, data):
         if not isinstance(data, str):
             return False
 
         if self.left:
+            if self._left_regex is not None:
+                return bool(self._left_regex.search(data))
             result = re.search(self.left, data)
             return bool(result)
         else:
@@ -720,6 +1459,13 @@ class LookupCls:
             else:
                 if not isinstance(data, str):
                     return False
+                if self.right_candidates is not None:
+                    value_id = self.trigram_index.get_id(data)
+                    if value_id is not None:
+                        if value_id not in self.right_candidates:
+                            return False
+                if self._right_regex is not None:
+                    return bool(self._right_regex.search(data))
                 result = re.search(self.right, data)
                 return bool(result)
 
@@ -0,0 +1,530 @@
+"""Module containing the logic for the columnar CSV table of dlapp.
+
+A CSV file is stored as one column per field instead of one dict per row.
+A column of repeated strings is dictionary-encoded, i.e. each distinct
+string is stored once and rows hold small integer codes.  A lookup is
+evaluated once per distinct value and rows are scanned column by column,
+so a row dict is only built for a matched row.
+"""
+
+import re
+from array import array
+from itertools import islice
+
+from dlapp.argumenthelper import validate_argument_type
+from dlapp.collection import List
+from dlapp.collection import Result
+from dlapp.collection import LookupCls
+from dlapp.collection import iter_filter_records
+from dlapp.collection import iter_path_records
+from dlapp.collection import get_limit
+from dlapp.collection import validate_search_order
+from dlapp.parser import SelectParser
+from dlapp.table import STOP_CHECK_INTERVAL
+from dlapp.utils import paused_gc
+
+# a number of rows which are read, transposed, or scanned at a time
+BLOCK_SIZE = 8192
+
+# a column stops being dictionary-encoded beyond this number of strings
+MAX_CATEGORIES = 65536
+
+INTEGER = re.compile(r'[+-]?[0-9]+\Z')
+FLOAT = re.compile(r'[+-]?([0-9]+[.]?[0-9]*|[.][0-9]+)([eE][+-]?[0-9]+)?\Z')
+
+
+class Missing:
+    """A marker of a key which a row does not have."""
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'MISSING'
+
+    def __reduce__(self):
+        return 'MISSING'
+
+
+MISSING = Missing()
+
+
+def convert_number(values):
+    """Convert strings to int or float if all of them are numeric.
+
+    Parameters
+    ----------
+    values (list): a list of values.
+
+    Returns
+    -------
+    list: a list of int or float, or None if a value is not numeric.
+    """
+    if not values or not all(isinstance(value, str) for value in values):
+        return None
+    if all(INTEGER.match(value) for value in values):
+        return [int(value) for value in values]
+    if all(FLOAT.match(value) for value in values):
+        return [float(value) for value in values]
+    return None
+
+
+class EncodedColumn:
+    """A dictionary-encoded column.
+
+    Attributes
+    ----------
+    codes (array): a code of each row, i.e. an index of categories.
+    categories (list): distinct values in order of first occurrence.
+
+    Methods
+    -------
+    extend(values) -> bool
+    extend_encoded(other) -> bool
+    get_mask(lookup_obj, start, stop) -> bytes
+    to_list() -> list
+    to_numeric() -> None
+    """
+    def __init__(self):
+        self.codes = array('B')
+        self.categories = []
+        self._index = dict()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getstate__(self):
+        return self.codes, self.categories
+
+    def __setstate__(self, state):
+        self.codes, self.categories = state
+        self._index = dict((value, code) for code, value in enumerate(self.categories))
+
+    def __getitem__(self, index):
+        return self.categories[self.codes[index]]
+
+    def extend(self, values):
+        """Append values.  Return False if there are too many distinct
+        values and column should not be encoded."""
+        index, categories = self._index, self.categories
+        for value in values:
+            if value not in index:
+                if len(categories) >= MAX_CATEGORIES:
+                    return False
+                index[value] = len(categories)
+                categories.append(value)
+        if len(categories) > 256 and self.codes.typecode == 'B':
+            self.codes = array('H', self.codes)
+        self.codes.extend(map(index.__getitem__, values))
+        return True
+
+    def get_mask(self, lookup_obj, start, stop):
+        """Get a byte per row of a range, 1 if a row is matched."""
+        is_right = lookup_obj.is_right
+        selected = bytes(
+            value is not MISSING and (not is_right or lookup_obj.is_right_matched(value))
+            for value in self.categories
+        )
+        codes = self.codes[start:stop]
+        if codes.typecode == 'B':
+            return codes.tobytes().translate(selected.ljust(256, b'\0'))
+        return bytes(map(selected.__getitem__, codes))
+
+    def extend_encoded(self, other):
+        """Append rows of another encoded column without decoding them.
+        Return False if there are too many distinct values."""
+        index, categories = self._index, self.categories
+        for value in other.categories:
+            if value not in index:
+                if len(categories) >= MAX_CATEGORIES:
+                    return False
+                index[value] = len(categories)
+                categories.append(value)
+        mapping = [index[value] for value in other.categories]
+        if len(categories) > 256 and self.codes.typecode == 'B':
+            self.codes = array('H', self.codes)
+        if mapping == list(range(len(mapping))):
+            self.codes.extend(other.codes)
+        elif other.codes.typecode == 'B' and self.codes.typecode == 'B':
+            table = bytes(mapping).ljust(256, b'\0')
+            self.codes.frombytes(other.codes.tobytes().translate(table))
+        else:
+            self.codes.extend(map(mapping.__getitem__, other.codes))
+        return True
+
+    def to_list(self):
+        """Decode all rows to a list of values."""
+        return list(map(self.categories.__getitem__, self.codes))
+
+    def to_numeric(self):
+        """Convert categories to numbers if all of them are numeric."""
+        categories = convert_number(self.categories)
+        if categories is not None:
+            self.categories = categories
+
+
+class ValueColumn:
+    """A plain column which stores a value per row.
+
+    Attributes
+    ----------
+    values (list, array): a value of each row.
+
+    Methods
+    -------
+    extend(values) -> bool
+    get_mask(lookup_obj, start, stop) -> bytes
+    to_list() -> list
+    to_numeric() -> None
+    """
+    def __init__(self, values=None):
+        self.values = [] if values is None else values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def extend(self, values):
+        """Append values."""
+        self.values.extend(values)
+        return True
+
+    def get_mask(self, lookup_obj, start, stop):
+        """Get a byte per row of a range, 1 if a row is matched."""
+        values = self.values[start:stop]
+        if not lookup_obj.is_right:
+            return bytes(value is not MISSING for value in values)
+        is_right_matched = lookup_obj.is_right_matched
+        return bytes(value is not MISSING and is_right_matched(value)
+                     for value in values)
+
+    def to_list(self):
+        """Get all rows as a list of values."""
+        return list(self.values)
+
+    def to_numeric(self):
+        """Convert values to an int or float array if all of them are numeric."""
+        values = convert_number(self.values)
+        if values is None:
+            return
+        try:
+            self.values = array('q' if isinstance(values[0], int) else 'd', values)
+        except OverflowError:
+            self.values = values
+
+
+class ColumnTable:
+    """A columnar, read-only table of CSV records.  It acts as a list of
+    row dicts and DLQuery searches it column by column.
+
+    Attributes
+    ----------
+    columns (dict): a column per key in order of keys of a row dict.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+    Methods
+    -------
+    from_csv_reader(reader, fieldnames=None, restkey=None, restval=None, numeric=False) -> ColumnTable
+    concat(tables, numeric=False) -> ColumnTable
+    get_row(index, keys=None) -> dict
+    to_list() -> list
+    iterfind(lookup, select='', limit=None, trigram_index=None, token_index=None, max_depth=None, order='dfs', predicate_workers=None, metrics=None, stop=None) -> generator
+    find(lookup, select='', trigram_index=None, token_index=None, limit=None, max_depth=None, order='dfs', predicate_workers=None, metrics=None) -> List
+    """
+    def __init__(self, columns, on_exception=False):
+        validate_argument_type(dict, columns=columns)
+        self.columns = columns
+        self.on_exception = on_exception
+        self._size = len(next(iter(columns.values()))) if columns else 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.get_row(i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('ColumnTable index out of range')
+        return self.get_row(index)
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self.get_row(index)
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __eq__(self, other):
+        if isinstance(other, (ColumnTable, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self):
+        fmt = '{}(columns={}, rows={})'
+        return fmt.format(type(self).__name__, list(self.columns), self._size)
+
+    @classmethod
+    def from_csv_reader(cls, reader, fieldnames=None, restkey=None,
+                        restval=None, numeric=False, columns=None):
+        """Build a table from a csv.reader with the same rows and keys as
+        csv.DictReader.
+
+        Parameters
+        ----------
+        reader (iterator): a csv.reader instance.
+        fieldnames (list): list of keys for the dict.  Default is None,
+                i.e. a first row of reader.
+        restkey (str): key to catch long rows.
+        restval (Any): default value for short rows.
+        numeric (bool): convert a column to int or float if all of its
+                values are numeric.  Default is False.
+        columns (callable): a function which takes a field name and
+                returns True to keep its column.  Default is None, i.e.
+                all columns.
+
+        Returns
+        -------
+        ColumnTable: a ColumnTable instance.
+        """
+        # collections would traverse growing columns again and again
+        with paused_gc():
+            return cls._from_csv_reader(reader, fieldnames=fieldnames,
+                                        restkey=restkey, restval=restval,
+                                        numeric=numeric, columns=columns)
+
+    @classmethod
+    def _from_csv_reader(cls, reader, fieldnames=None, restkey=None,
+                         restval=None, numeric=False, columns=None):
+        if fieldnames is None:
+            fieldnames = next(reader, None) or []
+        # a duplicate field keeps its first position and its last value
+        positions = dict((name, i) for i, name in enumerate(fieldnames))
+        is_rest_kept = True
+        if columns is not None:
+            positions = dict((name, i) for name, i in positions.items() if columns(name))
+            is_rest_kept = restkey is not None and columns(restkey)
+        columns = dict((name, EncodedColumn()) for name in positions)
+        rest_column, total = None, len(fieldnames)
+        count = 0
+
+        while True:
+            rows = [row for row in islice(reader, BLOCK_SIZE) if row != []]
+            if not rows:
+                break
+            rest = None
+            if set(map(len, rows)) != {total}:
+                rest = [row[total:] if len(row) > total else MISSING for row in rows]
+                rows = [row if len(row) == total
+                        else row[:total] + [restval] * (total - len(row))
+                        for row in rows]
+            block = list(zip(*rows)) if total else []
+            for name, position in positions.items():
+                column = columns[name]
+                if not column.extend(block[position]):
+                    columns[name] = column = ValueColumn(column.to_list())
+                    column.extend(block[position])
+
+            if rest is not None and is_rest_kept and rest_column is None:
+                rest_column = ValueColumn([MISSING] * count)
+            rest_column is not None and rest_column.extend(rest or [MISSING] * len(rows))
+            count += len(rows)
+
+        if rest_column is not None:
+            # extra values of a long row replace a field which is named restkey
+            if restkey in columns:
+                values = columns[restkey].to_list()
+                rest_column.values = [value if rest is MISSING else rest
+                                      for value, rest in zip(values, rest_column.values)]
+            columns[restkey] = rest_column
+        if numeric:
+            for column in columns.values():
+                column.to_numeric()
+        return cls(columns)
+
+    @classmethod
+    def concat(cls, tables, numeric=False):
+        """Concatenate tables, e.g. tables of chunks of a CSV file, in order.
+        Encoded columns are merged without decoding rows.
+
+        Parameters
+        ----------
+        tables (list): a list of ColumnTable instances.
+        numeric (bool): convert a column to int or float if all of its
+                values are numeric.  Default is False.
+
+        Returns
+        -------
+        ColumnTable: a ColumnTable instance.
+        """
+        names = []
+        for table in tables:
+            names.extend(name for name in table.columns if name not in names)
+
+        columns = dict()
+        with paused_gc():
+            for name in names:
+                column = EncodedColumn()
+                for table in tables:
+                    other = table.columns.get(name)
+                    if other is None:
+                        other = ValueColumn([MISSING] * len(table))
+                    if isinstance(column, EncodedColumn) and isinstance(other, EncodedColumn):
+                        if column.extend_encoded(other):
+                            continue
+                    if isinstance(column, EncodedColumn):
+                        column = ValueColumn(column.to_list())
+                    column.extend(other.to_list())
+                numeric and column.to_numeric()
+                columns[name] = column
+        return cls(columns)
+
+    def get_row(self, index, keys=None):
+        """Build a row dict.
+
+        Parameters
+        ----------
+        index (int): a row position.
+        keys (set): keys to build.  Default is None, i.e. all keys.
+
+        Returns
+        -------
+        dict: a row dict.
+        """
+        row = dict()
+        for key, column in self.columns.items():
+            if keys is None or key in keys:
+                value = column[index]
+                if value is not MISSING:
+                    row[key] = value
+        return row
+
+    def to_list(self):
+        """Build a list of row dicts."""
+        return list(self)
+
+    def iter_positions(self, lookup_obj, max_depth=None, stop=None):
+        """Scan columns block by block and yield (row, key) positions of
+        matched values in document order."""
+        if max_depth is not None and max_depth < 2:
+            return
+        names = [name for name in self.columns if lookup_obj.is_left_matched(name)]
+        columns = [self.columns[name] for name in names]
+        for start in range(0, self._size, BLOCK_SIZE):
+            if stop is not None and stop.is_set():
+                return
+            stop_ = min(start + BLOCK_SIZE, self._size)
+            masks = [column.get_mask(lookup_obj, start, stop_) for column in columns]
+            if len(masks) == 1:
+                mask, name = masks[0], names[0]
+                index = mask.find(1)
+                while index >= 0:
+                    yield start + index, name
+                    index = mask.find(1, index + 1)
+                continue
+            for index in range(stop_ - start):
+                if stop is not None and index % STOP_CHECK_INTERVAL == 0 and stop.is_set():
+                    return
+                for mask, name in zip(masks, names):
+                    if mask[index]:
+                        yield start + index, name
+
+    def iterfind(self, lookup, select='', limit=None, trigram_index=None,
+                 token_index=None, max_depth=None, order='dfs',
+                 predicate_workers=None, metrics=None, stop=None):
+        """Lazily search a lookup column by column and yield filtered
+        records in document order.  Rows are flat, so bfs order is the
+        same as dfs order.
+
+        Parameters
+        ----------
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        limit (int): a maximum number of result.  Default is None.
+        trigram_index (TrigramIndex): not used by columnar search.
+        token_index (TokenIndex): a token index of data.  Default is None.
+        max_depth (int): a maximum depth of matched key.  A key of row is
+                at depth 2.  Default is None.
+        order (str): dfs or bfs.  Default is dfs.
+        predicate_workers (int): a number of threads to evaluate a WHERE
+                clause.  Default is None.
+        metrics (FilterMetrics): a FilterMetrics instance to collect timing
+                metrics.  Default is None.
+        stop (threading.Event): a stop flag which ends a scan once it is
+                set.  Default is None.
+
+        Returns
+        -------
+        generator: a generator of filtered records.
+        """
+        validate_search_order(order)
+        lkup_obj = LookupCls(lookup)
+        select_obj = SelectParser(select, on_exception=self.on_exception,
+                                  token_index=token_index)
+        select_obj.parse_statement()
+        limit = get_limit(select_obj, limit=limit)
+        if limit is not None and limit <= 0:
+            return
+
+        if lkup_obj.path:
+            records = iter_path_records(self.to_list(), lkup_obj,
+                                        max_depth=max_depth, stop=stop)
+        else:
+            keys = None
+            if not select_obj.is_all_select:
+                keys = set(column for column in select_obj.columns
+                           if column is not None)
+                keys.update(select_obj.left_operands)
+            # a parent row is not needed without WHERE clause and columns
+            is_row_needed = keys is None or bool(keys)
+            columns = self.columns
+            records = (
+                Result(columns[name][index],
+                       parent=Result(self.get_row(index, keys=keys))
+                       if is_row_needed else None)
+                for index, name in self.iter_positions(lkup_obj, max_depth=max_depth,
+                                                       stop=stop)
+            )
+        result = iter_filter_records(records, select_obj,
+                                     on_exception=self.on_exception,
+                                     workers=predicate_workers, metrics=metrics)
+        for total, item in enumerate(result, 1):
+            yield item
+            if total == limit:
+                return
+
+    def find(self, lookup, select='', trigram_index=None, token_index=None,
+             limit=None, max_depth=None, order='dfs', predicate_workers=None,
+             metrics=None):
+        """Search a lookup column by column.
+
+        Parameters
+        ----------
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        trigram_index (TrigramIndex): not used by columnar search.
+        token_index (TokenIndex): a token index of data.  Default is None.
+        limit (int): a maximum number of result.  Default is None.
+        max_depth (int): a maximum depth of matched key.  Default is None.
+        order (str): dfs or bfs.  Default is dfs.
+        predicate_workers (int): a number of threads to evaluate a WHERE
+                clause.  Default is None.
+        metrics (FilterMetrics): a FilterMetrics instance to collect timing
+                metrics.  Default is None.
+
+        Returns
+        -------
+        List: list of record
+        """
+        result = List(self.iterfind(lookup, select=select, limit=limit,
+                                    trigram_index=trigram_index,
+                                    token_index=token_index,
+                                    max_depth=max_depth, order=order,
+                                    predicate_workers=predicate_workers,
+                                    metrics=metrics))
+        return result
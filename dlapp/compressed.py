@@ -0,0 +1,103 @@
+"""Module containing the logic for compressed file input of dlapp.
+
+A gzip, bzip2, or xz file is detected by its magic bytes, or by its
+extension if a file cannot be read twice, e.g. a named pipe.  It is
+decompressed while a parser reads it, so a decompressed copy is never
+written to disk or held in memory as a whole.
+"""
+
+import os
+import io
+import bz2
+import gzip
+import lzma
+import stat
+
+# magic bytes of compressed formats, the longest first
+MAGIC_BYTES = [
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'BZh', 'bz2'),
+    (b'\x1f\x8b', 'gzip'),
+]
+MAGIC_SIZE = max(len(magic) for magic, _ in MAGIC_BYTES)
+
+EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+
+# each opener takes a filename or a binary file object
+OPENERS = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+
+
+def get_compression_by_magic(data):
+    """Get a compression format of leading bytes, or None."""
+    for magic, compression in MAGIC_BYTES:
+        if data.startswith(magic):
+            return compression
+    return None
+
+
+def get_compression(file):
+    """Get a compression format of a file, i.e. gzip, bz2, or xz.
+
+    Parameters
+    ----------
+    file (str, os.PathLike): a filename.
+
+    Returns
+    -------
+    str: a compression format, or None if file is not compressed or is
+            not a filename.
+    """
+    if not isinstance(file, (str, bytes, os.PathLike)):
+        return None
+    try:
+        info = os.stat(file)
+    except (OSError, ValueError):
+        return None
+    if stat.S_ISREG(info.st_mode):
+        with open(file, 'rb') as stream:
+            return get_compression_by_magic(stream.read(MAGIC_SIZE))
+    # a pipe would lose bytes which are read ahead, so trust an extension
+    _, ext = os.path.splitext(os.fsdecode(file))
+    return EXTENSIONS.get(ext.lower())
+
+
+def strip_compression_extension(filename):
+    """Remove a compression extension, e.g. inventory.json.gz to
+    inventory.json."""
+    root, ext = os.path.splitext(filename)
+    return root if ext.lower() in EXTENSIONS else filename
+
+
+def open_input(file, binary=False, encoding=None, newline=None):
+    """Open a file for reading and decompress it on the fly if it is
+    compressed.  An uncompressed file is opened as by open().
+
+    Parameters
+    ----------
+    file (str, os.PathLike, io.BufferedReader): a filename, or a binary
+            stream which can peek, e.g. stdin opened in binary mode.
+    binary (bool): open in binary mode.  Default is False.
+    encoding (str): an encoding of text mode.  Default is None, i.e.
+            a locale encoding, as open() does.
+    newline (str): a newline mode of text mode.  Default is None.
+
+    Returns
+    -------
+    io.IOBase: a readable binary or text stream.
+    """
+    if hasattr(file, 'peek'):
+        compression = get_compression_by_magic(file.peek(MAGIC_SIZE)[:MAGIC_SIZE])
+        stream = OPENERS[compression](file, 'rb') if compression else file
+        if binary:
+            return stream
+        return io.TextIOWrapper(stream, encoding=encoding, newline=newline)
+
+    compression = get_compression(file)
+    if compression is None:
+        if binary:
+            return open(file, 'rb')
+        return open(file, encoding=encoding, newline=newline)
+    opener = OPENERS[compression]
+    if binary:
+        return opener(file, 'rb')
+    return opener(file, 'rt', encoding=encoding, newline=newline)
@@ -0,0 +1,502 @@
+"""Module containing the logic for the parallel CSV loading of dlapp.
+
+A CSV file is split to byte ranges which start at records.  A newline
+is a record boundary if an even number of quote characters precede it.
+That holds only if every quote character of a file opens or closes a
+quoted field, so each worker checks that its byte range is well-formed
+CSV before it parses it.  If a range is not well-formed, a file is read
+in a single process instead.
+
+A projection, i.e. columns argument, keeps only fields which a query
+needs, so that unneeded fields are never stored in a record.
+"""
+
+import io
+import re
+import csv
+import codecs
+import locale
+from operator import itemgetter
+
+from dlapp.collection import LookupCls
+from dlapp.columnar import ColumnTable
+from dlapp.compressed import open_input
+from dlapp.mapped import MappedFile
+from dlapp.mapped import is_mappable
+from dlapp.parallel import CHUNKS_PER_WORKER
+from dlapp.parallel import get_process_pool
+from dlapp.parallel import get_worker_count
+from dlapp.dlquery import DLQuery
+from dlapp.parser import SelectParser
+from dlapp.utils import paused_gc
+
+# a minimum file size in bytes which is worth parsing in a process pool
+PARALLEL_CSV_THRESHOLD = 16 * 2 ** 20
+
+# a number of bytes of which quote characters are counted at a time
+COUNT_BLOCK_SIZE = 2 ** 24
+
+
+class QueryColumns:
+    """A column filter which keeps fields that a lookup and a select
+    statement need, i.e. fields which match a left lookup, selected
+    columns, and keys of a WHERE clause.
+
+    Attributes
+    ----------
+    lookup_obj (LookupCls): a LookupCls instance.
+    keys (set): keys which a select statement refers to.
+    """
+    def __init__(self, lookup_obj, keys):
+        self.lookup_obj = lookup_obj
+        self.keys = set(keys)
+
+    def __call__(self, name):
+        return name in self.keys or self.lookup_obj.is_left_matched(name)
+
+    def __repr__(self):
+        fmt = '{}(lookup={!r}, keys={!r})'
+        return fmt.format(type(self).__name__, self.lookup_obj.lookup, sorted(self.keys))
+
+
+def get_query_columns(lookup='', select=''):
+    """Get a column filter of fields which a query needs.
+
+    Parameters
+    ----------
+    lookup (str): a search pattern.
+    select (str): a select statement.
+
+    Returns
+    -------
+    QueryColumns: a column filter, or None if a query needs all fields,
+            e.g. SELECT *, a lookup without a left lookup, or a path lookup.
+    """
+    lookup = DLQuery._get_lookup(lookup, select, False)
+    if lookup is None:
+        return None
+    select_obj = SelectParser(select, on_exception=False)
+    select_obj.parse_statement()
+    lookup_obj = LookupCls(lookup)
+    keys = select_obj.keep_keys
+    if keys is None or not lookup_obj.left or lookup_obj.path:
+        return None
+    return QueryColumns(lookup_obj, keys)
+
+
+def get_column_filter(columns):
+    """Get a function which takes a field name and returns True to keep it.
+
+    Parameters
+    ----------
+    columns (list, callable): a list of field names, or a function.
+
+    Returns
+    -------
+    callable: a column filter, or None if columns is None.
+    """
+    if columns is None or callable(columns):
+        return columns
+    return set(columns).__contains__
+
+
+def read_projected_rows(reader, is_kept, fieldnames=None, restkey=None,
+                        restval=None):
+    """Read records of a csv.reader which keep only fields of a column
+    filter.  Records are the same as csv.DictReader records without
+    dropped fields, i.e. extra values of a long row are kept if restkey
+    is kept, and a short row is padded with restval.
+
+    Parameters
+    ----------
+    reader (iterator): a csv.reader instance.
+    is_kept (callable): a column filter.
+    fieldnames (list): list of keys for the dict.  Default is None,
+            i.e. a first row of reader.
+    restkey (str): key to catch long rows.
+    restval (Any): default value for short rows.
+
+    Returns
+    -------
+    list: a list of dict.
+    """
+    if fieldnames is None:
+        fieldnames = next(reader, None)
+        if fieldnames is None:
+            return []
+    # a duplicate field keeps its first position and its last value
+    positions = dict((name, i) for i, name in enumerate(fieldnames))
+    names = [name for name in positions if is_kept(name)]
+    indexes = [positions[name] for name in names]
+    if len(indexes) > 1:
+        get_values = itemgetter(*indexes)
+    else:
+        def get_values(row_):
+            return [row_[index_] for index_ in indexes]
+    is_rest_kept = restkey is not None and is_kept(restkey)
+    total = len(fieldnames)
+
+    records = []
+    for row in reader:
+        size = len(row)
+        if size == total:
+            records.append(dict(zip(names, get_values(row))))
+        elif size > total:
+            record = dict(zip(names, get_values(row)))
+            if is_rest_kept:
+                record[restkey] = row[total:]
+            records.append(record)
+        elif size:
+            row = row + [restval] * (total - size)
+            records.append(dict(zip(names, get_values(row))))
+    return records
+
+
+def read_csv_rows(lines, fieldnames=None, restkey=None, restval=None,
+                  dialect='excel', *args, columnar=False, numeric=False,
+                  columns=None, **kwds):
+    """Read CSV records from lines in a single process.
+
+    Parameters
+    ----------
+    lines (iterable): a text stream which is opened with newline='', or
+            an iterable of lines.
+    fieldnames (list): list of keys for the dict.
+    restkey (str): key to catch long rows.
+    restval (Any): default value for short rows.
+    dialect (str): a CSV dialect.  Default is excel.
+    args (tuple): any argument for csv.reader.
+    columnar (bool): build a ColumnTable instead of a list of dict.
+            Default is False.
+    numeric (bool): with columnar, convert a column to int or float if
+            all of its values are numeric.  Default is False.
+    columns (list, callable): field names to keep, or a function which
+            takes a field name and returns True to keep it, e.g. a
+            QueryColumns instance.  Default is None, i.e. all fields.
+    kwds (dict): any keyword argument for csv.reader.
+
+    Returns
+    -------
+    list, ColumnTable: a list of dict, or a ColumnTable instance.
+    """
+    is_kept = get_column_filter(columns)
+    if columnar:
+        csv_reader = csv.reader(lines, dialect, *args, **kwds)
+        return ColumnTable.from_csv_reader(
+            csv_reader, fieldnames=fieldnames, restkey=restkey,
+            restval=restval, numeric=numeric, columns=is_kept
+        )
+    if is_kept is not None:
+        csv_reader = csv.reader(lines, dialect, *args, **kwds)
+        return read_projected_rows(csv_reader, is_kept, fieldnames=fieldnames,
+                                   restkey=restkey, restval=restval)
+    csv_reader = csv.DictReader(
+        lines, fieldnames=fieldnames, restkey=restkey,
+        restval=restval, dialect=dialect, *args, **kwds
+    )
+    return [row for row in csv_reader]
+
+
+def get_safe_dialect(dialect='excel', *args, **kwds):
+    """Get a dialect whose record boundaries can be found by counting
+    quote characters.
+
+    Returns
+    -------
+    csv.Dialect: a dialect, or None if a file should be read in a single
+            process, e.g. a dialect has an escape character.
+    """
+    dialect = csv.reader([], dialect, *args, **kwds).dialect
+    delimiter, quotechar = dialect.delimiter, dialect.quotechar
+    if dialect.escapechar is not None or dialect.skipinitialspace:
+        return None
+    if not (delimiter.isascii() and delimiter not in '\r\n'):
+        return None
+    if dialect.quoting != csv.QUOTE_NONE:
+        is_quote_safe = (
+            dialect.doublequote and quotechar is not None
+            and quotechar.isascii() and quotechar not in '\r\n' + delimiter
+        )
+        if not is_quote_safe:
+            return None
+    return dialect
+
+
+def get_quoted_pattern(dialect):
+    """Build a regex which matches a quoted field that a delimiter or
+    a line ending follows.
+
+    Parameters
+    ----------
+    dialect (csv.Dialect): a dialect of get_safe_dialect.
+
+    Returns
+    -------
+    re.Pattern: a bytes pattern, or None if a dialect ignores quotes.
+    """
+    if dialect.quoting == csv.QUOTE_NONE:
+        return None
+    delimiter = re.escape(dialect.delimiter.encode())
+    quote = re.escape(dialect.quotechar.encode())
+    # a field is unrolled, so a match fails in linear time
+    return re.compile(b'%s[^%s]*(?:%s%s[^%s]*)*%s(?![^%s\\r\\n])' % (
+        quote, quote, quote, quote, quote, quote, delimiter
+    ))
+
+
+def is_well_quoted(mm, start, stop, dialect):
+    """Check that every quote character of a byte range which starts at a
+    record opens or closes a quoted field, i.e. a delimiter or a line
+    ending surrounds each quoted field and no quote is left over.
+
+    Parameters
+    ----------
+    mm (mmap.mmap): a memory map of a CSV file.
+    start (int): a byte offset of a record.
+    stop (int): an end of a byte range.
+    dialect (csv.Dialect): a dialect of get_safe_dialect.
+
+    Returns
+    -------
+    bool: True if a byte range is well-formed CSV, otherwise, False.
+    """
+    pattern = get_quoted_pattern(dialect)
+    if pattern is None:
+        return True
+    quote = dialect.quotechar.encode()
+    separators = (dialect.delimiter + '\r\n').encode()
+    position = start
+    for match in pattern.finditer(mm, start, stop):
+        first, last = match.span()
+        if mm.find(quote, position, first) >= 0:
+            return False
+        if first > start and mm[first - 1] not in separators:
+            return False
+        position = last
+    return mm.find(quote, position, stop) < 0
+
+
+def read_header(mapped, dialect):
+    """Read a header record of a mapped CSV file.
+
+    Returns
+    -------
+    tuple: (fieldnames, a byte offset of a first data record).
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    consumed = [0]
+
+    def iter_lines():
+        for line in mapped.iter_lines():
+            consumed[0] += len(line)
+            yield decoder.decode(line)
+
+    # csv.reader pulls lines until a record ends, so consumed bytes end there
+    fieldnames = next(csv.reader(iter_lines(), dialect), None)
+    return fieldnames, consumed[0]
+
+
+def get_csv_chunks(mapped, start, count, quotechar=None):
+    """Split a mapped CSV file to (start, stop) byte ranges which begin at
+    newlines that an even number of quote characters precede.
+
+    Parameters
+    ----------
+    mapped (MappedFile): a mapped CSV file.
+    start (int): a byte offset of a first data record.
+    count (int): a number of chunks.
+    quotechar (str): a quote character, or None if a dialect ignores quotes.
+
+    Returns
+    -------
+    list: a list of (start, stop) byte ranges.
+    """
+    size, mm = mapped.size, mapped.mmap
+    quote = quotechar.encode() if quotechar else None
+
+    def count_quotes(start_, stop_):
+        if quote is None or start_ >= stop_:
+            return 0
+        return sum(mm[i:min(i + COUNT_BLOCK_SIZE, stop_)].count(quote)
+                   for i in range(start_, stop_, COUNT_BLOCK_SIZE))
+
+    boundaries, quotes = [start], 0
+    for i in range(1, count):
+        target = max(start + (size - start) * i // count, boundaries[-1])
+        quotes += count_quotes(boundaries[-1], target)
+        position = target
+        while True:
+            index = mm.find(b'\n', position)
+            if index < 0:
+                position = size
+                break
+            quotes += count_quotes(position, index + 1)
+            position = index + 1
+            if quotes % 2 == 0:
+                break
+        if position >= size:
+            break
+        boundaries.append(position)
+    boundaries.append(size)
+    return [(start_, stop_) for start_, stop_ in zip(boundaries, boundaries[1:])
+            if start_ < stop_]
+
+
+def read_csv_chunk(task):
+    """Check and parse a byte range of a CSV file in a worker process.
+
+    Parameters
+    ----------
+    task (tuple): (filename, start, stop, fieldnames, options).
+
+    Returns
+    -------
+    list, ColumnTable: records of a chunk, or None if a chunk is not
+            well-formed CSV.
+    """
+    filename, start, stop, fieldnames, options = task
+    options = dict(options)
+    args, kwds = options.pop('args'), options.pop('kwds')
+    restkey, restval = options.pop('restkey'), options.pop('restval')
+    dialect_name = options.pop('dialect')
+    dialect = get_safe_dialect(dialect_name, *args, **kwds)
+    with MappedFile(filename) as mapped:
+        if not is_well_quoted(mapped.mmap, start, stop, dialect):
+            return None
+        text = mapped.read_text(start, stop)
+    with paused_gc():
+        return read_csv_rows(io.StringIO(text, newline=''), fieldnames,
+                             restkey, restval, dialect_name, *args,
+                             **options, **kwds)
+
+
+def parallel_read_csv(filename, fieldnames=None, restkey=None, restval=None,
+                      dialect='excel', *args, workers=2, columnar=False,
+                      numeric=False, columns=None, **kwds):
+    """Read a UTF-8 CSV file with a process pool.  A file is split to byte
+    ranges at record boundaries, each worker parses its own range, and
+    records are concatenated in file order.  A file is read in a single
+    process if a dialect has an escape character or initial spaces are
+    skipped, a file is not a regular file, or a range is not well-formed
+    CSV, e.g. a quote character in the middle of an unquoted field.
+
+    Parameters
+    ----------
+    filename (str): a CSV file.
+    fieldnames (list): list of keys for the dict.
+    restkey (str): key to catch long rows.
+    restval (Any): default value for short rows.
+    dialect (str): a CSV dialect.  Default is excel.
+    args (tuple): any argument for csv.reader.
+    workers (int): a number of worker processes.  Default is 2.
+    columnar (bool): build a ColumnTable instead of a list of dict.
+            Default is False.
+    numeric (bool): with columnar, convert a column to int or float if
+            all of its values are numeric.  Default is False.
+    columns (list, callable): field names to keep, or a column filter.
+            Default is None, i.e. all fields.
+    kwds (dict): any keyword argument for csv.reader.
+
+    Returns
+    -------
+    list, ColumnTable: a list of dict, or a ColumnTable instance which
+            are identical to a single-process result.
+    """
+    def read_serially():
+        if not is_mappable(filename):
+            with open_input(filename, newline='') as stream:
+                return read_csv_rows(stream, fieldnames, restkey, restval,
+                                     dialect, *args, columnar=columnar,
+                                     numeric=numeric, columns=columns, **kwds)
+        with MappedFile(filename) as mapped:
+            return read_csv_rows(mapped.iter_text_lines(), fieldnames, restkey,
+                                 restval, dialect, *args, columnar=columnar,
+                                 numeric=numeric, columns=columns, **kwds)
+
+    dialect_obj = get_safe_dialect(dialect, *args, **kwds)
+    if dialect_obj is None or not is_mappable(filename):
+        return read_serially()
+
+    with MappedFile(filename) as mapped:
+        names, start = fieldnames, 0
+        if names is None:
+            names, start = read_header(mapped, dialect_obj)
+            if names is None:
+                return read_serially()
+        is_quoted = dialect_obj.quoting != csv.QUOTE_NONE
+        quotechar = dialect_obj.quotechar if is_quoted else None
+        chunks = get_csv_chunks(mapped, start, workers * CHUNKS_PER_WORKER,
+                                quotechar=quotechar)
+
+    # a column filter is resolved to names, which workers can unpickle
+    is_kept = get_column_filter(columns)
+    if is_kept is not None:
+        columns = [name for name in names if is_kept(name)]
+        restkey is not None and is_kept(restkey) and columns.append(restkey)
+
+    # workers build columns of chunks and numbers are converted once merged
+    options = dict(restkey=restkey, restval=restval, dialect=dialect,
+                   columnar=columnar, numeric=False, columns=columns,
+                   args=args, kwds=kwds)
+    executor, _ = get_process_pool(workers)
+    futures = []
+    try:
+        with paused_gc():
+            futures = [
+                executor.submit(read_csv_chunk,
+                                (filename, start_, stop_, names, options))
+                for start_, stop_ in chunks
+            ]
+            results = []
+            for future in futures:
+                result = future.result()
+                if result is None:
+                    break
+                results.append(result)
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+    if len(results) < len(futures):
+        return read_serially()
+    if columnar:
+        return ColumnTable.concat(results, numeric=numeric)
+    with paused_gc():
+        records = []
+        for result in results:
+            records.extend(result)
+        return records
+
+
+def read_csv_file(filename, fieldnames=None, restkey=None, restval=None,
+                  dialect='excel', *args, workers=None, columnar=False,
+                  numeric=False, columns=None, **kwds):
+    """Read a CSV file with a process pool if it is large enough and more
+    than one worker is available, otherwise, in a single process.
+
+    Parameters
+    ----------
+    filename (str): a CSV file.
+    workers (int): a number of worker processes.  It is capped by CPU
+            count.  Default is None, i.e. a single process.
+    Other parameters are the same as parallel_read_csv.
+
+    Returns
+    -------
+    list, ColumnTable: a list of dict, or a ColumnTable instance.
+    """
+    workers = get_worker_count(workers)
+    is_utf8 = codecs.lookup(locale.getpreferredencoding(False)).name == 'utf-8'
+    if workers > 1 and is_utf8 and is_mappable(filename):
+        with MappedFile(filename) as mapped:
+            is_large = mapped.size >= PARALLEL_CSV_THRESHOLD
+        if is_large:
+            return parallel_read_csv(filename, fieldnames, restkey, restval,
+                                     dialect, *args, workers=workers,
+                                     columnar=columnar, numeric=numeric,
+                                     columns=columns, **kwds)
+    with open_input(filename, newline='') as stream:
+        return read_csv_rows(stream, fieldnames, restkey, restval, dialect,
+                             *args, columnar=columnar, numeric=numeric,
+                             columns=columns, **kwds)
@@ -1,10 +1,23 @@
 """Module containing the logic for querying dictionary or list object."""
 import re
+import asyncio
 import operator
+import threading
 from dlapp import utils
 from dlapp.argumenthelper import validate_argument_type
+from dlapp.exceptions import SnapshotError
 # from dlapp.argumenthelper import validate_argument_is_not_empty
 from dlapp.collection import Element
+from dlapp.collection import List
+from dlapp.index import TrigramIndex
+from dlapp.index import TokenIndex
+from dlapp.index import KeySummary
+from dlapp.table import NodeTable
+from dlapp.columnar import ColumnTable
+from dlapp.shared import SharedDataset
+from dlapp.parallel import is_parallel
+from dlapp.parallel import parallel_find
+from dlapp.parallel import get_worker_count
 
 from dlapp.parser import SelectParser
 
@@ -14,7 +27,15 @@ class DLQuery:
 
     Attributes
     __________
-    data (list, tuple, or dict): list or dictionary instance.
+    data (list, tuple, dict, or ColumnTable): list or dictionary instance,
+            or a columnar table of CSV records.  Assigning new data clears
+            all indexes which were built for old data.
+    trigram_index (TrigramIndex): an optional trigram index of string values.
+    token_index (TokenIndex): an optional token index for word operators.
+    node_table (NodeTable): an optional flat node table of data.
+    key_summary (KeySummary): optional key summaries of containers of data.
+    snapshot (Snapshot): a snapshot cache entry if the instance was created
+            from a file with cache enabled, otherwise, None.
 
     Properties
     ----------
@@ -27,7 +48,19 @@ class DLQuery:
     values() -> dict_values or odict_values
     items() -> dict_items or odict_items
     get(index, default=None) -> Any
-    find(node=None, lookup='', select='') -> List
+    find(node=None, lookup='', select='', limit=None, max_depth=None, order='dfs', workers=None, predicate_workers=None, metrics=None) -> List
+    iterfind(lookup='', select='', limit=None, node=None, max_depth=None, order='dfs', predicate_workers=None, metrics=None, stop=None) -> generator
+    find_many(queries, node=None) -> list
+    aiterfind(lookup='', select='', limit=None, node=None, batch_size=1000, executor=None) -> async generator
+    afind(node=None, lookup='', select='', limit=None, batch_size=1000, executor=None) -> List
+    build_trigram_index() -> TrigramIndex
+    build_token_index(keys=None, tokenizer=None) -> TokenIndex
+    load_token_index(filename, tokenizer=None) -> TokenIndex
+    build_node_table() -> NodeTable
+    build_key_summary() -> KeySummary
+    save_snapshot() -> bool
+    create_shared_dataset(name=None) -> SharedDataset
+    save_dataset(filename) -> None
 
     Raise
     -----
@@ -35,10 +68,25 @@ class DLQuery:
     """
 
     def __init__(self, data):
-        validate_argument_type(list, tuple, dict, data=data)
         self.data = data
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        # indexes refer to containers of data by id(), so that indexes of
+        # old data would silently give wrong results for new data.
+        validate_argument_type(list, tuple, dict, ColumnTable, data=data)
+        self._data = data
         self._is_dict = None
         self._is_list = None
+        self.trigram_index = None
+        self.token_index = None
+        self.node_table = None
+        self.key_summary = None
+        self.snapshot = None
 
     ############################################################################
     # Special methods
@@ -88,9 +136,9 @@ class DLQuery:
 
     @property
     def is_list(self):
-        """Check if data of DLQuery is a list or tuple data."""
+        """Check if data of DLQuery is a list, tuple, or ColumnTable data."""
         if self._is_list is None:
-            self._is_list = isinstance(self.data, (list, tuple))
+            self._is_list = isinstance(self.data, (list, tuple, ColumnTable))
         return self._is_list
 
     ############################################################################
@@ -189,26 +237,132 @@ class DLQuery:
             else:
                 return default
 
-    def find(self, node=None, lookup='', select='', on_exception=False):
-        """recursively search a lookup.
+    def build_trigram_index(self):
+        """Build a trigram index of string values, or incrementally index
+        new string values if the index was already built.
+
+        Returns
+        -------
+        TrigramIndex: a trigram index instance.
+        """
+        if self.trigram_index is None:
+            self.trigram_index = TrigramIndex()
+        self.trigram_index.update(self.data)
+        return self.trigram_index
+
+    def build_token_index(self, keys=None, tokenizer=None):
+        """Build a token index which answers has_word and has_all_words
+        operators of WHERE clause.
 
         Parameters
         ----------
-        node (dict, list): a dict, dict-like, list, or list-like instance.
-        lookup (str): a search pattern.
-        select (str): a select statement.
-        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+        keys (list): a list of keys to index.  Default is None, i.e. all keys.
+        tokenizer (str, callable): a token pattern or a tokenizer function.
+                Default is None, i.e. \\w+ pattern.
 
         Returns
         -------
-        List: list of Any.
+        TokenIndex: a token index instance.
         """
-        node = node or self.data
+        self.token_index = TokenIndex(self.data, keys=keys, tokenizer=tokenizer)
+        return self.token_index
+
+    def load_token_index(self, filename, tokenizer=None):
+        """Load a saved token index and attach it to data.
+
+        Parameters
+        ----------
+        filename (str): a filename of saved token index.
+        tokenizer (callable): a tokenizer function if the saved index
+                was built with a tokenizer function.  Default is None.
+
+        Returns
+        -------
+        TokenIndex: a token index instance.
+        """
+        self.token_index = TokenIndex.load(filename, data=self.data,
+                                           tokenizer=tokenizer)
+        return self.token_index
+
+    def build_node_table(self):
+        """Build a flat node table of data.  Once it is built, find method
+        scans node table instead of building an Element tree per query.
+        Rebuild node table after data is modified.
+
+        Returns
+        -------
+        NodeTable: a node table instance.
+        """
+        self.node_table = NodeTable(self.data)
+        return self.node_table
+
+    def build_key_summary(self):
+        """Build key summaries of all containers of data.  Once they are
+        built, find method skips containers which cannot contain a key
+        of lookup.  Rebuild key summaries after data is modified.
+
+        Returns
+        -------
+        KeySummary: a key summary instance.
+        """
+        self.key_summary = KeySummary(self.data)
+        return self.key_summary
+
+    def save_snapshot(self):
+        """Save data and built indexes to the snapshot cache entry which
+        the instance was loaded from, so that a next load with cache
+        skips building them as well.  A token index with a tokenizer
+        function is not saved.
+
+        Returns
+        -------
+        bool: True if snapshot is saved, or False if file was modified
+                after it was parsed.
+
+        Raise
+        -----
+        SnapshotError: if the instance was created without cache.
+        """
+        if self.snapshot is None:
+            msg = 'Cannot save snapshot of an instance which was created without cache.'
+            raise SnapshotError(msg)
+        return self.snapshot.save(self)
+
+    def create_shared_dataset(self, name=None):
+        """Serialize data and its key index to a shared memory block which
+        worker processes attach to with SharedDataset.attach(name).  A
+        creator should call unlink() when no worker needs it anymore.
+
+        Parameters
+        ----------
+        name (str): a name of shared memory block.  Default is None,
+                i.e. a random name.
+
+        Returns
+        -------
+        SharedDataset: a SharedDataset instance.
+        """
+        return SharedDataset.create(self.data, name=name)
+
+    def save_dataset(self, filename):
+        """Serialize data and its key index to a binary dataset file which
+        worker processes memory-map with SharedDataset.open(filename).
+
+        Parameters
+        ----------
+        filename (str): a dataset filename.
+        """
+        SharedDataset.save(self.data, filename)
+
+    @classmethod
+    def _get_lookup(cls, lookup, select, on_exception):
+        """Get a lookup or derive it from a select statement if lookup is
+        empty.  Return None if both lookup and select are empty."""
         lookup = str(lookup).strip()
         if lookup == '':
 
             if select == '' or re.match(r'(?i)select +([*]|_+all_+) *$', select):
-                return node
+                return None
 
             parsed_obj = SelectParser(select, on_exception=on_exception)
             parsed_obj.parse_statement()
@@ -216,9 +370,287 @@ class DLQuery:
                 lookup = parsed_obj.columns[0]
             elif parsed_obj.left_operands:
                 lookup = parsed_obj.left_operands[0]
+        return lookup
+
+    def _prepare_search(self, node, lookup, select, on_exception):
+        """Prepare a searcher for find and iterfind.
+
+        Returns
+        -------
+        tuple: (node, lookup, searcher, kwargs).  searcher is None if
+                lookup and select are empty, i.e. node is the result.
+        """
+        is_own_data = node is None or node is self.data
+        kwargs = dict(
+            trigram_index=self.trigram_index if node is None else None,
+            token_index=self.token_index if node is None else None
+        )
+        node = node or self.data
+        lookup = self._get_lookup(lookup, select, on_exception)
+        if lookup is None:
+            return node, lookup, None, kwargs
+
+        # a columnar table is searched column by column
+        if isinstance(node, ColumnTable):
+            node.on_exception = on_exception
+            return node, lookup, node, kwargs
 
         validate_argument_type(list, tuple, dict, node=node)
 
+        if self.node_table is not None and is_own_data:
+            self.node_table.on_exception = on_exception
+            return node, lookup, self.node_table, kwargs
+
+        kwargs.update(key_summary=self.key_summary if is_own_data else None)
         elm_obj = Element(node, on_exception=on_exception)
-        records = elm_obj.find(lookup, select=select)
+        return node, lookup, elm_obj, kwargs
+
+    def iterfind(self, lookup='', select='', limit=None, node=None,
+                 on_exception=False, max_depth=None, order='dfs',
+                 predicate_workers=None, metrics=None, stop=None):
+        """Lazily search a lookup and yield results in document order or
+        breadth-first order.  Traversal stops as soon as enough results
+        are produced.
+
+        Parameters
+        ----------
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        limit (int): a maximum number of result.  Default is None.
+        node (dict, list): a dict, dict-like, list, or list-like instance.
+        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+        max_depth (int): a maximum depth of matched key.  Keys of node are
+                at depth 1 and a list item adds a level.  Default is None.
+        order (str): dfs for document order or bfs for nearest results
+                first.  Default is dfs.
+        predicate_workers (int): a number of threads to evaluate a WHERE
+                clause, e.g. a custom validator which blocks on I/O.
+                Result order is kept.  Default is None.
+        metrics (FilterMetrics): a FilterMetrics instance to collect timing
+                metrics of WHERE clause.  Default is None.
+        stop (threading.Event): a stop flag which ends traversal once it is
+                set, e.g. from another thread.  Default is None.
+
+        Returns
+        -------
+        generator: a generator of Any.
+        """
+        prepared = self._prepare_search(node, lookup, select, on_exception)
+        yield from self._iterfind_prepared(prepared, select=select, limit=limit,
+                                           max_depth=max_depth, order=order,
+                                           predicate_workers=predicate_workers,
+                                           metrics=metrics, stop=stop)
+
+    @classmethod
+    def _iterfind_prepared(cls, prepared, select='', limit=None, **kwargs):
+        """Yield results of a searcher of _prepare_search."""
+        node, lookup, searcher, search_kwargs = prepared
+        if searcher is None:
+            yield node
+            return
+
+        kwargs.update(search_kwargs)
+        yield from searcher.iterfind(lookup, select=select, limit=limit, **kwargs)
+
+    def find(self, node=None, lookup='', select='', on_exception=False,
+             limit=None, max_depth=None, order='dfs', workers=None,
+             predicate_workers=None, metrics=None):
+        """recursively search a lookup.
+
+        Parameters
+        ----------
+        node (dict, list): a dict, dict-like, list, or list-like instance.
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+        limit (int): a maximum number of result.  Default is None.
+        max_depth (int): a maximum depth of matched key.  Keys of node are
+                at depth 1 and a list item adds a level.  Default is None.
+        order (str): dfs for document order or bfs for nearest results
+                first.  Default is dfs.
+        workers (int): a number of worker processes to search chunks of
+                a large top-level list.  It is capped by CPU count.  A small
+                list, a bfs order, or a path lookup is searched in a single
+                process.  Default is None.
+        predicate_workers (int): a number of threads to evaluate a WHERE
+                clause, e.g. a custom validator which blocks on I/O.
+                Result order is kept.  Default is None.
+        metrics (FilterMetrics): a FilterMetrics instance to collect timing
+                metrics of WHERE clause.  It is not collected from worker
+                processes.  Default is None.
+
+        Returns
+        -------
+        List: list of Any.
+        """
+        node, lookup, searcher, kwargs = self._prepare_search(
+            node, lookup, select, on_exception
+        )
+        if searcher is None:
+            return node
+
+        if is_parallel(node, lookup, workers, order=order):
+            kwargs.update(key_summary=self.key_summary if node is self.data else None)
+            workers = get_worker_count(workers)
+            records = parallel_find(node, lookup, select=select, workers=workers,
+                                    limit=limit, max_depth=max_depth,
+                                    predicate_workers=predicate_workers,
+                                    on_exception=on_exception, **kwargs)
+            return records
+
+        records = searcher.find(lookup, select=select, limit=limit,
+                                max_depth=max_depth, order=order,
+                                predicate_workers=predicate_workers,
+                                metrics=metrics, **kwargs)
         return records
+
+    @classmethod
+    def _next_batch(cls, generator, batch_size, state):
+        """Pull a batch of results from a generator in an executor.  The
+        generator is closed here if a consumer stopped while pulling."""
+        batch = []
+        for item in generator:
+            batch.append(item)
+            if len(batch) >= batch_size or state['stop'].is_set():
+                break
+        with state['lock']:
+            state['is_busy'] = False
+            state['stop'].is_set() and generator.close()
+        return batch
+
+    def aiterfind(self, lookup='', select='', limit=None, node=None,
+                  on_exception=False, batch_size=1000, executor=None, **kwargs):
+        """Asynchronously search a lookup without blocking the event loop.
+        Traversal runs in an executor and results are delivered per batch.
+        Cancelling a consumer stops the traversal at the next container,
+        even if a query matches nothing.
+
+        Parameters
+        ----------
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        limit (int): a maximum number of result.  Default is None.
+        node (dict, list): a dict, dict-like, list, or list-like instance.
+        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+        batch_size (int): a number of results per executor call.  Default is 1000.
+        executor (concurrent.futures.Executor): a thread pool executor.
+                Default is None, i.e. a default executor of event loop.
+        kwargs (dict): other keyword arguments of iterfind method, e.g.
+                max_depth, order, predicate_workers, or metrics.
+
+        Returns
+        -------
+        async generator: an async generator of Any.
+        """
+        prepared = self._prepare_search(node, lookup, select, on_exception)
+        return self._aiterfind_prepared(prepared, select=select, limit=limit,
+                                        batch_size=batch_size,
+                                        executor=executor, **kwargs)
+
+    async def _aiterfind_prepared(self, prepared, select='', limit=None,
+                                  batch_size=1000, executor=None, **kwargs):
+        """Asynchronously yield results of a searcher of _prepare_search
+        which runs in an executor."""
+        loop = asyncio.get_event_loop()
+        state = dict(lock=threading.Lock(), stop=threading.Event(), is_busy=False)
+        generator = self._iterfind_prepared(prepared, select=select, limit=limit,
+                                            stop=state['stop'], **kwargs)
+        batch_size = max(1, int(batch_size))
+        try:
+            while True:
+                state['is_busy'] = True
+                batch = await loop.run_in_executor(
+                    executor, self._next_batch, generator, batch_size, state
+                )
+                for item in batch:
+                    yield item
+                if len(batch) < batch_size:
+                    return
+        finally:
+            # a busy executor call sees stop and closes generator itself
+            with state['lock']:
+                state['stop'].set()
+                is_busy = state['is_busy']
+            is_busy or generator.close()
+
+    async def afind(self, node=None, lookup='', select='', on_exception=False,
+                    limit=None, batch_size=1000, executor=None, **kwargs):
+        """Asynchronously search a lookup without blocking the event loop.
+
+        Parameters
+        ----------
+        node (dict, list): a dict, dict-like, list, or list-like instance.
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+        limit (int): a maximum number of result.  Default is None.
+        batch_size (int): a number of results per executor call.  Default is 1000.
+        executor (concurrent.futures.Executor): a thread pool executor.
+                Default is None, i.e. a default executor of event loop.
+        kwargs (dict): other keyword arguments of iterfind method, e.g.
+                max_depth, order, predicate_workers, or metrics.
+
+        Returns
+        -------
+        List: list of Any.
+        """
+        prepared = self._prepare_search(node, lookup, select, on_exception)
+        node, _, searcher, _ = prepared
+        if searcher is None:
+            return node
+
+        result = List()
+        async for item in self._aiterfind_prepared(prepared, select=select,
+                                                   limit=limit,
+                                                   batch_size=batch_size,
+                                                   executor=executor, **kwargs):
+            result.append(item)
+        return result
+
+    def find_many(self, queries, node=None, on_exception=False):
+        """Search many queries in a single pass over data.
+
+        Parameters
+        ----------
+        queries (list): a list of (lookup, select) pairs or lookups.
+        node (dict, list): a dict, dict-like, list, or list-like instance.
+        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+        Returns
+        -------
+        list: a list of results which are identical to results of
+                separate find calls.
+        """
+        is_own_data = node is None or node is self.data
+        kwargs = dict(
+            trigram_index=self.trigram_index if node is None else None,
+            token_index=self.token_index if node is None else None,
+            key_summary=self.key_summary if is_own_data else None
+        )
+        node = node or self.data
+        if isinstance(node, ColumnTable):
+            return [
+                self.find(node=node, lookup=query, on_exception=on_exception)
+                if isinstance(query, str) else
+                self.find(node=node, lookup=query[0], select=query[1],
+                          on_exception=on_exception)
+                for query in queries
+            ]
+        validate_argument_type(list, tuple, dict, node=node)
+
+        result = [None] * len(queries)
+        positions, compiled_queries = [], []
+        for i, query in enumerate(queries):
+            lookup, select = (query, '') if isinstance(query, str) else query
+            lookup = self._get_lookup(lookup, select, on_exception)
+            if lookup is None:
+                result[i] = node
+            else:
+                positions.append(i)
+                compiled_queries.append((lookup, select))
+
+        elm_obj = Element(node, on_exception=on_exception)
+        records = elm_obj.find_many(compiled_queries, **kwargs)
+        for i, lst in zip(positions, records):
+            result[i] = lst
+        return result
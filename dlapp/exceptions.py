@@ -37,6 +37,22 @@ class DLQueryDataTypeError(DLQueryError):
     """Use to capture error of unsupported query data type."""
 
 
+class ShardedDLQueryError(DLQueryError):
+    """Use to capture error for ShardedDLQuery instance."""
+
+
+class SharedDatasetError(Exception):
+    """Use to capture error for SharedDataset instance."""
+
+
+class JSONStreamError(Exception):
+    """Use to capture error for streaming JSON tokenizer."""
+
+
+class TokenIndexError(Exception):
+    """Use to capture error for TokenIndex instance."""
+
+
 class PredicateError(Exception):
     """Use to capture the predicate error."""
 
@@ -59,3 +75,11 @@ class ValidationOperatorError(ValidationError):
 
 class ParsedTimezoneError(Exception):
     """Use to capture timezone during parsing custom datetime."""
+
+
+class ParserBackendError(Exception):
+    """Use to capture error of unknown or unavailable parser backend."""
+
+
+class SnapshotError(Exception):
+    """Use to capture error for snapshot cache."""
@@ -2,16 +2,169 @@
 
 import yaml
 import json
-import csv
+import asyncio
+from collections import OrderedDict
+from functools import partial
 from dlapp import DLQuery
+from dlapp.exceptions import ParserBackendError
+from dlapp.csvfile import read_csv_rows
+from dlapp.csvfile import read_csv_file
+from dlapp.csvfile import QueryColumns
+from dlapp.stream import iter_jsonl_records
+from dlapp.stream import iter_yaml_documents
+from dlapp.stream import open_stream
+from dlapp.compressed import open_input
+from dlapp.mapped import MappedFile
+from dlapp.mapped import is_mappable
+from dlapp.snapshot import load_with_cache
 
+try:
+    import orjson
+except ImportError:     # pragma: no cover
+    orjson = None
 
-def create_from_json_file(filename, **kwargs):
+try:
+    import ujson
+except ImportError:     # pragma: no cover
+    ujson = None
+
+# parser backends of each file type, the fastest first
+PARSER_BACKENDS = dict(json=OrderedDict(), yaml=OrderedDict())
+
+# orjson reads an integer beyond 64 bits as a float, so auto-selection
+# leaves a document with a long run of digits to json module.  Digits are
+# translated to zeros and found as a substring, which is much faster than
+# a regex.
+DIGITS_TO_ZEROS = bytes.maketrans(b'123456789', b'0' * 9)
+LONG_DIGITS = b'0' * 19
+
+
+def register_backend(filetype, name, parser, fastest=False):
+    """Register a parser backend of a file type.
+
+    Parameters
+    ----------
+    filetype (str): a file type, i.e. json or yaml.
+    name (str): a backend name.
+    parser (callable, yaml.loader.Loader): a JSON loads function which
+            takes str or bytes, or a YAML loader class.
+    fastest (bool): auto-selection prefers this backend to all registered
+            backends.  Default is False, i.e. it is tried last.
+
+    Raise
+    -----
+    ParserBackendError: raise exception if file type is not supported.
+    """
+    if filetype not in PARSER_BACKENDS:
+        fmt = 'Parser backend does not support {!r} file type.'
+        raise ParserBackendError(fmt.format(filetype))
+    backends = PARSER_BACKENDS[filetype]
+    backends[name] = parser
+    fastest and backends.move_to_end(name, last=False)
+
+
+def get_backend_names(filetype):
+    """Get names of available parser backends of a file type, the
+    fastest first."""
+    return list(PARSER_BACKENDS.get(filetype, ()))
+
+
+def get_backend(filetype, backend=None):
+    """Get a parser backend of a file type.
+
+    Parameters
+    ----------
+    filetype (str): a file type, i.e. json or yaml.
+    backend (str): a backend name.  Default is None, i.e. auto-select
+            the fastest available backend.  auto is the same as None.
+
+    Returns
+    -------
+    tuple: (backend name, JSON loads function or YAML loader class).
+
+    Raise
+    -----
+    ParserBackendError: raise exception if backend is not available.
+    """
+    backends = PARSER_BACKENDS.get(filetype)
+    if not backends:
+        fmt = 'Parser backend does not support {!r} file type.'
+        raise ParserBackendError(fmt.format(filetype))
+    if backend is None or backend == 'auto':
+        name = next(iter(backends))
+        return name, backends[name]
+    if backend not in backends:
+        fmt = '{!r} {} parser backend is not available.  Choose one of {}.'
+        raise ParserBackendError(fmt.format(backend, filetype, ', '.join(backends)))
+    return backend, backends[backend]
+
+
+orjson and register_backend('json', 'orjson', orjson.loads)
+ujson and register_backend('json', 'ujson', ujson.loads)
+register_backend('json', 'json', json.loads)
+hasattr(yaml, 'CSafeLoader') and register_backend('yaml', 'libyaml', yaml.CSafeLoader)
+register_backend('yaml', 'pyyaml', yaml.SafeLoader)
+
+
+def parse_json(data, backend=None, **kwargs):
+    """Parse JSON data with a parser backend.
+
+    Parameters
+    ----------
+    data (str, bytes): JSON data.
+    backend (str): a backend name.  Default is None, i.e. auto-select.
+            Keyword arguments or data which a fast backend would read
+            differently, e.g. NaN, a lone surrogate, or an integer beyond
+            64 bits, are left to json module.
+    kwargs (dict): keyword arguments of json.loads.  Only json backend
+            takes them.
+
+    Returns
+    -------
+    Any: a parsed object.
+
+    Raise
+    -----
+    ParserBackendError: raise exception if backend is not available, or
+            does not take keyword arguments.
+    """
+    is_auto = backend is None or backend == 'auto'
+    name, loads = get_backend('json', 'json' if is_auto and kwargs else backend)
+    if kwargs and name != 'json':
+        fmt = '{!r} parser backend does not take keyword arguments {}.'
+        raise ParserBackendError(fmt.format(name, ', '.join(kwargs)))
+    if name == 'json':
+        return loads(data, **kwargs)
+    if is_auto:
+        raw = data.encode('utf-8', 'surrogatepass') if isinstance(data, str) else data
+        if LONG_DIGITS in bytes(raw).translate(DIGITS_TO_ZEROS):
+            return json.loads(data)
+        try:
+            return loads(data)
+        except ValueError:
+            # json module reads it or raises its own error
+            return json.loads(data)
+    return loads(data)
+
+
+def create_from_json_file(filename, use_mmap=False, backend=None,
+                          cache=False, **kwargs):
     """Create a dlapp instance from JSON filename.
 
     Parameters
     ----------
-    filename (str): JSON filename.
+    filename (str, io.IOBase): JSON filename, or a readable stream.  A
+            gzip, bzip2, or xz file is decompressed while it is parsed.
+    use_mmap (bool): decode a regular file directly from a memory map
+            instead of a buffered text stream.  A pipe, a character device
+            such as /dev/stdin, or a stream is read as usual.  Default is False.
+    backend (str): a JSON parser backend, i.e. orjson, ujson, or json.
+            Default is None, i.e. the fastest installed one.
+    cache (bool, str, SnapshotCache): reload a regular file from an
+            on-disk snapshot of parsed data while the file is unchanged.
+            True uses a default cache directory, and a string is a cache
+            directory.  A stream, or a file parsed with kwargs, is not
+            cached.  Default is False.
     kwargs (dict): keyword arguments which would use for JSON instantiation.
 
     Returns
@@ -19,98 +172,274 @@ def create_from_json_file(filename, **kwargs):
     DLQuery: a DLQuery instance.
     """
     from io import IOBase
-    if isinstance(filename, IOBase):
-        obj = json.load(filename, **kwargs)
-    else:
-        with open(filename) as stream:
-            obj = json.load(stream, **kwargs)
 
-    query_obj = DLQuery(obj)
+    def create():
+        if isinstance(filename, IOBase):
+            obj = parse_json(filename.read(), backend=backend, **kwargs)
+        elif use_mmap and is_mappable(filename):
+            with MappedFile(filename) as mapped:
+                obj = parse_json(mapped.read_text(), backend=backend, **kwargs)
+        else:
+            with open_input(filename) as stream:
+                obj = parse_json(stream.read(), backend=backend, **kwargs)
+        return DLQuery(obj)
+
+    # kwargs may hold hooks, which a snapshot cannot tell apart
+    query_obj = load_with_cache(not kwargs and cache, filename, create,
+                                filetype='json')
     return query_obj
 
 
-def create_from_json_data(data, **kwargs):
+def create_from_json_data(data, backend=None, **kwargs):
     """Create a dlapp instance from JSON data.
 
     Parameters
     ----------
     data (str): JSON data in string format.
+    backend (str): a JSON parser backend, i.e. orjson, ujson, or json.
+            Default is None, i.e. the fastest installed one.
     kwargs (dict): keyword arguments which would use for JSON instantiation.
 
     Returns
     -------
     DLQuery: a DLQuery instance.
     """
-    obj = json.loads(data, **kwargs)
+    obj = parse_json(data, backend=backend, **kwargs)
     query_obj = DLQuery(obj)
     return query_obj
 
 
-def create_from_yaml_file(filename, loader=yaml.SafeLoader):
-    """Create a dlapp instance from YAML file.
+def create_from_jsonl_file(filename, cache=False):
+    """Create a dlapp instance from JSON Lines (NDJSON) filename.  Each
+    non-blank line is a JSON record of a top-level list.
 
     Parameters
     ----------
-    filename (str): a YAML file.
-    loader (yaml.loader.Loader): a YAML loader.
+    filename (str, io.IOBase): JSON Lines filename, which may be gzip,
+            bzip2, or xz compressed, or a readable stream.
+    cache (bool, str, SnapshotCache): reload a regular file from an
+            on-disk snapshot while the file is unchanged.  Default is False.
+
+    Returns
+    -------
+    DLQuery: a DLQuery instance.
+    """
+    from io import IOBase
+
+    def create():
+        if isinstance(filename, IOBase):
+            obj = list(iter_jsonl_records(filename))
+        else:
+            with open_input(filename) as stream:
+                obj = list(iter_jsonl_records(stream))
+        return DLQuery(obj)
+
+    query_obj = load_with_cache(cache, filename, create, filetype='jsonl')
+    return query_obj
+
+
+def create_from_jsonl_data(data):
+    """Create a dlapp instance from JSON Lines (NDJSON) data.
+
+    Parameters
+    ----------
+    data (str): JSON Lines data in string format.
 
     Returns
     -------
     DLQuery: a DLQuery instance.
     """
-    with open(filename) as stream:
-        obj = yaml.load(stream, Loader=loader)
-        query_obj = DLQuery(obj)
-        return query_obj
+    from io import StringIO
+    obj = list(iter_jsonl_records(StringIO(data)))
+    query_obj = DLQuery(obj)
+    return query_obj
+
+
+def create_from_yaml_file(filename, loader=None, use_mmap=False, backend=None,
+                          cache=False):
+    """Create a dlapp instance from YAML file.  A multi-document file is
+    read with iter_from_yaml_file.
+
+    Parameters
+    ----------
+    filename (str, io.IOBase): a YAML file, which may be gzip, bzip2,
+            or xz compressed, or a readable stream.
+    loader (yaml.loader.Loader): a YAML loader.  Default is None, i.e. a
+            loader of backend.
+    use_mmap (bool): decode a regular file directly from a memory map
+            instead of a buffered text stream.  A pipe, a character device
+            such as /dev/stdin, or a stream is read as usual.  Default is False.
+    backend (str): a YAML parser backend, i.e. libyaml (yaml.CSafeLoader)
+            or pyyaml (yaml.SafeLoader).  Default is None, i.e. libyaml if
+            PyYAML is built with it.
+    cache (bool, str, SnapshotCache): reload a regular file from an
+            on-disk snapshot of parsed data while the file is unchanged.
+            A snapshot belongs to a loader.  Default is False.
+
+    Returns
+    -------
+    DLQuery: a DLQuery instance.
+    """
+    from io import IOBase
+    loader = loader or get_backend('yaml', backend)[1]
+
+    def create():
+        if isinstance(filename, IOBase):
+            obj = yaml.load(filename, Loader=loader)
+        elif use_mmap and is_mappable(filename):
+            # a YAML reader decodes chunks which it reads from a memory map
+            with MappedFile(filename) as mapped:
+                obj = yaml.load(mapped, Loader=loader)
+        else:
+            with open_input(filename) as stream:
+                obj = yaml.load(stream, Loader=loader)
+        return DLQuery(obj)
+
+    query_obj = load_with_cache(cache, filename, create, filetype='yaml',
+                                loader=loader)
+    return query_obj
 
 
-def create_from_yaml_data(data, loader=yaml.SafeLoader):
+def create_from_yaml_data(data, loader=None, backend=None):
     """Create a dlapp instance from YAML data.
 
     Parameters
     ----------
     data (str): a YAML data in string format.
-    loader (yaml.loader.Loader): a YAML loader.
+    loader (yaml.loader.Loader): a YAML loader.  Default is None, i.e. a
+            loader of backend.
+    backend (str): a YAML parser backend, i.e. libyaml or pyyaml.
+            Default is None, i.e. the fastest available one.
 
     Returns
     -------
     DLQuery: a DLQuery instance.
     """
+    loader = loader or get_backend('yaml', backend)[1]
     obj = yaml.load(data, Loader=loader)
     query_obj = DLQuery(obj)
     return query_obj
 
 
+def iter_from_yaml_file(filename, loader=None, backend=None):
+    """Lazily create a dlapp instance per document of a multi-document YAML
+    file, e.g. Kubernetes manifests which are separated by ---.  A document
+    is parsed when a next instance is requested, and an empty document is
+    skipped.
+
+    Parameters
+    ----------
+    filename (str, io.IOBase): a YAML file, or a readable stream.
+    loader (yaml.loader.Loader): a YAML loader.  Default is None, i.e. a
+            loader of backend.
+    backend (str): a YAML parser backend, i.e. libyaml or pyyaml.
+            Default is None, i.e. the fastest available one.
+
+    Returns
+    -------
+    generator: a generator of DLQuery instances.
+    """
+    stream, is_opened = open_stream(filename)
+    try:
+        for document in iter_yaml_documents(stream, loader=loader, backend=backend):
+            yield DLQuery(document)
+    finally:
+        is_opened and stream.close()
+
+
+def iter_from_yaml_data(data, loader=None, backend=None):
+    """Lazily create a dlapp instance per document of multi-document
+    YAML data.
+
+    Parameters
+    ----------
+    data (str): a YAML data in string format.
+    loader (yaml.loader.Loader): a YAML loader.  Default is None.
+    backend (str): a YAML parser backend.  Default is None, i.e. auto-select.
+
+    Returns
+    -------
+    generator: a generator of DLQuery instances.
+    """
+    for document in iter_yaml_documents(data, loader=loader, backend=backend):
+        yield DLQuery(document)
+
+
 def create_from_csv_file(filename, fieldnames=None, restkey=None,
-                         restval=None, dialect='excel', *args, **kwds):
+                         restval=None, dialect='excel', *args,
+                         use_mmap=False, columnar=False, numeric=False,
+                         workers=None, cache=False, columns=None, **kwds):
     """Create a dlapp instance from CSV file.
 
     Parameters
     ----------
-    filename (str): a CSV file.
+    filename (str, io.IOBase): a CSV file, or a readable stream which is
+            opened with newline=''.  A compressed file is read in a single
+            process and decompressed on the fly.
     fieldnames (list): list of keys for the dict.
     restkey (str): key to catch long rows.
     restval (Any): default value for short rows.
     dialect (str): a CSV dialect.  Default is excel.
     args (tuple): any argument for csv.DictReader.
+    use_mmap (bool): decode lines of a regular file directly from a memory
+            map instead of a buffered text stream.  A pipe, a character
+            device such as /dev/stdin, or a stream is read as usual.
+            Default is False.
+    columnar (bool): store a column per field in a ColumnTable instead
+            of a dict per row.  Repeated strings are dictionary-encoded and
+            find method searches column by column.  Default is False.
+    numeric (bool): with columnar, convert a column to int or float if
+            all of its values are numeric.  Default is False.
+    workers (int): parse byte ranges of a regular UTF-8 file of at least
+            16 MiB in this many worker processes, capped by CPU count.
+            A smaller file, a stream, or a file which cannot be split
+            safely is read in a single process.  Default is None.
+    cache (bool, str, SnapshotCache): reload a regular file from an
+            on-disk snapshot of parsed rows while the file is unchanged.
+            A snapshot belongs to CSV arguments.  Default is False.
+    columns (list, callable): field names to keep, or a function which
+            takes a field name and returns True to keep it, e.g. a column
+            filter of get_query_columns(lookup, select).  Other fields are
+            dropped while rows are parsed.  Default is None, i.e. all fields.
     kwds (dict): any keyword argument for csv.DictReader.
 
     Returns
     -------
     DLQuery: a DLQuery instance.
     """
-    with open(filename, newline='') as stream:
-        csv_reader = csv.DictReader(
-            stream, fieldnames=fieldnames, restkey=restkey,
-            restval=restval, dialect=dialect, *args, **kwds
-        )
-        lst_of_dict = [row for row in csv_reader]
-        query_obj = DLQuery(lst_of_dict)
-        return query_obj
+    from io import IOBase
+
+    def read_rows(lines):
+        return read_csv_rows(lines, fieldnames, restkey, restval, dialect,
+                             *args, columnar=columnar, numeric=numeric,
+                             columns=columns, **kwds)
+
+    def create():
+        if isinstance(filename, IOBase):
+            lst_of_dict = read_rows(filename)
+        elif use_mmap and is_mappable(filename):
+            with MappedFile(filename) as mapped:
+                lst_of_dict = read_rows(mapped.iter_text_lines())
+        else:
+            lst_of_dict = read_csv_file(filename, fieldnames, restkey, restval,
+                                        dialect, *args, workers=workers,
+                                        columnar=columnar, numeric=numeric,
+                                        columns=columns, **kwds)
+        return DLQuery(lst_of_dict)
+
+    # a snapshot cannot tell functions apart, unlike names or QueryColumns
+    is_cacheable = not callable(columns) or isinstance(columns, QueryColumns)
+    query_obj = load_with_cache(is_cacheable and cache, filename, create,
+                                filetype='csv', fieldnames=fieldnames,
+                                restkey=restkey, restval=restval,
+                                dialect=dialect, args=args, columnar=columnar,
+                                numeric=numeric, columns=columns, kwds=kwds)
+    return query_obj
 
 
 def create_from_csv_data(data, fieldnames=None, restkey=None,
-                         restval=None, dialect='excel', *args, **kwds):
+                         restval=None, dialect='excel', *args,
+                         columnar=False, numeric=False, **kwds):
     """Create a dlapp instance from CSV data.
 
     Parameters
@@ -121,6 +450,10 @@ def create_from_csv_data(data, fieldnames=None, restkey=None,
     restval (Any): default value for short rows.
     dialect (str): a CSV dialect.  Default is excel.
     args (tuple): any argument for csv.DictReader.
+    columnar (bool): store a column per field in a ColumnTable instead
+            of a dict per row.  Default is False.
+    numeric (bool): with columnar, convert a column to int or float if
+            all of its values are numeric.  Default is False.
     kwds (dict): any keyword argument for csv.DictReader.
 
     Returns
@@ -130,10 +463,87 @@ def create_from_csv_data(data, fieldnames=None, restkey=None,
     from io import StringIO
     data = str(data).strip()
     stream = StringIO(data)
-    csv_reader = csv.DictReader(
-        stream, fieldnames=fieldnames, restkey=restkey,
-        restval=restval, dialect=dialect, *args, **kwds
-    )
-    lst_of_dict = [row for row in csv_reader]
+    lst_of_dict = read_csv_rows(stream, fieldnames, restkey, restval, dialect,
+                                *args, columnar=columnar, numeric=numeric,
+                                **kwds)
     query_obj = DLQuery(lst_of_dict)
     return query_obj
+
+
+async def acreate_from_json_file(filename, executor=None, **kwargs):
+    """Create a dlapp instance from JSON filename without blocking
+    the event loop.
+
+    Parameters
+    ----------
+    filename (str): JSON filename.
+    executor (concurrent.futures.Executor): an executor to parse file.
+            Default is None, i.e. a default executor of event loop.
+    kwargs (dict): keyword arguments which would use for JSON instantiation.
+
+    Returns
+    -------
+    DLQuery: a DLQuery instance.
+    """
+    loop = asyncio.get_event_loop()
+    func = partial(create_from_json_file, filename, **kwargs)
+    query_obj = await loop.run_in_executor(executor, func)
+    return query_obj
+
+
+async def acreate_from_yaml_file(filename, loader=None, executor=None,
+                                 use_mmap=False, backend=None, cache=False):
+    """Create a dlapp instance from YAML file without blocking
+    the event loop.
+
+    Parameters
+    ----------
+    filename (str): a YAML file.
+    loader (yaml.loader.Loader): a YAML loader.  Default is None, i.e. a
+            loader of backend.
+    executor (concurrent.futures.Executor): an executor to parse file.
+            Default is None, i.e. a default executor of event loop.
+    use_mmap (bool): decode a regular file directly from a memory map.
+            Default is False.
+    backend (str): a YAML parser backend.  Default is None, i.e. auto-select.
+    cache (bool, str, SnapshotCache): reload file from an on-disk snapshot
+            while it is unchanged.  Default is False.
+
+    Returns
+    -------
+    DLQuery: a DLQuery instance.
+    """
+    loop = asyncio.get_event_loop()
+    func = partial(create_from_yaml_file, filename, loader=loader,
+                   use_mmap=use_mmap, backend=backend, cache=cache)
+    query_obj = await loop.run_in_executor(executor, func)
+    return query_obj
+
+
+async def acreate_from_csv_file(filename, fieldnames=None, restkey=None,
+                                restval=None, dialect='excel', *args,
+                                executor=None, **kwds):
+    """Create a dlapp instance from CSV file without blocking
+    the event loop.
+
+    Parameters
+    ----------
+    filename (str): a CSV file.
+    fieldnames (list): list of keys for the dict.
+    restkey (str): key to catch long rows.
+    restval (Any): default value for short rows.
+    dialect (str): a CSV dialect.  Default is excel.
+    executor (concurrent.futures.Executor): an executor to parse file.
+            Default is None, i.e. a default executor of event loop.
+    args (tuple): any argument for csv.DictReader.
+    kwds (dict): any keyword argument for csv.DictReader.
+
+    Returns
+    -------
+    DLQuery: a DLQuery instance.
+    """
+    loop = asyncio.get_event_loop()
+    func = partial(create_from_csv_file, filename, fieldnames, restkey,
+                   restval, dialect, *args, **kwds)
+    query_obj = await loop.run_in_executor(executor, func)
+    return query_obj
@@ -0,0 +1,647 @@
+"""Module containing the logic for the optional index of dlapp."""
+
+import re
+import sys
+import json
+from zlib import crc32
+
+try:
+    import re._parser as sre_parse
+except ImportError:     # pragma: no cover
+    import sre_parse    # noqa
+
+from dlapp.argumenthelper import validate_argument_type
+
+from dlapp.exceptions import TokenIndexError
+
+DEFAULT_TOKEN_PATTERN = r'\w+'
+DEFAULT_SUMMARY_BITS = 256
+
+
+def iter_records(data):
+    """Iterate all dictionaries of data in depth-first document order.
+
+    Parameters
+    ----------
+    data (dict, list): a dict, dict-like, list, or list-like instance.
+
+    Returns
+    -------
+    generator: a generator of dict instances.
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            yield node
+            children = list(node.values())
+        elif isinstance(node, (list, tuple, set)):
+            children = list(node)
+        else:
+            continue
+        for child in reversed(children):
+            if isinstance(child, (dict, list, tuple, set)):
+                stack.append(child)
+
+
+def iter_containers(data):
+    """Iterate all containers of data, i.e. dict, list, tuple, or set
+    instances, in depth-first document order.
+
+    Parameters
+    ----------
+    data (dict, list): a dict, dict-like, list, or list-like instance.
+
+    Returns
+    -------
+    generator: a generator of containers.
+    """
+    container_types = (dict, list, tuple, set)
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        yield node
+        values = node.values() if isinstance(node, dict) else node
+        children = [child for child in values if isinstance(child, container_types)]
+        children.reverse()
+        stack.extend(children)
+
+
+def tokenize(text, tokenizer=DEFAULT_TOKEN_PATTERN):
+    """Split text to a set of lowercase tokens.
+
+    Parameters
+    ----------
+    text (str): a text.
+    tokenizer (str, callable): a regular expression pattern of a token or
+            a callable function which returns an iterable of tokens.
+            Default is \\w+ pattern.
+
+    Returns
+    -------
+    set: a set of tokens.
+    """
+    if callable(tokenizer):
+        return set(tokenizer(str(text)))
+    return {token.lower() for token in re.findall(tokenizer, str(text))}
+
+
+def iter_string_values(data):
+    """Iterate all string values of a dictionary or list without recursion.
+
+    Parameters
+    ----------
+    data (dict, list): a dict, dict-like, list, or list-like instance.
+
+    Returns
+    -------
+    generator: a generator of string values.
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            values = node.values()
+        elif isinstance(node, (list, tuple, set)):
+            values = node
+        else:
+            continue
+        for value in values:
+            if isinstance(value, str):
+                yield value
+            elif isinstance(value, (dict, list, tuple, set)):
+                stack.append(value)
+
+
+class CaseFoldTable(dict):
+    """A str.translate table which folds a character to one character, so
+    that two characters which re.IGNORECASE matches are folded to the same
+    character.  str.casefold cannot be used because it can change a length
+    of text, e.g. 'İ'.casefold() is 'i̇' while re matches 'İ' with 'i'."""
+    # pairs which re.IGNORECASE matches but upper().lower() does not join
+    fixes = {0x1fd3: 0x390, 0x1fe3: 0x3b0, 0xfb05: 0xfb06}
+
+    def __missing__(self, code):
+        char = chr(self.fixes.get(code, code))
+        upper = char.upper()
+        lower = (upper if len(upper) == 1 else char).lower()
+        self[code] = lower[0] if lower else char
+        return self[code]
+
+
+CASE_FOLD_TABLE = CaseFoldTable()
+
+
+def fold_case(text):
+    """Fold case of text one character at a time as re.IGNORECASE does."""
+    if getattr(text, 'isascii', bool)():
+        return text.lower()
+    return text.translate(CASE_FOLD_TABLE)
+
+
+def get_trigrams(text):
+    """Get a set of case-folded trigrams of text.
+
+    Parameters
+    ----------
+    text (str): a text.
+
+    Returns
+    -------
+    set: a set of trigrams.
+    """
+    text = fold_case(text)
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def get_required_literals(pattern):
+    """Extract literal strings that any match of pattern must contain.
+
+    Parameters
+    ----------
+    pattern (str): a regular expression pattern.
+
+    Returns
+    -------
+    list: a list of literal strings.  An empty list means
+            the pattern cannot be narrowed by literals.
+    """
+    def walk_(subpattern_, result_):
+        run = []
+        for op, av in subpattern_:
+            if op is sre_parse.LITERAL:
+                run.append(chr(av))
+                continue
+            if op is sre_parse.AT:
+                continue
+
+            run and result_.append(''.join(run))
+            run = []
+            if op is sre_parse.SUBPATTERN:
+                walk_(av[-1], result_)
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+                min_, _, item = av
+                min_ > 0 and walk_(item, result_)
+        run and result_.append(''.join(run))
+
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception as ex:     # noqa
+        return []
+
+    result = []
+    walk_(parsed, result)
+    return [literal for literal in result if len(literal) >= 3]
+
+
+class TrigramIndex:
+    """Trigram index over distinct string values of a dictionary or list.
+
+    The index narrows candidate values of a wildcard or regex right lookup
+    to values containing all trigrams of the literals that the pattern
+    requires.  A full regex match still has to run on candidates.
+
+    Attributes
+    ----------
+    values (list): distinct string values.  A position is a value id.
+    trigrams (dict): a mapping of trigram to a set of value ids.
+
+    Methods
+    -------
+    add(value) -> None
+    update(data) -> None
+    get_id(value) -> int or None
+    get_candidates(pattern) -> set or None
+    memory_usage() -> int
+    """
+    def __init__(self, data=None):
+        self.values = []
+        self.trigrams = dict()
+        self._ids = dict()
+        data is not None and self.update(data)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value):
+        return value in self._ids
+
+    def add(self, value):
+        """Add a string value to index if it is not indexed yet.
+
+        Parameters
+        ----------
+        value (str): a string value.
+        """
+        if not isinstance(value, str) or value in self._ids:
+            return
+
+        value_id = len(self.values)
+        self.values.append(value)
+        self._ids[value] = value_id
+        for trigram in get_trigrams(value):
+            ids = self.trigrams.get(trigram)
+            if ids is None:
+                self.trigrams[trigram] = {value_id}
+            else:
+                ids.add(value_id)
+
+    def update(self, data):
+        """Incrementally index all string values of data.
+
+        Parameters
+        ----------
+        data (dict, list): a dict, dict-like, list, or list-like instance.
+        """
+        validate_argument_type(list, tuple, dict, data=data)
+        for value in iter_string_values(data):
+            self.add(value)
+
+    def get_id(self, value):
+        """Get a value id of an indexed value, otherwise, None."""
+        return self._ids.get(value)
+
+    def get_candidates(self, pattern):
+        """Get a set of value ids which possibly match a pattern.
+
+        Parameters
+        ----------
+        pattern (str): a regular expression pattern.
+
+        Returns
+        -------
+        set: a set of value ids, or None if pattern cannot be narrowed.
+        """
+        trigrams = set()
+        for literal in get_required_literals(pattern):
+            trigrams.update(get_trigrams(literal))
+
+        if not trigrams:
+            return None
+
+        lst = []
+        for trigram in trigrams:
+            ids = self.trigrams.get(trigram)
+            if not ids:
+                return set()
+            lst.append(ids)
+
+        lst.sort(key=len)
+        candidates = set(lst[0])
+        for ids in lst[1:]:
+            candidates.intersection_update(ids)
+            if not candidates:
+                break
+        return candidates
+
+    def memory_usage(self):
+        """Return an estimated size in bytes of index structures.
+
+        Indexed string values are shared with the data so that
+        they are not counted.
+        """
+        total = sys.getsizeof(self.values) + sys.getsizeof(self._ids)
+        total += sys.getsizeof(self.trigrams)
+        for trigram, ids in self.trigrams.items():
+            total += sys.getsizeof(trigram) + sys.getsizeof(ids)
+        return total
+
+
+class TokenIndex:
+    """Inverted token index which maps a word of string value to positions
+    of records containing that word.
+
+    A record position is an order of a dictionary in depth-first
+    document order of data.
+
+    Attributes
+    ----------
+    keys (list): a list of indexed keys.  None means all keys.
+    tokenizer (str, callable): a token pattern or a tokenizer function.
+    tokens (dict): a mapping of key to a mapping of token to positions.
+    total (int): total of records.
+
+    Methods
+    -------
+    tokenize(text) -> set
+    build(data) -> None
+    attach(data) -> None
+    is_indexed(key) -> bool
+    get_position(record) -> int or None
+    get_positions(key, word) -> set
+    find_positions(key, words) -> set
+    save(filename) -> None
+    TokenIndex.load(filename, data=None, tokenizer=None) -> TokenIndex
+
+    A pickled index does not keep record positions, which refer to
+    records by id(), so that it has to attach to unpickled data.
+
+    Raise
+    -----
+    TokenIndexError: if index cannot attach to data or cannot be saved.
+    """
+    def __init__(self, data=None, keys=None, tokenizer=DEFAULT_TOKEN_PATTERN):
+        self.keys = None if keys is None else list(keys)
+        self.tokenizer = tokenizer or DEFAULT_TOKEN_PATTERN
+        self.tokens = dict()
+        self.total = 0
+        self._positions = dict()
+        data is not None and self.build(data)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_positions'] = dict()
+        return state
+
+    def tokenize(self, text):
+        """Split text to a set of tokens with index tokenizer."""
+        return tokenize(text, tokenizer=self.tokenizer)
+
+    def is_indexed(self, key):
+        """Return True if a key is indexed."""
+        return self.keys is None or key in self.keys
+
+    def build(self, data):
+        """Build index for all records of data.
+
+        Parameters
+        ----------
+        data (dict, list): a dict, dict-like, list, or list-like instance.
+        """
+        validate_argument_type(list, tuple, dict, data=data)
+        self.tokens = dict()
+        self._positions = dict()
+        for position, record in enumerate(iter_records(data)):
+            self._positions[id(record)] = position
+            for key, value in record.items():
+                if not isinstance(value, str) or not self.is_indexed(key):
+                    continue
+                tbl = self.tokens.setdefault(key, dict())
+                for token in self.tokenize(value):
+                    positions = tbl.get(token)
+                    if positions is None:
+                        tbl[token] = {position}
+                    else:
+                        positions.add(position)
+        self.total = len(self._positions)
+
+    def attach(self, data):
+        """Attach a loaded index to data by recomputing record positions.
+
+        Parameters
+        ----------
+        data (dict, list): a dict, dict-like, list, or list-like instance.
+        """
+        validate_argument_type(list, tuple, dict, data=data)
+        positions = dict()
+        for position, record in enumerate(iter_records(data)):
+            positions[id(record)] = position
+        if len(positions) != self.total:
+            fmt = 'Cannot attach index of {} records to data of {} records.'
+            raise TokenIndexError(fmt.format(self.total, len(positions)))
+        self._positions = positions
+
+    def get_position(self, record):
+        """Get a position of record if it is indexed, otherwise, None."""
+        return self._positions.get(id(record))
+
+    def get_positions(self, key, word):
+        """Get a set of positions of records which key contains word."""
+        return self.tokens.get(key, dict()).get(word, set())
+
+    def find_positions(self, key, words):
+        """Get a set of positions of records which key contains all words.
+
+        Parameters
+        ----------
+        key (str): a key of record.
+        words (str, list): a text or a list of words.
+
+        Returns
+        -------
+        set: a set of record positions.
+        """
+        if isinstance(words, str):
+            words = self.tokenize(words)
+        lst = sorted((self.get_positions(key, word) for word in words), key=len)
+        if not lst:
+            return set()
+        result = set(lst[0])
+        for positions in lst[1:]:
+            result.intersection_update(positions)
+        return result
+
+    def save(self, filename):
+        """Save index to a JSON file.
+
+        Parameters
+        ----------
+        filename (str): a JSON filename.
+        """
+        if callable(self.tokenizer):
+            tokenizer = None
+        else:
+            tokenizer = self.tokenizer
+
+        tokens = dict()
+        for key, tbl in self.tokens.items():
+            tokens[key] = {token: sorted(positions) for token, positions in tbl.items()}
+
+        obj = dict(keys=self.keys, tokenizer=tokenizer,
+                   total=self.total, tokens=tokens)
+        try:
+            with open(filename, 'w') as stream:
+                json.dump(obj, stream)
+        except TypeError as ex:
+            raise TokenIndexError('Failed to save index - {}'.format(ex))
+
+    @classmethod
+    def load(cls, filename, data=None, tokenizer=None):
+        """Load index from a JSON file.
+
+        Parameters
+        ----------
+        filename (str): a JSON filename.
+        data (dict, list): data to attach index.  Default is None.
+        tokenizer (callable): a tokenizer function if the saved index
+                was built with a tokenizer function.  Default is None.
+
+        Returns
+        -------
+        TokenIndex: a token index instance.
+        """
+        with open(filename) as stream:
+            obj = json.load(stream)
+
+        tokenizer = tokenizer or obj.get('tokenizer')
+        if not tokenizer:
+            msg = 'A tokenizer function is required to load this index.'
+            raise TokenIndexError(msg)
+
+        index = cls(keys=obj.get('keys'), tokenizer=tokenizer)
+        index.total = obj.get('total', 0)
+        for key, tbl in obj.get('tokens', dict()).items():
+            index.tokens[key] = {token: set(positions) for token, positions in tbl.items()}
+        data is not None and index.attach(data)
+        return index
+
+
+class KeySummary:
+    """Bloom filter summary of key names present beneath every container
+    of a dictionary or list.
+
+    A summary of a container is a bit mask, i.e. an integer, which sets
+    two bits per key name of all dictionaries inside that container.  If
+    bits of a key are not all set, that key is definitely absent, so that
+    a traversal can skip the whole container.
+
+    Attributes
+    ----------
+    size (int): a number of bits of a summary.
+    masks (dict): a mapping of id of container to its summary.
+    keys (dict): a mapping of distinct key name to its bit mask.
+
+    Methods
+    -------
+    build(data) -> None
+    get_mask_list(data) -> list
+    attach(data, mask_list) -> None
+    get_key_mask(key) -> int
+    get_masks(lookup_obj) -> list or None
+    may_contain(node, masks) -> bool
+    memory_usage() -> int
+    """
+    def __init__(self, data=None, size=DEFAULT_SUMMARY_BITS):
+        self.size = size
+        self.masks = dict()
+        self.keys = dict()
+        data is not None and self.build(data)
+
+    def __len__(self):
+        return len(self.masks)
+
+    def get_key_mask(self, key):
+        """Get a bit mask of a key name."""
+        mask = self.keys.get(key)
+        if mask is None:
+            value = crc32(key.encode('utf-8', 'surrogatepass'))
+            mask = 1 << (value % self.size) | 1 << ((value >> 16) % self.size)
+        return mask
+
+    def build(self, data):
+        """Build summaries of all containers of data in one pass.  A leaf
+        container, i.e. without any child container, is not summarized
+        because skipping it saves as much work as checking its summary.
+
+        Parameters
+        ----------
+        data (dict, list): a dict, dict-like, list, or list-like instance.
+        """
+        validate_argument_type(list, tuple, dict, data=data)
+        masks, keys = dict(), dict()
+        self.masks, self.keys = masks, keys
+        container_types = (dict, list, tuple, set)
+
+        def get_own_mask_(node_):
+            mask_ = 0
+            if isinstance(node_, dict):
+                for key_ in node_:
+                    if isinstance(key_, str):
+                        key_mask_ = keys.get(key_)
+                        if key_mask_ is None:
+                            key_mask_ = self.get_key_mask(key_)
+                            keys[key_] = key_mask_
+                        mask_ |= key_mask_
+            return mask_
+
+        # post-order traversal: a container is summarized after its children
+        stack = [(data, None)]
+        while stack:
+            node, children = stack.pop()
+            if children is None:
+                values = node.values() if isinstance(node, dict) else node
+                children = [child for child in values
+                            if isinstance(child, container_types)]
+                if children:
+                    stack.append((node, children))
+                    stack.extend((child, None) for child in children)
+                continue
+
+            mask = get_own_mask_(node)
+            for child in children:
+                child_mask = masks.get(id(child))
+                mask |= get_own_mask_(child) if child_mask is None else child_mask
+            masks[id(node)] = mask
+
+        # a leaf root is summarized as well, so that get_masks knows its keys
+        if id(data) not in masks:
+            masks[id(data)] = get_own_mask_(data)
+
+    def get_mask_list(self, data):
+        """Get summaries of containers of data in depth-first document
+        order, which attach method restores for a copy of data, e.g. an
+        unpickled one.  A container which is not summarized has None.
+
+        Parameters
+        ----------
+        data (dict, list): data of summaries.
+
+        Returns
+        -------
+        list: a list of bit masks.
+        """
+        masks = self.masks
+        return [masks.get(id(node)) for node in iter_containers(data)]
+
+    def attach(self, data, mask_list):
+        """Attach summaries of get_mask_list to a copy of data.
+
+        Parameters
+        ----------
+        data (dict, list): a copy of data of summaries.
+        mask_list (list): a list of bit masks of get_mask_list.
+
+        Raise
+        -----
+        ValueError: if data has a different number of containers.
+        """
+        nodes = list(iter_containers(data))
+        if len(nodes) != len(mask_list):
+            fmt = 'Cannot attach summaries of {} containers to data of {} containers.'
+            raise ValueError(fmt.format(len(mask_list), len(nodes)))
+        self.masks = {id(node): mask for node, mask in zip(nodes, mask_list)
+                      if mask is not None}
+
+    def get_masks(self, lookup_obj):
+        """Get bit masks of key names matching a left lookup.
+
+        Parameters
+        ----------
+        lookup_obj (LookupCls): a LookupCls instance.
+
+        Returns
+        -------
+        list: a list of bit masks, or None if a lookup can match any key.
+        """
+        if not lookup_obj.left:
+            return None if lookup_obj.right else []
+        masks = {mask for key, mask in self.keys.items()
+                 if lookup_obj.is_left_matched(key)}
+        return list(masks)
+
+    def may_contain(self, node, masks):
+        """Return True if a container possibly has a key of masks beneath it.
+        A container which is not summarized, e.g. a leaf, returns True."""
+        mask = self.masks.get(id(node))
+        if mask is None:
+            return True
+        for key_mask in masks:
+            if mask & key_mask == key_mask:
+                return True
+        return False
+
+    def memory_usage(self):
+        """Return an estimated size in bytes of summaries."""
+        total = sys.getsizeof(self.masks) + sys.getsizeof(self.keys)
+        total += sum(sys.getsizeof(mask) for mask in self.masks.values())
+        return total
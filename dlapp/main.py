@@ -6,8 +6,25 @@ from os import path
 from dlapp.application import Application
 from dlapp import create_from_csv_file
 from dlapp import create_from_json_file
-from dlapp import create_from_yaml_file
-
+from dlapp import create_from_jsonl_file
+from dlapp import DLQuery
+from dlapp import stream_find_jsonl
+from dlapp import stream_find_yaml
+from dlapp.csvfile import get_query_columns
+from dlapp.factory import get_backend
+from dlapp.factory import get_backend_names
+from dlapp.snapshot import load_with_cache
+from dlapp.stream import iter_yaml_documents
+from dlapp.stream import iterfind_jsonl_records
+from dlapp.stream import iterfind_yaml_documents
+from dlapp.stream import open_stream
+from dlapp.compressed import open_input
+from dlapp.compressed import strip_compression_extension
+from dlapp.exceptions import ArgumentError
+from dlapp.exceptions import JSONStreamError
+from dlapp.exceptions import LookupClsError
+
+from dlapp.collection import List
 from dlapp.collection import Tabular
 
 import dlapp.tutorial as tu
@@ -98,13 +115,30 @@ class Cli:
         parser.add_argument(
             '-f', '--filename', type=str,
             default='',
-            help='JSON, YAML, or CSV file name.'
+            help='JSON, JSON Lines, YAML, or CSV file name, or - for stdin '
+                 'with --filetype.  It can be gzip, bzip2, or xz compressed, '
+                 'e.g. inventory.json.gz.'
         )
 
         parser.add_argument(
-            '-e', '--filetype', type=str, choices=['csv', 'json', 'yaml', 'yml'],
+            '-e', '--filetype', type=str,
+            choices=['csv', 'json', 'jsonl', 'yaml', 'yml'],
             default='',
-            help='File type can be either json, yaml, yml, or csv.'
+            help='File type can be either json, jsonl, yaml, yml, or csv.'
+        )
+
+        parser.add_argument(
+            '-b', '--backend', type=str,
+            default='',
+            help='JSON or YAML parser backend, e.g. orjson, ujson, json, '
+                 'libyaml, or pyyaml.  Default is the fastest installed one.'
+        )
+
+        parser.add_argument(
+            '--cache', action='store_true',
+            help='Reload a file from an on-disk snapshot of parsed data while '
+                 'the file is unchanged.  Snapshots are under $DLAPP_CACHE_DIR '
+                 'or ~/.cache/dlapp.'
         )
 
         parser.add_argument(
@@ -147,11 +181,64 @@ class Cli:
         """Return True if filetype is json, otherwise, False."""
         return self.filetype == 'json'
 
+    @property
+    def is_jsonl_type(self):
+        """Return True if filetype is jsonl, otherwise, False."""
+        return self.filetype == 'jsonl'
+
     @property
     def is_yaml_type(self):
         """Return True if filetype is yml or yaml, otherwise, False."""
         return self.filetype in ['yml', 'yaml']
 
+    def get_backend(self, options, filetype):
+        """Get `options.backend` flag which is a parser backend of filetype.
+
+        Parameters
+        ----------
+        options (argparse.Namespace): an argparse.Namespace instance.
+        filetype (str): json or yaml.
+
+        Returns
+        -------
+        str: a backend name, or None if flag is empty, otherwise, ``sys.exit(1)``
+        if backend is not available.
+        """
+        if not options.backend:
+            return None
+        names = get_backend_names(filetype)
+        if options.backend not in names:
+            fmt = '*** {} {} parser backend is not available.  Choose one of {}.'
+            print(fmt.format(options.backend, filetype, ', '.join(names)))
+            sys.exit(1)
+        return options.backend
+
+    def load_yaml_documents(self, file, backend=None, cache=False):
+        """Load all documents of a YAML file to a list, which is reloaded
+        from a snapshot cache while the file is unchanged.
+
+        Parameters
+        ----------
+        file (str, io.IOBase): a YAML file, or a readable stream.
+        backend (str): a YAML parser backend.  Default is None.
+        cache (bool): enable a snapshot cache.  Default is False.
+
+        Returns
+        -------
+        DLQuery: a DLQuery instance of a list of documents.
+        """
+        loader = get_backend('yaml', backend)[1]
+
+        def create():
+            stream, is_opened = open_stream(file)
+            try:
+                return DLQuery(list(iter_yaml_documents(stream, loader=loader)))
+            finally:
+                is_opened and stream.close()
+
+        return load_with_cache(cache, file, create, filetype='yaml-documents',
+                               loader=loader)
+
     def validate_cli_flags(self, options):
         """Validate argparse `options`.
 
@@ -175,7 +262,7 @@ class Cli:
 
     def validate_filename(self, options):
         """Validate `options.filename` flag which is a file type of `csv`,
-        `json`, `yml`, or `yaml`.
+        `json`, `jsonl`, `yml`, or `yaml`.
 
         Parameters
         ----------
@@ -193,30 +280,82 @@ class Cli:
         self.filename = filename
         self.filetype = filetype
 
-        _, ext = path.splitext(filename)
+        _, ext = path.splitext(strip_compression_extension(filename))
         ext = ext.lower()
-        if ext in ['.csv', '.json', '.yml', '.yaml']:
+        if ext in ['.csv', '.json', '.jsonl', '.yml', '.yaml']:
             self.filetype = ext[1:]
             return True
+        if ext == '.ndjson':
+            self.filetype = 'jsonl'
+            return True
 
         if not filetype:
             if ext == '':
                 fmt = ('*** {} file doesnt have an extension.  '
                        'System cant determine a file type.  '
                        'Please rerun with --filetype=<filetype> '
-                       'where filetype is csv, json, yml, or yaml.')
+                       'where filetype is csv, json, jsonl, yml, or yaml.')
 
             else:
                 fmt = ('*** {} file has an extension but its extension is not '
-                       'csv, json, yml, or yaml.  If you think this file is '
-                       'csv, json, yml, or yaml file, '
+                       'csv, json, jsonl, yml, or yaml.  If you think this file is '
+                       'csv, json, jsonl, yml, or yaml file, '
                        'please rerun with --filetype=<filetype> '
-                       'where filetype is csv, json, yml, or yaml.')
+                       'where filetype is csv, json, jsonl, yml, or yaml.')
             print(fmt.format(filename))
             sys.exit(1)
         else:
             self.filetype = filetype
 
+    def find_result(self, file, options):
+        """Search `options.lookup` and `options.select_statement` in a file.
+
+        Parameters
+        ----------
+        file (str, io.IOBase): a filename, or a readable stream.
+        options (argparse.Namespace): an argparse.Namespace instance.
+
+        Returns
+        -------
+        list: a search result.
+        """
+        lookup, select = options.lookup, options.select_statement
+        if self.is_jsonl_type and not options.cache:
+            # JSON Lines is searched line by line with bounded memory
+            result = stream_find_jsonl(file, lookup=lookup, select=select)
+        elif self.is_yaml_type and not options.cache:
+            # each document of a multi-document YAML file is searched in turn
+            backend = self.get_backend(options, 'yaml')
+            result = stream_find_yaml(file, lookup=lookup, select=select,
+                                      backend=backend)
+        elif self.is_yaml_type:
+            # documents of a snapshot are searched one by one as in a stream
+            backend = self.get_backend(options, 'yaml')
+            query_obj = self.load_yaml_documents(file, backend=backend, cache=True)
+            result = List(iterfind_yaml_documents(query_obj.data, lookup=lookup,
+                                                  select=select))
+        elif self.is_jsonl_type:
+            # records of a snapshot are searched one by one as in a stream
+            query_obj = create_from_jsonl_file(file, cache=True)
+            result = List(iterfind_jsonl_records(query_obj.data, lookup=lookup,
+                                                 select=select))
+        else:
+            if self.is_csv_type:
+                func = create_from_csv_file
+            elif self.is_json_type:
+                func = create_from_json_file
+            else:
+                print('*** invalid filetype.  Check with DEV.')
+                sys.exit(1)
+
+            kwargs = dict(cache=options.cache)
+            self.is_json_type and kwargs.update(backend=self.get_backend(options, 'json'))
+            # CSV fields which a query does not need are dropped while parsing
+            self.is_csv_type and kwargs.update(columns=get_query_columns(lookup, select))
+            query_obj = func(file, **kwargs)
+            result = query_obj.find(lookup=lookup, select=select)
+        return result
+
     def run_cli(self, options):
         """Execute dlapp command line.
 
@@ -224,23 +363,22 @@ class Cli:
         ----------
         options (argparse.Namespace): a argparse.Namespace instance.
         """
-        lookup, select = options.lookup, options.select_statement
         if not options.lookup:
             print('*** --lookup flag CANNOT be empty.')
             sys.exit(1)
 
-        if self.is_csv_type:
-            func = create_from_csv_file
-        elif self.is_json_type:
-            func = create_from_json_file
-        elif self.is_yaml_type:
-            func = create_from_yaml_file
-        else:
-            print('*** invalid filetype.  Check with DEV.')
+        file = self.filename
+        if file == '-':
+            # compressed input on stdin is detected by its magic bytes
+            stdin = open(sys.stdin.fileno(), 'rb', closefd=False)
+            file = open_input(stdin, newline='')
+
+        try:
+            result = self.find_result(file, options)
+        except (ArgumentError, JSONStreamError, LookupClsError) as ex:
+            print('*** {}'.format(ex))
             sys.exit(1)
 
-        query_obj = func(self.filename)
-        result = query_obj.find(lookup=lookup, select=select)
         if result:
             if options.tabular:
                 node = Tabular(result)
@@ -0,0 +1,155 @@
+"""Module containing the logic for memory-mapped file input of dlapp.
+
+A regular file is mapped to memory and read through memoryview, so text
+is decoded directly from mapped pages without a second buffer in Python
+file objects.  Chunked or parallel parsers address byte ranges of a
+mapped file directly.  Pipes, character devices such as stdin, and file
+objects cannot be mapped and are read with ordinary file objects.
+"""
+
+import os
+import mmap
+import stat
+import codecs
+from io import IOBase
+
+from dlapp.compressed import get_compression
+
+BOM = codecs.BOM_UTF8
+
+
+def is_mappable(file):
+    """Return True if file is a filename of a non-empty regular file which
+    is not compressed.
+
+    Parameters
+    ----------
+    file (str, io.IOBase): a filename or a file object.
+
+    Returns
+    -------
+    bool: True if file can be memory-mapped, otherwise, False.
+    """
+    if isinstance(file, IOBase) or hasattr(file, 'read'):
+        return False
+    try:
+        info = os.stat(file)
+    except (OSError, TypeError, ValueError):
+        return False
+    if not stat.S_ISREG(info.st_mode) or info.st_size == 0:
+        return False
+    return get_compression(file) is None
+
+
+class MappedFile:
+    """A read-only memory-mapped file.
+
+    Attributes
+    ----------
+    filename (str): a filename.
+    size (int): a size of file in bytes.
+    mmap (mmap.mmap): a memory map, or None if file is empty.
+
+    Methods
+    -------
+    view(start=0, stop=None) -> memoryview
+    read_text(start=0, stop=None, encoding='utf-8') -> str
+    read(size=-1) -> bytes
+    readline() -> bytes
+    seek(position) -> None
+    __iter__() -> iterator of lines at a current position
+    iter_lines(start=0, stop=None) -> generator
+    iter_text_lines(start=0, stop=None, encoding='utf-8') -> generator
+    find_line_start(position) -> int
+    close() -> None
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as stream:
+            self.size = os.fstat(stream.fileno()).st_size
+            self.mmap = None
+            if self.size:
+                self.mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def view(self, start=0, stop=None):
+        """Get a memoryview of a byte range without copying it.  A caller
+        releases it before close() is called."""
+        if self.mmap is None:
+            return memoryview(b'')
+        stop = self.size if stop is None else min(stop, self.size)
+        view = memoryview(self.mmap)
+        try:
+            return view[start:stop]
+        finally:
+            view.release()
+
+    def read_text(self, start=0, stop=None, encoding='utf-8'):
+        """Decode a byte range to text directly from mapped pages.  A UTF-8
+        byte order mark at start of file is skipped."""
+        if start == 0 and self.mmap is not None and self.mmap[:3] == BOM:
+            start = len(BOM)
+        view = self.view(start, stop)
+        with view:
+            return str(view, encoding)
+
+    def read(self, size=-1):
+        """Read bytes at a current position, like a binary file object."""
+        return self.mmap.read(size) if self.mmap is not None else b''
+
+    def readline(self):
+        """Read a line at a current position, like a binary file object."""
+        return self.mmap.readline() if self.mmap is not None else b''
+
+    def seek(self, position):
+        """Move a current position of readline."""
+        self.mmap is not None and self.mmap.seek(position)
+
+    def __iter__(self):
+        return iter(self.readline, b'')
+
+    def iter_lines(self, start=0, stop=None):
+        """Yield byte lines which start in a byte range, i.e. start <= a
+        position of line < stop.  start is expected to be a start of line."""
+        if self.mmap is None:
+            return
+        stop = self.size if stop is None else min(stop, self.size)
+        readline, position = self.mmap.readline, start
+        self.mmap.seek(start)
+        while position < stop:
+            line = readline()
+            position += len(line)
+            yield line
+
+    def iter_text_lines(self, start=0, stop=None, encoding='utf-8'):
+        """Yield decoded lines which start in a byte range.  Line endings
+        are kept, as in a file opened with newline=''."""
+        decoder = codecs.getincrementaldecoder(
+            'utf-8-sig' if start == 0 and encoding.lower().replace('_', '-') == 'utf-8'
+            else encoding
+        )()
+        decode = decoder.decode
+        for line in self.iter_lines(start, stop):
+            yield decode(line)
+
+    def find_line_start(self, position):
+        """Get a first position of a line which starts at or after position."""
+        if position <= 0 or self.mmap is None:
+            return 0
+        if position >= self.size:
+            return self.size
+        index = self.mmap.find(b'\n', position - 1)
+        return self.size if index < 0 else index + 1
+
+    def close(self):
+        """Unmap a file."""
+        self.mmap is not None and self.mmap.close()
+        self.mmap = None
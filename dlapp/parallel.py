@@ -0,0 +1,175 @@
+"""Module containing the logic for the parallel search of dlapp."""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from dlapp.collection import Element
+from dlapp.collection import List
+from dlapp.collection import LookupCls
+from dlapp.collection import get_limit
+from dlapp.parser import SelectParser
+
+PARALLEL_THRESHOLD = 20000
+CHUNKS_PER_WORKER = 4
+
+# data and indexes of a parallel search in a forked worker process.  It is
+# set by a pool initializer whose arguments a forked worker inherits through
+# copy-on-write memory instead of pickling, so that concurrent searches in
+# one parent process never share it.
+_shared_state = None
+
+
+def set_shared_state(data, kwargs):
+    """Set data and indexes of a worker process.  It is a pool initializer."""
+    global _shared_state
+    _shared_state = (data, kwargs)
+
+
+def get_worker_count(workers):
+    """Get a number of worker processes which does not exceed CPU count."""
+    return max(1, min(int(workers or 1), os.cpu_count() or 1))
+
+
+def is_parallel(data, lookup, workers, order='dfs',
+                threshold=PARALLEL_THRESHOLD):
+    """Return True if a search is worth running in a process pool.
+
+    Parameters
+    ----------
+    data (dict, list): a dict, dict-like, list, or list-like instance.
+    lookup (str): a search pattern.
+    workers (int): a number of worker processes.
+    order (str): dfs or bfs.  Default is dfs.
+    threshold (int): a minimum number of top-level list items.
+
+    Returns
+    -------
+    bool: True if top-level list items can be searched in chunks.
+    """
+    if get_worker_count(workers) < 2 or str(order).lower() != 'dfs':
+        return False
+    if not isinstance(data, (list, tuple)) or len(data) < threshold:
+        return False
+    # path lookups can refer to positions of top-level list items
+    left = str(lookup).split('=', maxsplit=1)[0]
+    return not LookupCls.is_path(left)
+
+
+def get_chunks(total, workers, chunks_per_worker=CHUNKS_PER_WORKER):
+    """Split a range of total items to contiguous (start, stop) ranges."""
+    count = max(1, min(total, workers * chunks_per_worker))
+    size, remainder = divmod(total, count)
+    chunks, start = [], 0
+    for i in range(count):
+        stop = start + size + (1 if i < remainder else 0)
+        chunks.append((start, stop))
+        start = stop
+    return chunks
+
+
+def find_chunk(task):
+    """Search a chunk of top-level list items in a worker process.
+
+    Parameters
+    ----------
+    task (tuple): (start, stop, chunk, query).  chunk is None if data is
+            inherited from a forked parent process.
+
+    Returns
+    -------
+    list: a list of filtered records of chunk.
+    """
+    start, stop, chunk, query = task
+    query = dict(query)
+    on_exception = query.pop('on_exception')
+    if chunk is None:
+        data, kwargs = _shared_state
+        chunk = data[start:stop]
+        query.update(kwargs)
+    elm_obj = Element(chunk, on_exception=on_exception)
+    return list(elm_obj.iterfind(**query))
+
+
+def get_process_pool(workers, data=None, kwargs=None):
+    """Create a process pool which prefers fork start method.  Forked
+    workers get data and indexes through a pool initializer.
+
+    Parameters
+    ----------
+    workers (int): a number of worker processes.
+    data (list): a list or list-like instance.  Default is None.
+    kwargs (dict): indexes of data.  Default is None.
+
+    Returns
+    -------
+    tuple: (ProcessPoolExecutor instance, True if workers are forked).
+    """
+    initargs = (data, kwargs or dict())
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        try:
+            executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=context,
+                initializer=set_shared_state, initargs=initargs
+            )
+            return executor, True
+        except TypeError:   # pragma: no cover
+            pass
+    executor = ProcessPoolExecutor(max_workers=workers)
+    return executor, False
+
+
+def parallel_find(data, lookup, select='', workers=2, limit=None,
+                  max_depth=None, predicate_workers=None, on_exception=False,
+                  **kwargs):
+    """Search a lookup in chunks of top-level list items with a process pool
+    and merge results in original order.
+
+    Parameters
+    ----------
+    data (list): a list or list-like instance.
+    lookup (str): a search pattern.
+    select (str): a select statement.  It can have a LIMIT clause.
+    workers (int): a number of worker processes.  Default is 2.
+    limit (int): a maximum number of result.  Default is None.
+    max_depth (int): a maximum depth of matched key.  Default is None.
+    predicate_workers (int): a number of threads per worker process to
+            evaluate a WHERE clause.  Default is None.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+    kwargs (dict): indexes of data, i.e. trigram_index, token_index,
+            or key_summary.  Forked workers use them without pickling.
+
+    Returns
+    -------
+    List: list of record which is identical to a single-process result.
+    """
+    # validate lookup and select in parent process before starting workers
+    LookupCls(lookup)
+    select_obj = SelectParser(select, on_exception=on_exception)
+    select_obj.parse_statement()
+    limit = get_limit(select_obj, limit=limit)
+    if limit is not None and limit <= 0:
+        return List()
+
+    query = dict(lookup=lookup, select=select, limit=limit,
+                 max_depth=max_depth, predicate_workers=predicate_workers,
+                 on_exception=on_exception)
+    executor, is_forked = get_process_pool(workers, data=data, kwargs=kwargs)
+    try:
+        futures = []
+        for start, stop in get_chunks(len(data), workers):
+            chunk = None if is_forked else list(data[start:stop])
+            futures.append(executor.submit(find_chunk, (start, stop, chunk, query)))
+
+        result = List()
+        for future in futures:
+            result.extend(future.result())
+            if limit is not None and len(result) >= limit:
+                del result[limit:]
+                break
+        for future in futures:
+            future.cancel()
+        return result
+    finally:
+        executor.shutdown(wait=True)
@@ -17,27 +17,45 @@ class SelectParser:
     select_statement (str): a select-statement.
     columns (list): columns
     predicate (function): a callable function.
+    limit (int): a maximum number of result of LIMIT clause.  Default is None.
     logger (logging.Logger): a logger
     on_exception (bool): raise `Exception` if set True, otherwise, return False.
+    token_index (TokenIndex): a token index for word operators.  Default is None.
 
     Properties
     ----------
     is_zero_select -> bool
     is_all_select -> bool
+    keep_keys -> set or None
 
     Methods
     -------
     get_predicate(expression) -> function
     build_predicate() -> function
+    split_limit(text) -> tuple
+    is_closed_expression(expression) -> bool
     parse_statement() -> None
     """
-    def __init__(self, select_statement, on_exception=True):
+    comparison_operators = {
+        'lt': 'lt', 'le': 'le', '<': 'lt', '<=': 'le',
+        'less_than': 'lt', 'less_than_or_equal': 'le',
+        'less_than_or_equal_to': 'le', 'equal_or_less_than': 'le',
+        'equal_to_or_less_than': 'le',
+        'gt': 'gt', 'ge': 'ge', '>': 'gt', '>=': 'ge',
+        'greater_than': 'gt', 'greater_than_or_equal': 'ge',
+        'greater_than_or_equal_to': 'ge', 'equal_or_greater_than': 'ge',
+        'equal_to_or_greater_than': 'ge'
+    }
+
+    def __init__(self, select_statement, on_exception=True, token_index=None):
         self.select_statement = select_statement
         self.columns = [None]
         self.left_operands = []
         self.predicate = None
+        self.limit = None
         self.logger = logger
         self.on_exception = on_exception
+        self.token_index = token_index
 
     @property
     def is_zero_select(self):
@@ -49,6 +67,16 @@ class SelectParser:
         """Return True if all columns are selected"""
         return self.columns == []
 
+    @property
+    def keep_keys(self):
+        """Keys which selected columns and a WHERE clause refer to, or None
+        if all columns are selected."""
+        if self.is_all_select:
+            return None
+        keys = set(column for column in self.columns if column is not None)
+        keys.update(self.left_operands)
+        return keys
+
     def get_predicate(self, expression):
         """Parse an expression and convert to callable predicate function.
 
@@ -75,14 +103,7 @@ class SelectParser:
 
         key not in self.left_operands and self.left_operands.append(key)
 
-        tbl1 = {'lt': 'lt', 'le': 'le', '<': 'lt', '<=': 'le',
-                'less_than': 'lt', 'less_than_or_equal': 'le',
-                'less_than_or_equal_to': 'le', 'equal_or_less_than': 'le',
-                'equal_to_or_less_than': 'le',
-                'gt': 'gt', 'ge': 'ge', '>': 'gt', '>=': 'ge',
-                'greater_than': 'gt', 'greater_than_or_equal': 'ge',
-                'greater_than_or_equal_to': 'ge', 'equal_or_greater_than': 'ge',
-                'equal_to_or_greater_than': 'ge'}
+        tbl1 = self.comparison_operators
 
         tbl2 = {'eq': 'eq', '==': 'eq', 'equal': 'eq', 'equal_to': 'eq',
                 'ne': 'ne', '!=': 'ne', 'not_equal': 'ne', 'not_equal_to': 'ne'}
@@ -180,6 +201,14 @@ class SelectParser:
         elif re.match('not_?belongs?', op, re.I):
             func = partial(Predicate.notbelong, key=key, other=value,
                            on_exception=self.on_exception)
+        elif op == 'has_word':
+            func = partial(Predicate.has_word, key=key, other=value,
+                           index=self.token_index,
+                           on_exception=self.on_exception)
+        elif op == 'has_all_words':
+            func = partial(Predicate.has_all_words, key=key, other=value,
+                           index=self.token_index,
+                           on_exception=self.on_exception)
         else:
             msg = (
                 '*** Return False because of an unsupported {!r} logical '
@@ -253,6 +282,38 @@ class SelectParser:
         else:
             return self.get_predicate(expressions)
 
+    @staticmethod
+    def split_limit(text):
+        """Split a trailing LIMIT clause from text.
+
+        Parameters
+        ----------
+        text (str): selected columns or a last WHERE expression.
+
+        Returns
+        -------
+        tuple: text without LIMIT clause and a limit, or text and None.
+        """
+        match = re.search(r'(?i)(^|\s+)limit\s+(?P<limit>[0-9]+)\s*$', text)
+        if match:
+            return text[:match.start()].strip(), int(match.group('limit'))
+        return text, None
+
+    def is_closed_expression(self, expression):
+        """Return True if a right operand of expression cannot be followed
+        by more words, i.e. a custom keyword of is/is_not operators, or a
+        single word or version(...)/datetime(...) of comparison operators."""
+        pattern = r'''(?i)(["'].+['"]|\S+) +(?P<op>\S+) +(?P<value>.+)'''
+        match = re.match(pattern, expression.strip())
+        if not match:
+            return False
+        op, value = match.group('op').lower(), match.group('value').strip()
+        if op in ['is', 'is_not', 'isnot']:
+            return bool(re.match(r'\S+$', value))
+        if op in self.comparison_operators:
+            return bool(re.match(r'(?i)(\S+|[a-z_]+[(].+[)])$', value))
+        return False
+
     def parse_statement(self):
         """Parse, analyze, and build a select-statement to selecting
         columns and a callable predicate"""
@@ -275,6 +336,17 @@ class SelectParser:
             select = re.sub('^ *select +', '', statement, flags=re.I).strip()
             expressions = None
 
+        # LIMIT follows a complete WHERE expression, never a text operand
+        if expressions:
+            last_expression = re.split(' +(?:or_|and_|&&|[|]{2}) +',
+                                       expressions, flags=re.I)[-1]
+            remainder, limit = self.split_limit(last_expression)
+            if limit is not None and self.is_closed_expression(remainder):
+                expressions = expressions[:len(expressions) - len(last_expression)]
+                expressions, self.limit = expressions + remainder, limit
+        elif select:
+            select, self.limit = self.split_limit(select)
+
         if select:
             if re.match(r'(?i) *([*]|_+all_+) *$', select):
                 self.columns = []
@@ -6,6 +6,8 @@ from dlapp.validation import OpValidation
 from dlapp.validation import CustomValidation
 from dlapp.validation import VersionValidation
 from dlapp.validation import DatetimeValidation
+from dlapp.validation import raise_exception_if
+from dlapp.index import tokenize
 
 from dlapp.exceptions import PredicateParameterDataTypeError
 
@@ -51,6 +53,8 @@ class Predicate:
     Predicate.notcontain(data, key='', other='', on_exception=True) -> bool
     Predicate.belong(data, key='', other='', on_exception=True) -> bool
     Predicate.notbelong(data, key='', other='', on_exception=True) -> bool
+    Predicate.has_word(data, key='', other='', index=None, on_exception=True) -> bool
+    Predicate.has_all_words(data, key='', other='', index=None, on_exception=True) -> bool
     Predicate.true(data) -> bool
     Predicate.false(data) -> bool
     """
@@ -333,6 +337,62 @@ class Predicate:
         )
         return result
 
+    @classmethod
+    def has_word(cls, data, key='', other='', index=None, on_exception=True):
+        """has_word keyword for expression validation.
+
+        Parameters
+        ----------
+        data (dict): a dict or dict-like instance.
+        key (str): a key of dict or dict-like instance.
+        other (str): a word.
+        index (TokenIndex): a token index to answer from.  Default is None.
+        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+        Returns
+        -------
+        bool: True if value of data has a word, otherwise, False.
+        """
+        result = cls.has_all_words(data, key=key, other=str(other).strip(),
+                                   index=index, on_exception=on_exception)
+        return result
+
+    @classmethod
+    def has_all_words(cls, data, key='', other='', index=None, on_exception=True):
+        """has_all_words keyword for expression validation.
+
+        Parameters
+        ----------
+        data (dict): a dict or dict-like instance.
+        key (str): a key of dict or dict-like instance.
+        other (str, list): a text of words or a list of words.
+        index (TokenIndex): a token index to answer from.  Default is None.
+        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+        Returns
+        -------
+        bool: True if value of data has all words, otherwise, False.
+
+        Notes
+        -----
+        Only a string value has words, i.e. None or 42 never has a word.
+        A result is the same with or without a token index.
+        """
+        try:
+            func = tokenize if index is None else index.tokenize
+            words = func(other) if isinstance(other, str) else other
+            value = get_value(data, key)
+            if not words or not isinstance(value, str):
+                return False
+            position = None if index is None else index.get_position(data)
+            if position is not None and index.is_indexed(key):
+                return all(position in index.get_positions(key, word) for word in words)
+            tokens = func(value)
+            return all(word in tokens for word in words)
+        except Exception as ex:
+            result = raise_exception_if(ex, on_exception=on_exception)
+            return result
+
     @classmethod
     def true(cls, data, on_exception=True):     # noqa
         """Regardless a user provided data, it always returns True.
@@ -0,0 +1,318 @@
+"""Module containing the logic for the sharded query of dlapp."""
+
+import re
+import multiprocessing
+
+from dlapp.argumenthelper import validate_argument_type
+from dlapp.collection import List
+from dlapp.collection import get_limit
+from dlapp.dlquery import DLQuery
+from dlapp.exceptions import ArgumentError
+from dlapp.exceptions import ShardedDLQueryError
+from dlapp.parser import SelectParser
+
+INDEX_NAMES = ('node_table', 'key_summary', 'trigram_index', 'token_index')
+
+
+def get_placements(total, count=None, size=None):
+    """Split total items to contiguous (start, stop) shard placements.
+
+    Parameters
+    ----------
+    total (int): a number of items.
+    count (int): a number of shards.  Default is None.
+    size (int): a maximum number of items per shard.  Default is None.
+
+    Returns
+    -------
+    list: a list of (start, stop) placements.
+    """
+    if size:
+        size = max(1, int(size))
+        placements = [(i, min(i + size, total)) for i in range(0, total, size)]
+        return placements or [(0, 0)]
+
+    count = max(1, min(int(count or multiprocessing.cpu_count()), total or 1))
+    quotient, remainder = divmod(total, count)
+    placements, start = [], 0
+    for i in range(count):
+        stop = start + quotient + (1 if i < remainder else 0)
+        placements.append((start, stop))
+        start = stop
+    return placements
+
+
+def get_shard(data, start, stop):
+    """Get a shard of a list or of top-level keys of a dictionary."""
+    if isinstance(data, dict):
+        return type(data)(
+            item for i, item in enumerate(data.items()) if start <= i < stop
+        )
+    return data[start:stop]
+
+
+def serve_shard(connection, shard):
+    """Hold a shard in a worker process and serve DLQuery method calls
+    received from a connection until None is received.
+
+    Parameters
+    ----------
+    connection (multiprocessing.connection.Connection): a worker end of pipe.
+    shard (dict, list): a shard which is sliced by a parent process.
+    """
+    query_obj = DLQuery(shard)
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        method, args, kwargs, is_returned = message
+        try:
+            result = getattr(query_obj, method)(*args, **kwargs)
+            connection.send(('ok', result if is_returned else None))
+        except Exception as ex:
+            connection.send(('error', ex))
+    connection.close()
+
+
+class ShardedDLQuery:
+    """Scatter-gather query over shards which are held by long-lived
+    worker processes.
+
+    A list is partitioned to contiguous slices and a dictionary is
+    partitioned to contiguous groups of its top-level keys.  A query is
+    broadcast to all shards and results are merged in document order.
+
+    Attributes
+    ----------
+    placements (list): (start, stop) positions of items per shard.
+    is_dict (bool): True if data is a dictionary.
+    workers (list): worker processes.
+
+    Methods
+    -------
+    broadcast(method, *args, is_returned=True, **kwargs) -> list
+    find(lookup='', select='', limit=None, max_depth=None, on_exception=False) -> List
+    find_many(queries, on_exception=False) -> list
+    build_index(name, **kwargs) -> None
+    close() -> None
+
+    Raise
+    -----
+    ShardedDLQueryError: if a worker process terminates unexpectedly.
+    """
+    def __init__(self, data, count=None, size=None, start_method=None):
+        validate_argument_type(list, tuple, dict, data=data)
+        self.is_dict = isinstance(data, dict)
+        self.placements = get_placements(len(data), count=count, size=size)
+        self.workers = []
+        self._connections = []
+
+        methods = multiprocessing.get_all_start_methods()
+        if start_method is None:
+            start_method = 'fork' if 'fork' in methods else None
+        context = multiprocessing.get_context(start_method)
+
+        try:
+            for start, stop in self.placements:
+                parent_end, child_end = context.Pipe()
+                # a shard is sliced here, so a worker never refers to whole data
+                shard = get_shard(data, start, stop)
+                worker = context.Process(target=serve_shard,
+                                         args=(child_end, shard), daemon=True)
+                worker.start()
+                del shard
+                child_end.close()
+                self.workers.append(worker)
+                self._connections.append(parent_end)
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        return len(self.placements)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception as ex:     # noqa
+            pass
+
+    def broadcast(self, method, *args, is_returned=True, **kwargs):
+        """Call a DLQuery method on all shards at once and gather results
+        in shard order.
+
+        Parameters
+        ----------
+        method (str): a DLQuery method name.
+        args (tuple): positional arguments of method.
+        is_returned (bool): send results back if it is True.  Default is True.
+        kwargs (dict): keyword arguments of method.
+
+        Returns
+        -------
+        list: a list of results per shard.
+        """
+        if not self._connections:
+            raise ShardedDLQueryError('ShardedDLQuery is already closed.')
+
+        for connection in self._connections:
+            connection.send((method, args, kwargs, is_returned))
+
+        results, error = [], None
+        for i, connection in enumerate(self._connections):
+            try:
+                status, result = connection.recv()
+            except EOFError:
+                fmt = 'Worker of shard {} terminated unexpectedly.'
+                status, result = 'error', ShardedDLQueryError(fmt.format(i))
+            if status == 'error':
+                error = error or result
+            results.append(result)
+        if error is not None:
+            raise error
+        return results
+
+    def find(self, lookup='', select='', limit=None, max_depth=None,
+             on_exception=False):
+        """Search a lookup on all shards and merge results in document order.
+
+        Parameters
+        ----------
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        limit (int): a maximum number of result.  Default is None.
+        max_depth (int): a maximum depth of matched key.  Default is None.
+        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+        Returns
+        -------
+        List: list of Any, or whole data if lookup and select are empty.
+        """
+        self.validate_lookup(lookup)
+        results = self.broadcast('find', lookup=lookup, select=select,
+                                 limit=limit, max_depth=max_depth,
+                                 on_exception=on_exception)
+        if DLQuery._get_lookup(lookup, select, on_exception) is None:
+            return self.merge_data(results)
+        return self.merge(results, limit=limit, select=select)
+
+    def find_many(self, queries, on_exception=False):
+        """Search many queries on all shards in a single pass per shard.
+
+        Parameters
+        ----------
+        queries (list): a list of (lookup, select) pairs or lookups.
+        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+        Returns
+        -------
+        list: a list of merged results per query.
+        """
+        for query in queries:
+            self.validate_lookup(query if isinstance(query, str) else query[0])
+        results = self.broadcast('find_many', queries, on_exception=on_exception)
+        merged_results = []
+        for i, query in enumerate(queries):
+            lookup, select = (query, '') if isinstance(query, str) else query
+            shard_results = [result[i] for result in results]
+            if DLQuery._get_lookup(lookup, select, on_exception) is None:
+                merged_results.append(self.merge_data(shard_results))
+            else:
+                merged_results.append(self.merge(shard_results, select=select))
+        return merged_results
+
+    def build_index(self, name, **kwargs):
+        """Build an index on all shards, i.e. node_table, key_summary,
+        trigram_index, or token_index.
+
+        Parameters
+        ----------
+        name (str): an index name.
+        kwargs (dict): keyword arguments of a build method of DLQuery.
+        """
+        if name not in INDEX_NAMES:
+            fmt = 'index name must be one of {}, but got {!r}.'
+            raise ArgumentError(fmt.format(', '.join(INDEX_NAMES), name))
+        self.broadcast('build_{}'.format(name), is_returned=False, **kwargs)
+
+    def close(self):
+        """Stop all worker processes."""
+        connections, self._connections = self._connections, []
+        for connection in connections:
+            try:
+                connection.send(None)
+            except Exception as ex:     # noqa
+                pass
+            connection.close()
+        workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.join(timeout=5)
+            worker.is_alive() and worker.terminate()
+
+    def validate_lookup(self, lookup):
+        """Reject a path lookup which refers to a position of a top-level
+        list item because a position is relative to a shard."""
+        if not self.is_dict and re.match(r'\s*[$]\s*\[\s*-?[0-9]', str(lookup)):
+            fmt = 'ShardedDLQuery does not support a positional path lookup {!r}.'
+            raise ArgumentError(fmt.format(lookup))
+
+    @classmethod
+    def merge(cls, results, limit=None, select=''):
+        """Merge results of shards in shard order.
+
+        Parameters
+        ----------
+        results (list): a list of results per shard.
+        limit (int): a maximum number of result.  Default is None.
+        select (str): a select statement.  It can have a LIMIT clause.
+
+        Returns
+        -------
+        List: a merged result.
+        """
+        select_obj = SelectParser(select)
+        select_obj.parse_statement()
+        limit = get_limit(select_obj, limit=limit)
+
+        merged_result = List()
+        for result in results:
+            if isinstance(result, list):
+                merged_result.extend(result)
+            else:
+                merged_result.append(result)
+        if limit is not None:
+            del merged_result[limit:]
+        return merged_result
+
+    @classmethod
+    def merge_data(cls, shards):
+        """Rebuild whole data from shards, i.e. a result of a query
+        whose lookup and select are empty.
+
+        Parameters
+        ----------
+        shards (list): a list of shards in shard order.
+
+        Returns
+        -------
+        dict, list: whole data.
+        """
+        if shards and isinstance(shards[0], dict):
+            data = type(shards[0])()
+            for shard in shards:
+                data.update(shard)
+            return data
+
+        data = []
+        for shard in shards:
+            data.extend(shard)
+        return data
@@ -0,0 +1,703 @@
+"""Module containing the logic for the shared binary dataset of dlapp.
+
+A dataset is a flat node table in depth-first document order, a table
+of strings, and a key index.  They are stored in one binary block which
+is created in shared memory or in a file.  Worker processes attach to a
+block and read columns through memoryview without parsing or copying
+data.  Only nodes which a query needs are converted to Python objects.
+
+Layout of a block (little-endian, sections are 8-byte aligned)::
+
+    header      magic, version, node, string, blob, key, posting counts
+    parent      int64 per node, -1 for root node
+    depth       int64 per node
+    kind        int8 per node, see NONE ... LIST
+    key_kind    int8 per node, kind of dictionary key or LIST for list item
+    key_ref     int64 per node, payload of key or a position of list item
+    payload     int64 per node, payload of scalar or a subtree size
+    offsets     int64 per string + 1, positions of strings in blob
+    blob        utf-8 strings, big integers, and pickled objects
+    key_ids     int64 per distinct string key, a string id
+    key_offsets int64 per distinct string key + 1, positions in postings
+    postings    int64 per dictionary item, node positions grouped by key
+"""
+
+import mmap
+import heapq
+import pickle
+import struct
+from array import array
+
+from dlapp.argumenthelper import validate_argument_type
+from dlapp.collection import List
+from dlapp.collection import Result
+from dlapp.collection import LookupCls
+from dlapp.collection import iter_filter_records
+from dlapp.collection import get_limit
+from dlapp.collection import validate_search_order
+from dlapp.exceptions import SharedDatasetError
+from dlapp.parser import SelectParser
+from dlapp.table import STOP_CHECK_INTERVAL
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:     # pragma: no cover
+    shared_memory = None
+
+MAGIC = b'DLAPPDS\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sIIqqqqq')
+
+NONE = 0
+FALSE = 1
+TRUE = 2
+INT = 3
+FLOAT = 4
+STR = 5
+BIGINT = 6
+PICKLE = 7
+DICT = 8
+LIST = 9
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def align(offset):
+    """Round an offset up to a multiple of 8."""
+    return (offset + 7) & ~7
+
+
+def float_to_int(value):
+    """Reinterpret bits of a float as int64."""
+    return struct.unpack('<q', struct.pack('<d', value))[0]
+
+
+def int_to_float(value):
+    """Reinterpret bits of an int64 as a float."""
+    return struct.unpack('<d', struct.pack('<q', value))[0]
+
+
+def set_tracked(shm, is_tracked):
+    """Register or unregister a shared memory block with resource tracker.
+
+    A block lives until unlink() is called explicitly, so resource tracker
+    must not unlink it when a creator or an attached process exits.
+    """
+    try:
+        from multiprocessing import resource_tracker
+        if is_tracked:
+            resource_tracker.register(shm._name, 'shared_memory')
+        else:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception as ex:     # noqa
+        pass
+
+
+def get_layout(counts):
+    """Get (name, offset, length, format) of sections for given counts.
+
+    Parameters
+    ----------
+    counts (tuple): (nodes, strings, blob_size, keys, postings).
+
+    Returns
+    -------
+    tuple: (a list of sections, total size of block).
+    """
+    nodes, strings, blob_size, keys, postings = counts
+    sections = [
+        ('parent', nodes, 'q'), ('depth', nodes, 'q'),
+        ('kind', nodes, 'b'), ('key_kind', nodes, 'b'),
+        ('key_ref', nodes, 'q'), ('payload', nodes, 'q'),
+        ('offsets', strings + 1, 'q'), ('blob', blob_size, 'B'),
+        ('key_ids', keys, 'q'), ('key_offsets', keys + 1, 'q'),
+        ('postings', postings, 'q'),
+    ]
+    layout, offset = [], align(HEADER.size)
+    for name, length, fmt in sections:
+        layout.append((name, offset, length, fmt))
+        offset = align(offset + length * struct.calcsize(fmt))
+    return layout, offset
+
+
+class DatasetBuilder:
+    """Convert a dictionary or list to columns of a binary dataset.
+
+    Attributes
+    ----------
+    columns (dict): arrays of node columns.
+    strings (dict): an id per distinct byte string.
+    postings (dict): node positions per string id of dictionary key.
+
+    Methods
+    -------
+    build(data) -> None
+    get_string_id(bytes) -> int
+    encode(value) -> tuple
+    get_size() -> int
+    write(buffer) -> None
+    """
+    def __init__(self, data):
+        self.columns = dict(
+            parent=array('q'), depth=array('q'), kind=array('b'),
+            key_kind=array('b'), key_ref=array('q'), payload=array('q'),
+        )
+        self.strings = dict()
+        self.postings = dict()
+        self.build(data)
+
+    def get_string_id(self, bytes_):
+        """Get an id of a byte string which is added once to string table."""
+        string_id = self.strings.get(bytes_)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings[bytes_] = string_id
+        return string_id
+
+    def encode(self, value):
+        """Encode a scalar value to (kind, payload)."""
+        if value is None:
+            return NONE, 0
+        elif isinstance(value, bool):
+            return (TRUE if value else FALSE), 0
+        elif isinstance(value, int):
+            if INT64_MIN <= value <= INT64_MAX:
+                return INT, value
+            return BIGINT, self.get_string_id(str(value).encode('utf-8'))
+        elif isinstance(value, float):
+            return FLOAT, float_to_int(value)
+        elif isinstance(value, str):
+            return STR, self.get_string_id(value.encode('utf-8', 'surrogatepass'))
+        return PICKLE, self.get_string_id(pickle.dumps(value))
+
+    def build(self, data):
+        """Build node columns in one depth-first pass over data.
+
+        Parameters
+        ----------
+        data (dict, list): a dict, dict-like, list, or list-like instance.
+        """
+        validate_argument_type(list, tuple, dict, data=data)
+        parent, depth = self.columns['parent'], self.columns['depth']
+        kind, payload = self.columns['kind'], self.columns['payload']
+        key_kind, key_ref = self.columns['key_kind'], self.columns['key_ref']
+
+        stack = [(data, -1, NONE, 0, 0)]
+        while stack:
+            node, parent_pos, node_key_kind, node_key_ref, level = stack.pop()
+            pos = len(kind)
+            parent.append(parent_pos)
+            depth.append(level)
+            key_kind.append(node_key_kind)
+            key_ref.append(node_key_ref)
+            if node_key_kind == STR:
+                self.postings.setdefault(node_key_ref, []).append(pos)
+
+            if isinstance(node, dict):
+                kind.append(DICT)
+                children = [self.encode(key) + (child,) for key, child in node.items()]
+            elif isinstance(node, (list, tuple, set)):
+                kind.append(LIST)
+                children = [(LIST, i, child) for i, child in enumerate(node)]
+            else:
+                node_kind, node_payload = self.encode(node)
+                kind.append(node_kind)
+                payload.append(node_payload)
+                continue
+            payload.append(1)
+            for child_key_kind, child_key_ref, child in reversed(children):
+                stack.append((child, pos, child_key_kind, child_key_ref, level + 1))
+
+        # payload of a container is a size of its subtree
+        for pos in range(len(parent) - 1, 0, -1):
+            if kind[pos] in (DICT, LIST):
+                payload[parent[pos]] += payload[pos]
+            else:
+                payload[parent[pos]] += 1
+
+    def get_counts(self):
+        """Get (nodes, strings, blob_size, keys, postings) counts."""
+        return (
+            len(self.columns['kind']), len(self.strings),
+            sum(len(bytes_) for bytes_ in self.strings),
+            len(self.postings),
+            sum(len(positions) for positions in self.postings.values()),
+        )
+
+    def get_size(self):
+        """Get a size of binary dataset in bytes."""
+        return get_layout(self.get_counts())[1]
+
+    def write(self, buffer):
+        """Write a binary dataset to a writable buffer.
+
+        Parameters
+        ----------
+        buffer (bytearray, memoryview, mmap.mmap): a writable buffer which
+                has at least get_size() bytes.
+        """
+        counts = self.get_counts()
+        layout, _ = get_layout(counts)
+        view = memoryview(buffer)
+
+        offsets, position = array('q', [0]), 0
+        for bytes_ in self.strings:
+            position += len(bytes_)
+            offsets.append(position)
+
+        key_ids, key_offsets, postings = array('q'), array('q', [0]), array('q')
+        for string_id, positions in self.postings.items():
+            key_ids.append(string_id)
+            postings.extend(positions)
+            key_offsets.append(len(postings))
+
+        sections = dict(self.columns, offsets=offsets,
+                        blob=b''.join(self.strings), key_ids=key_ids,
+                        key_offsets=key_offsets, postings=postings)
+        try:
+            view[:HEADER.size] = HEADER.pack(MAGIC, VERSION, 0, *counts)
+            for name, offset, length, fmt in layout:
+                bytes_ = bytes(sections[name])
+                view[offset:offset + len(bytes_)] = bytes_
+        finally:
+            view.release()
+
+
+class SharedDataset:
+    """A read-only view of a binary dataset in shared memory, a memory-mapped
+    file, or a bytes-like buffer.
+
+    Attributes
+    ----------
+    name (str): a name of shared memory block, or a filename, or None.
+    nbytes (int): a size of dataset in bytes.
+    parent, depth, kind, key_kind, key_ref, payload (memoryview): node columns.
+
+    Methods
+    -------
+    SharedDataset.serialize(data) -> bytearray
+    SharedDataset.create(data, name=None) -> SharedDataset
+    SharedDataset.attach(name) -> SharedDataset
+    SharedDataset.save(data, filename) -> None
+    SharedDataset.open(filename) -> SharedDataset
+    get_string(string_id) -> str
+    get_key(position) -> Any
+    materialize(position=0) -> Any
+    iter_children(position) -> generator
+    iter_matches(lookup_obj, max_depth=None, stop=None) -> generator
+    iter_path_matches(lookup_obj, max_depth=None) -> generator
+    iterfind(lookup, select='', limit=None, max_depth=None, order='dfs', on_exception=False, predicate_workers=None, metrics=None, stop=None) -> generator
+    find(lookup, select='', limit=None, max_depth=None, order='dfs', on_exception=False, predicate_workers=None, metrics=None) -> List
+    close() -> None
+    unlink() -> None
+
+    Raise
+    -----
+    SharedDatasetError: if buffer is not a binary dataset.
+    """
+    def __init__(self, buffer, name=None, shm=None, mmap_obj=None):
+        self.name = name
+        self._shm = shm
+        self._mmap = mmap_obj
+        self._views = []
+        self._key_cache = dict()
+        self._key_index = None
+
+        view = self._get_view(buffer)
+        if len(view) < HEADER.size:
+            raise SharedDatasetError('buffer is too small for a dataset.')
+        magic, version, _, *counts = HEADER.unpack(view[:HEADER.size])
+        if magic != MAGIC or version != VERSION:
+            raise SharedDatasetError('buffer is not a dlapp dataset.')
+        layout, self.nbytes = get_layout(counts)
+        if len(view) < self.nbytes:
+            raise SharedDatasetError('dataset is truncated.')
+
+        for name_, offset, length, fmt in layout:
+            size = length * struct.calcsize(fmt)
+            setattr(self, name_, self._get_view(view[offset:offset + size], fmt))
+
+    def __len__(self):
+        return len(self.kind)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception as ex:     # noqa
+            pass
+
+    def _get_view(self, buffer, fmt=None):
+        view = memoryview(buffer)
+        self._views.append(view)
+        if fmt:
+            view = view.cast(fmt)
+            self._views.append(view)
+        return view
+
+    @classmethod
+    def serialize(cls, data):
+        """Serialize a dictionary or list to a binary dataset.
+
+        Parameters
+        ----------
+        data (dict, list): a dict, dict-like, list, or list-like instance.
+
+        Returns
+        -------
+        bytearray: a binary dataset.
+        """
+        builder = DatasetBuilder(data)
+        buffer = bytearray(builder.get_size())
+        builder.write(buffer)
+        return buffer
+
+    @classmethod
+    def create(cls, data, name=None):
+        """Serialize data to a new shared memory block.  A block is not
+        removed at exit, so a creator should call unlink() when no process
+        needs it anymore.
+
+        Parameters
+        ----------
+        data (dict, list): a dict, dict-like, list, or list-like instance.
+        name (str): a name of shared memory block.  Default is None,
+                i.e. a random name.
+
+        Returns
+        -------
+        SharedDataset: a SharedDataset instance.
+        """
+        if shared_memory is None:   # pragma: no cover
+            raise SharedDatasetError('shared memory requires Python 3.8 or later.')
+        builder = DatasetBuilder(data)
+        shm = shared_memory.SharedMemory(name=name, create=True,
+                                         size=builder.get_size())
+        set_tracked(shm, False)
+        try:
+            builder.write(shm.buf)
+            return cls(shm.buf, name=shm.name, shm=shm)
+        except Exception:
+            shm.close()
+            set_tracked(shm, True)
+            shm.unlink()
+            raise
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to a shared memory block which is created by create().
+
+        Parameters
+        ----------
+        name (str): a name of shared memory block.
+
+        Returns
+        -------
+        SharedDataset: a SharedDataset instance.
+        """
+        if shared_memory is None:   # pragma: no cover
+            raise SharedDatasetError('shared memory requires Python 3.8 or later.')
+        shm = shared_memory.SharedMemory(name=name)
+        set_tracked(shm, False)
+        try:
+            return cls(shm.buf, name=shm.name, shm=shm)
+        except Exception:
+            shm.close()
+            raise
+
+    @classmethod
+    def save(cls, data, filename):
+        """Serialize a dictionary or list to a binary dataset file.
+
+        Parameters
+        ----------
+        data (dict, list): a dict, dict-like, list, or list-like instance.
+        filename (str): a dataset filename.
+        """
+        builder = DatasetBuilder(data)
+        size = builder.get_size()
+        with open(filename, 'w+b') as stream:
+            stream.truncate(size)
+            with mmap.mmap(stream.fileno(), size) as mmap_obj:
+                builder.write(mmap_obj)
+
+    @classmethod
+    def open(cls, filename):
+        """Memory-map a binary dataset file as read-only.
+
+        Parameters
+        ----------
+        filename (str): a dataset filename.
+
+        Returns
+        -------
+        SharedDataset: a SharedDataset instance.
+        """
+        with open(filename, 'rb') as stream:
+            mmap_obj = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(mmap_obj, name=filename, mmap_obj=mmap_obj)
+        except Exception:
+            mmap_obj.close()
+            raise
+
+    def close(self):
+        """Release views of dataset and detach from its block or file."""
+        views, self._views = self._views, []
+        for view in reversed(views):
+            view.release()
+        self._shm and self._shm.close()
+        self._mmap and self._mmap.close()
+        self._shm, self._mmap = None, None
+
+    def unlink(self):
+        """Destroy a shared memory block.  Only a creator should call it."""
+        shm = self._shm or shared_memory.SharedMemory(name=self.name)
+        self.close()
+        set_tracked(shm, True)
+        shm.unlink()
+
+    def get_string(self, string_id):
+        """Decode a string of string table."""
+        start, stop = self.offsets[string_id], self.offsets[string_id + 1]
+        return str(self.blob[start:stop], 'utf-8', 'surrogatepass')
+
+    def decode(self, kind, payload):
+        """Decode (kind, payload) to a scalar value."""
+        if kind == STR:
+            return self.get_string(payload)
+        elif kind == INT:
+            return payload
+        elif kind == NONE:
+            return None
+        elif kind == TRUE or kind == FALSE:
+            return kind == TRUE
+        elif kind == FLOAT:
+            return int_to_float(payload)
+        elif kind == BIGINT:
+            return int(self.get_string(payload))
+        start, stop = self.offsets[payload], self.offsets[payload + 1]
+        return pickle.loads(self.blob[start:stop])
+
+    def get_key(self, position):
+        """Get a dictionary key or a list position of a node."""
+        key_kind, key_ref = self.key_kind[position], self.key_ref[position]
+        if key_kind == LIST:
+            return key_ref
+        if key_kind == STR:
+            key = self._key_cache.get(key_ref)
+            if key is None:
+                key = self._key_cache[key_ref] = self.get_string(key_ref)
+            return key
+        return self.decode(key_kind, key_ref)
+
+    def iter_children(self, position):
+        """Yield positions of children of a container node."""
+        child, stop = position + 1, position + self.payload[position]
+        kind, payload = self.kind, self.payload
+        while child < stop:
+            yield child
+            child += payload[child] if kind[child] >= DICT else 1
+
+    def materialize(self, position=0):
+        """Convert a node and its subtree to Python objects.
+
+        Parameters
+        ----------
+        position (int): a position of node.  Default is 0, i.e. root node.
+
+        Returns
+        -------
+        Any: a dictionary, list, or scalar value.
+        """
+        kind = self.kind[position]
+        if kind == DICT:
+            return {self.get_key(child): self.materialize(child)
+                    for child in self.iter_children(position)}
+        elif kind == LIST:
+            return [self.materialize(child) for child in self.iter_children(position)]
+        return self.decode(kind, self.payload[position])
+
+    def get_key_index(self):
+        """Get (key, start, stop) ranges of postings per distinct string key."""
+        if self._key_index is None:
+            key_offsets = self.key_offsets
+            self._key_index = [
+                (self.get_string(string_id), key_offsets[i], key_offsets[i + 1])
+                for i, string_id in enumerate(self.key_ids)
+            ]
+        return self._key_index
+
+    def iter_matches(self, lookup_obj, max_depth=None, stop=None):
+        """Yield positions of nodes matching a lookup in document order.
+        Postings of matched keys are merged, so a node table is not scanned.
+
+        Parameters
+        ----------
+        lookup_obj (LookupCls): a LookupCls instance.
+        max_depth (int): a maximum depth of matched node.  Default is None.
+        stop (threading.Event): a stop flag which ends a scan within
+                STOP_CHECK_INTERVAL postings once it is set.  Default is None.
+
+        Returns
+        -------
+        generator: a generator of node positions.
+        """
+        postings = self.postings
+        ranges = [
+            postings[start:stop] for key, start, stop in self.get_key_index()
+            if lookup_obj.is_left_matched(key)
+        ]
+        positions = ranges[0] if len(ranges) == 1 else heapq.merge(*ranges)
+        depth, is_right = self.depth, lookup_obj.is_right
+        for total, pos in enumerate(positions):
+            if stop is not None and total % STOP_CHECK_INTERVAL == 0 and stop.is_set():
+                return
+            if max_depth is not None and depth[pos] > max_depth:
+                continue
+            if is_right and not lookup_obj.is_right_matched(self.materialize(pos)):
+                continue
+            yield pos
+
+    def iter_path_matches(self, lookup_obj, max_depth=None):
+        """Yield positions of nodes matching a path-anchored lookup in
+        document order.  Only branches matching the path are visited.
+
+        Parameters
+        ----------
+        lookup_obj (LookupCls): a LookupCls instance which has a path.
+        max_depth (int): a maximum depth of matched key.  Default is None.
+
+        Returns
+        -------
+        generator: a generator of node positions.
+        """
+        segments = lookup_obj.path
+        last = len(segments) - 1
+        kind, is_right = self.kind, lookup_obj.is_right
+
+        def is_descendable_(pos_):
+            return kind[pos_] >= DICT and self.payload[pos_] > 1
+
+        def walk_(pos_, i_, depth_=1):
+            if max_depth is not None and depth_ > max_depth:
+                return
+            selector, recursive = segments[i_]
+            is_dict = kind[pos_] == DICT
+            children = self.iter_children(pos_)
+            if not is_dict and isinstance(selector, int) and not recursive:
+                children = list(children)
+                size = len(children)
+                if not -size <= selector < size:
+                    return
+                selector = selector % size
+                children = [children[selector]]
+
+            for child in children:
+                key = self.get_key(child)
+                if selector is None:
+                    is_matched = True
+                else:
+                    is_matched = is_dict == isinstance(selector, str) and key == selector
+                if is_matched and i_ == last:
+                    if is_dict and (not is_right or lookup_obj.is_right_matched(
+                            self.materialize(child))):
+                        yield child
+                elif is_matched and is_descendable_(child):
+                    yield from walk_(child, i_ + 1, depth_ + 1)
+                if recursive and is_descendable_(child):
+                    yield from walk_(child, i_, depth_ + 1)
+
+        if is_descendable_(0):
+            yield from walk_(0, 0)
+
+    def iterfind(self, lookup, select='', limit=None, max_depth=None,
+                 order='dfs', on_exception=False, predicate_workers=None,
+                 metrics=None, stop=None):
+        """Lazily search a lookup and yield filtered records in document
+        order or breadth-first order.  Only matched nodes and their
+        parents are converted to Python objects.
+
+        Parameters
+        ----------
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        limit (int): a maximum number of result.  Default is None.
+        max_depth (int): a maximum depth of matched key.  Default is None.
+        order (str): dfs or bfs.  Default is dfs.
+        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+        predicate_workers (int): a number of threads to evaluate a WHERE
+                clause.  Default is None.
+        metrics (FilterMetrics): a FilterMetrics instance to collect timing
+                metrics.  Default is None.
+        stop (threading.Event): a stop flag which ends a key scan once it
+                is set.  Default is None.
+
+        Returns
+        -------
+        generator: a generator of filtered records.
+        """
+        order = validate_search_order(order)
+        lkup_obj = LookupCls(lookup)
+        select_obj = SelectParser(select, on_exception=on_exception)
+        select_obj.parse_statement()
+        limit = get_limit(select_obj, limit=limit)
+        if limit is not None and limit <= 0:
+            return
+
+        if lkup_obj.path:
+            positions = self.iter_path_matches(lkup_obj, max_depth=max_depth)
+        else:
+            positions = self.iter_matches(lkup_obj, max_depth=max_depth, stop=stop)
+            if order == 'bfs':
+                # breadth-first order is document order within each depth
+                positions = sorted(positions, key=self.depth.__getitem__)
+
+        def iter_records_():
+            parent_pos, parent = None, None
+            for pos in positions:
+                if self.parent[pos] != parent_pos:
+                    parent_pos = self.parent[pos]
+                    parent = Result(self.materialize(parent_pos))
+                yield Result(self.materialize(pos), parent=parent)
+
+        result = iter_filter_records(iter_records_(), select_obj,
+                                     on_exception=on_exception,
+                                     workers=predicate_workers, metrics=metrics)
+        for total, item in enumerate(result, 1):
+            yield item
+            if total == limit:
+                return
+
+    def find(self, lookup, select='', limit=None, max_depth=None, order='dfs',
+             on_exception=False, predicate_workers=None, metrics=None):
+        """Search a lookup on a binary dataset.
+
+        Parameters
+        ----------
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        limit (int): a maximum number of result.  Default is None.
+        max_depth (int): a maximum depth of matched key.  Default is None.
+        order (str): dfs or bfs.  Default is dfs.
+        on_exception (bool): raise `Exception` if set True, otherwise, return False.
+        predicate_workers (int): a number of threads to evaluate a WHERE
+                clause.  Default is None.
+        metrics (FilterMetrics): a FilterMetrics instance to collect timing
+                metrics.  Default is None.
+
+        Returns
+        -------
+        List: list of record
+        """
+        result = List(self.iterfind(lookup, select=select, limit=limit,
+                                    max_depth=max_depth, order=order,
+                                    on_exception=on_exception,
+                                    predicate_workers=predicate_workers,
+                                    metrics=metrics))
+        return result
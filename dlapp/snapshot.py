@@ -0,0 +1,379 @@
+"""Module containing the logic for the on-disk snapshot cache of dlapp.
+
+A snapshot is a pickle of parsed data of a file, and of indexes which
+were built for that data.  Reloading a snapshot skips parsing, which
+matters most for YAML and CSV files and for indexes that are expensive
+to build.  A snapshot belongs to a file path and parser options, and it is
+valid while size and modification time, or else a content hash, of that
+file still match.
+
+Snapshots are pickles, so that a cache directory must only be writable by
+its owner.  A directory is created with mode 0700, and a directory owned
+by another user is not used.
+"""
+
+import os
+import stat
+import time
+import pickle
+import hashlib
+import tempfile
+from functools import partial
+
+from dlapp.config import version
+from dlapp.dlquery import DLQuery
+from dlapp.exceptions import SnapshotError
+from dlapp.index import KeySummary
+from dlapp.utils import paused_gc
+
+MAGIC = b'DLAPPSS1'
+SUFFIX = '.snapshot'
+DEFAULT_MAX_SIZE = 2 ** 30
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+HASH_BLOCK_SIZE = 2 ** 20
+
+
+def get_default_cache_dir():
+    """Get a default snapshot cache directory, i.e. $DLAPP_CACHE_DIR,
+    otherwise, dlapp under $XDG_CACHE_HOME or ~/.cache."""
+    dirname = os.environ.get('DLAPP_CACHE_DIR')
+    if not dirname:
+        base = os.environ.get('XDG_CACHE_HOME')
+        base = base or os.path.join(os.path.expanduser('~'), '.cache')
+        dirname = os.path.join(base, 'dlapp')
+    return dirname
+
+
+def get_file_digest(filename):
+    """Get a BLAKE2b hex digest of content of a file."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(filename, 'rb') as stream:
+        for block in iter(partial(stream.read, HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_option_text(value):
+    """Get a stable text of a parser option, e.g. a name of loader class."""
+    if hasattr(value, '__qualname__'):
+        return '{}.{}'.format(getattr(value, '__module__', ''), value.__qualname__)
+    return repr(value)
+
+
+def get_payload(query_obj):
+    """Get a picklable dictionary of data and built indexes of a DLQuery
+    instance.  A token index with a tokenizer function is left out."""
+    data = query_obj.data
+    payload = dict(data=data, trigram_index=query_obj.trigram_index,
+                   node_table=query_obj.node_table)
+    token_index = query_obj.token_index
+    if token_index is not None and not callable(token_index.tokenizer):
+        payload.update(token_index=token_index)
+    key_summary = query_obj.key_summary
+    if key_summary is not None:
+        payload.update(key_summary=(key_summary.size, key_summary.keys,
+                                    key_summary.get_mask_list(data)))
+    return payload
+
+
+def create_from_payload(payload):
+    """Create a DLQuery instance from a payload of get_payload."""
+    data = payload['data']
+    query_obj = DLQuery(data)
+    query_obj.trigram_index = payload.get('trigram_index')
+    query_obj.node_table = payload.get('node_table')
+    token_index = payload.get('token_index')
+    if token_index is not None:
+        token_index.attach(data)
+        query_obj.token_index = token_index
+    if 'key_summary' in payload:
+        size, keys, mask_list = payload['key_summary']
+        key_summary = KeySummary(size=size)
+        key_summary.keys = keys
+        key_summary.attach(data, mask_list)
+        query_obj.key_summary = key_summary
+    return query_obj
+
+
+class Snapshot:
+    """A snapshot entry of a file in a snapshot cache.
+
+    Attributes
+    ----------
+    cache (SnapshotCache): a snapshot cache.
+    filename (str): a real path of file.
+    path (str): a path of snapshot file.
+    size (int): a size of file when the entry was created.
+    mtime (int): a modification time of file in nanoseconds.
+
+    Methods
+    -------
+    load() -> DLQuery or None
+    save(query_obj) -> bool
+    remove() -> None
+    """
+    def __init__(self, cache, filename, path, info):
+        self.cache = cache
+        self.filename = filename
+        self.path = path
+        self.size = info.st_size
+        self.mtime = info.st_mtime_ns
+        self._digest = None
+
+    @property
+    def digest(self):
+        """A content digest of file, which is computed once."""
+        if self._digest is None:
+            self._digest = get_file_digest(self.filename)
+        return self._digest
+
+    def is_valid(self, header):
+        """Return True if a snapshot header matches file."""
+        if header.get('version') != version or header.get('size') != self.size:
+            return False
+        if header.get('mtime') == self.mtime and not self.cache.verify:
+            return True
+        # e.g. a file which is copied or touched keeps its content
+        return header.get('digest') == self.digest
+
+    def load(self):
+        """Load a DLQuery instance from snapshot if it is valid for file,
+        otherwise, None.  An unreadable snapshot is removed."""
+        try:
+            with open(self.path, 'rb') as stream:
+                if stream.read(len(MAGIC)) != MAGIC:
+                    raise SnapshotError('Invalid snapshot file.')
+                header = pickle.load(stream)
+                if not self.is_valid(header):
+                    return None
+                # unpickling only allocates, so that collections find nothing
+                with paused_gc():
+                    query_obj = create_from_payload(pickle.load(stream))
+        except FileNotFoundError:
+            return None
+        except Exception:   # noqa
+            # e.g. a truncated snapshot, or one of an incompatible release
+            self.remove()
+            return None
+
+        # a hit refreshes age of snapshot for eviction
+        os.utime(self.path)
+        return query_obj
+
+    def save(self, query_obj):
+        """Save data and built indexes of a DLQuery instance to snapshot,
+        and evict old snapshots of cache afterward.  Nothing is saved if
+        file was modified after the entry was created.
+
+        Parameters
+        ----------
+        query_obj (DLQuery): a DLQuery instance which data is parsed from file.
+
+        Returns
+        -------
+        bool: True if snapshot is saved, otherwise, False.
+        """
+        info = os.stat(self.filename)
+        if info.st_size != self.size or info.st_mtime_ns != self.mtime:
+            return False
+
+        header = dict(version=version, filename=self.filename,
+                      size=self.size, mtime=self.mtime, digest=self.digest)
+        fd, temp = tempfile.mkstemp(suffix='.tmp', dir=self.cache.directory)
+        try:
+            with os.fdopen(fd, 'wb') as stream:
+                stream.write(MAGIC)
+                pickle.dump(header, stream, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(get_payload(query_obj), stream,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            # readers see an old snapshot or a complete new one
+            os.replace(temp, self.path)
+        except BaseException:
+            os.path.exists(temp) and os.remove(temp)
+            raise
+        self.cache.evict()
+        return True
+
+    def remove(self):
+        """Remove snapshot file if it exists."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class SnapshotCache:
+    """On-disk cache of snapshots of parsed files.
+
+    Attributes
+    ----------
+    directory (str): a cache directory.  Default is None, i.e.
+            $DLAPP_CACHE_DIR, otherwise, dlapp under $XDG_CACHE_HOME
+            or ~/.cache.
+    max_size (int): a total size in bytes of snapshots which eviction
+            keeps.  Default is 1 GiB.
+    max_age (float): seconds since last use after which a snapshot is
+            evicted.  Default is 30 days.
+    verify (bool): check a content hash of file on every load instead of
+            trusting a matching size and modification time.  Default is False.
+
+    Methods
+    -------
+    get_snapshot(filename, **options) -> Snapshot or None
+    evict() -> None
+    clear() -> None
+    """
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE,
+                 max_age=DEFAULT_MAX_AGE, verify=False):
+        self.directory = directory or get_default_cache_dir()
+        self.max_size = max_size
+        self.max_age = max_age
+        self.verify = verify
+
+    def is_usable(self):
+        """Create cache directory if it does not exist, and return True if
+        it is a directory which only its owner can write."""
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            info = os.stat(self.directory)
+        except OSError:
+            return False
+        if not stat.S_ISDIR(info.st_mode):
+            return False
+        if hasattr(os, 'getuid'):
+            is_owned = info.st_uid == os.getuid()
+            return is_owned and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+        return True
+
+    def get_snapshot(self, filename, **options):
+        """Get a snapshot entry of a regular file and parser options.
+
+        Parameters
+        ----------
+        filename (str, os.PathLike): a filename.
+        options (dict): parser options which affect parsed data, e.g.
+                a file type, a loader, or CSV arguments.
+
+        Returns
+        -------
+        Snapshot: a snapshot entry, or None if file is not a regular file,
+                e.g. a pipe, or if cache directory is not usable.
+        """
+        if not isinstance(filename, (str, bytes, os.PathLike)):
+            return None
+        try:
+            filename = os.path.realpath(os.fsdecode(filename))
+            info = os.stat(filename)
+        except (OSError, ValueError):
+            return None
+        if not stat.S_ISREG(info.st_mode) or not self.is_usable():
+            return None
+
+        lst = [filename, version]
+        lst.extend('{}={}'.format(name, get_option_text(value))
+                   for name, value in sorted(options.items()))
+        key = hashlib.blake2b('\n'.join(lst).encode('utf-8', 'surrogatepass'),
+                              digest_size=20).hexdigest()
+        path = os.path.join(self.directory, key + SUFFIX)
+        return Snapshot(self, filename, path, info)
+
+    def evict(self):
+        """Remove snapshots which were not used within max_age, and then
+        least recently used ones until total size is within max_size."""
+        entries = []
+        now = time.time()
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                info = os.stat(path)
+                if now - info.st_mtime > self.max_age:
+                    os.remove(path)
+                else:
+                    entries.append((info.st_mtime, info.st_size, path))
+            except FileNotFoundError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Remove all snapshots of cache directory."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(SUFFIX):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+
+def get_snapshot_cache(cache):
+    """Get a SnapshotCache instance of cache argument of factory functions.
+
+    Parameters
+    ----------
+    cache (bool, str, SnapshotCache): True for a default cache, a cache
+            directory, or a SnapshotCache instance.  False or None
+            disables caching.
+
+    Returns
+    -------
+    SnapshotCache: a snapshot cache, or None.
+    """
+    if not cache:
+        return None
+    if isinstance(cache, SnapshotCache):
+        return cache
+    if cache is True:
+        return SnapshotCache()
+    return SnapshotCache(directory=os.fsdecode(cache))
+
+
+def load_with_cache(cache, filename, create, **options):
+    """Load a DLQuery instance of a file from a snapshot cache, or create it
+    with a create function and save its snapshot.
+
+    Parameters
+    ----------
+    cache (bool, str, SnapshotCache): a cache argument of get_snapshot_cache.
+    filename (str, io.IOBase): a filename, or a stream which is not cached.
+    create (callable): a function which parses file to a DLQuery instance.
+    options (dict): parser options which affect parsed data.
+
+    Returns
+    -------
+    DLQuery: a DLQuery instance.  Its snapshot attribute is a snapshot entry
+            which DLQuery.save_snapshot updates after indexes are built.
+    """
+    cache = get_snapshot_cache(cache)
+    snapshot = cache and cache.get_snapshot(filename, **options)
+    if snapshot is None:
+        return create()
+
+    query_obj = snapshot.load()
+    if query_obj is None:
+        query_obj = create()
+        try:
+            snapshot.save(query_obj)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            # e.g. a full disk, or data which cannot be pickled
+            pass
+    query_obj.snapshot = snapshot
+    return query_obj
@@ -0,0 +1,967 @@
+"""Module containing the logic for streaming search of dlapp.
+
+A document is read in chunks and converted to events by an incremental
+JSON tokenizer.  A lookup and select statement are evaluated on events,
+so only open containers on the current path, values which a select
+statement needs, and matched results are held in memory.  A JSON Lines
+file is parsed and searched one line at a time, and worker processes of
+a parallel search read their byte ranges from a memory-mapped file.  A
+multi-document YAML file is parsed and searched one document at a time.
+A gzip, bzip2, or xz file is decompressed as it is read.
+"""
+
+import re
+import json
+import codecs
+from io import IOBase
+from itertools import chain
+
+from dlapp.collection import List
+from dlapp.collection import Result
+from dlapp.collection import LookupCls
+from dlapp.collection import iter_filter_records
+from dlapp.collection import iter_lookup_records
+from dlapp.collection import get_limit
+from dlapp.compressed import open_input
+from dlapp.dlquery import DLQuery
+from dlapp.exceptions import ArgumentError
+from dlapp.exceptions import JSONStreamError
+from dlapp.mapped import MappedFile
+from dlapp.mapped import is_mappable
+from dlapp.parallel import CHUNKS_PER_WORKER
+from dlapp.parallel import get_process_pool
+from dlapp.parallel import get_worker_count
+from dlapp.parser import SelectParser
+
+CHUNK_SIZE = 65536
+
+START_MAP = 'start_map'
+END_MAP = 'end_map'
+START_ARRAY = 'start_array'
+END_ARRAY = 'end_array'
+KEY = 'key'
+SCALAR = 'scalar'
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?')
+NUMBER_CHARS = re.compile(r'[-+.eE0-9]*')
+# a complete token which needs no escape handling, see JSONTokenizer.iter_tokens
+TOKEN = re.compile(
+    r'[ \t\n\r]*(?:(?P<punct>[{}\[\]:,])|"(?P<string>[^"\\\x00-\x1f]*)"|'
+    r'(?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)|'
+    r'(?P<literal>true|false|null|NaN|-?Infinity))'
+)
+LITERALS = {
+    'true': True, 'false': False, 'null': None,
+    'NaN': float('nan'), 'Infinity': float('inf'), '-Infinity': float('-inf'),
+}
+
+# states of event parser, i.e. what is expected next
+VALUE, FIRST_VALUE, FIRST_KEY, KEY_, COLON, COMMA, DONE = range(7)
+
+
+class JSONTokenizer:
+    """An incremental JSON tokenizer which reads a text or binary stream in
+    chunks and yields parsing events.
+
+    Events are (start_map, None), (key, str), (end_map, None),
+    (start_array, None), (end_array, None), and (scalar, value).
+
+    Attributes
+    ----------
+    stream (io.IOBase): a readable text or binary stream.
+    chunk_size (int): a number of characters or bytes per read.
+
+    Methods
+    -------
+    read() -> bool
+    scan_token() -> tuple
+    iter_tokens() -> generator
+    iter_events() -> generator
+
+    Raise
+    -----
+    JSONStreamError: if a document is not valid JSON.
+    """
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = max(1, int(chunk_size))
+        self.buffer = ''
+        self.pos = 0
+        self.token_pos = 0
+        self.offset = 0
+        self.is_eof = False
+        self._decoder = None
+
+    def __iter__(self):
+        return self.iter_events()
+
+    def read(self):
+        """Read a next chunk to buffer.  Return False at end of stream."""
+        if self.is_eof:
+            return False
+        raw_chunk = self.stream.read(self.chunk_size)
+        self.is_eof = not raw_chunk
+        if isinstance(raw_chunk, bytes):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder('utf-8-sig')()
+            chunk = self._decoder.decode(raw_chunk, final=self.is_eof)
+        elif self.offset == 0 and not self.buffer and raw_chunk.startswith('\ufeff'):
+            chunk = raw_chunk[1:]
+        else:
+            chunk = raw_chunk
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def raise_error(self, msg, pos=None):
+        pos = self.token_pos if pos is None else pos
+        fmt = '{} (char {}).'
+        raise JSONStreamError(fmt.format(msg, self.offset + pos))
+
+    def scan_token(self):
+        """Scan a next token in buffer.
+
+        Returns
+        -------
+        tuple: (token, value), or None if more data is needed, or
+                ('', None) at end of document.
+        """
+        buffer, is_eof = self.buffer, self.is_eof
+        pos = WHITESPACE.match(buffer, self.pos).end()
+        self.pos = self.token_pos = pos
+        if pos == len(buffer):
+            return ('', None) if is_eof else None
+
+        char = buffer[pos]
+        if char in '{}[]:,':
+            self.pos = pos + 1
+            return char, None
+
+        if char == '"':
+            try:
+                value, end = json.decoder.scanstring(buffer, pos + 1)
+            except json.JSONDecodeError as ex:
+                is_partial = ex.msg.startswith('Unterminated') or len(buffer) - ex.pos < 12
+                if is_partial and not is_eof:
+                    return None
+                self.raise_error(ex.msg, ex.pos)
+            self.pos = end
+            return 'string', value
+
+        match = NUMBER.match(buffer, pos)
+        if match:
+            # a number may continue in a next chunk, e.g. 2. or 1e
+            if not is_eof and NUMBER_CHARS.match(buffer, match.end()).end() == len(buffer):
+                return None
+            self.pos = match.end()
+            is_float = match.group(1) or match.group(2)
+            return SCALAR, float(match.group()) if is_float else int(match.group())
+
+        for text, value in LITERALS.items():
+            if buffer.startswith(text, pos):
+                self.pos = pos + len(text)
+                return SCALAR, value
+            is_partial = len(buffer) - pos < len(text) and text.startswith(buffer[pos:])
+            if is_partial and not is_eof:
+                return None
+        self.raise_error('Expecting value')
+
+    def iter_tokens(self):
+        """Yield (token, value) pairs until end of document.  Simple tokens
+        are matched by one regular expression, and scan_token handles
+        escaped strings, tokens split by chunks, and errors."""
+        match_token = TOKEN.match
+        while True:
+            buffer, pos = self.buffer, self.pos
+            size = len(buffer)
+            match = match_token(buffer, pos)
+            while match:
+                kind, end = match.lastgroup, match.end()
+                if kind == 'punct':
+                    token = buffer[end - 1], None
+                elif kind == 'string':
+                    token = 'string', match.group(kind)
+                elif kind == 'literal':
+                    token = SCALAR, LITERALS[match.group(kind)]
+                elif not self.is_eof and NUMBER_CHARS.match(buffer, end).end() == size:
+                    break
+                else:
+                    text = match.group(kind)
+                    is_float = '.' in text or 'e' in text or 'E' in text
+                    token = SCALAR, float(text) if is_float else int(text)
+                self.token_pos = match.start(kind) - (kind == 'string')
+                self.pos = pos = end
+                yield token
+                match = match_token(buffer, pos)
+
+            token = self.scan_token()
+            if token is None:
+                self.read()
+                continue
+            if token[0] == '':
+                return
+            yield token
+
+    def iter_events(self):
+        """Yield parsing events of a document and validate its grammar."""
+        state, stack = VALUE, []
+        for token, value in self.iter_tokens():
+            if state == DONE:
+                self.raise_error('Extra data')
+
+            if state == COLON:
+                token == ':' or self.raise_error("Expecting ':' delimiter")
+                state = VALUE
+                continue
+
+            if state == COMMA:
+                if token == ',':
+                    state = KEY_ if stack[-1] == '{' else VALUE
+                    continue
+                if token != ('}' if stack[-1] == '{' else ']'):
+                    self.raise_error("Expecting ',' delimiter")
+
+            if token == '}' or token == ']':
+                is_ended = state == COMMA or (
+                    state == FIRST_KEY and token == '}'
+                ) or (state == FIRST_VALUE and token == ']')
+                is_ended or self.raise_error('Expecting value')
+                stack.pop()
+                yield (END_MAP if token == '}' else END_ARRAY), None
+                state = COMMA if stack else DONE
+            elif state in (KEY_, FIRST_KEY):
+                token == 'string' or self.raise_error(
+                    'Expecting property name enclosed in double quotes'
+                )
+                yield KEY, value
+                state = COLON
+            elif token == '{' or token == '[':
+                stack.append(token)
+                yield (START_MAP if token == '{' else START_ARRAY), None
+                state = FIRST_KEY if token == '{' else FIRST_VALUE
+            elif token == 'string' or token == SCALAR:
+                yield SCALAR, value
+                state = COMMA if stack else DONE
+            else:
+                self.raise_error('Expecting value')
+
+        if state != DONE:
+            self.raise_error('Unexpected end of document', len(self.buffer))
+
+
+def build_from_events(events):
+    """Build a Python object from parsing events.
+
+    Parameters
+    ----------
+    events (iterable): (event, value) pairs of a JSONTokenizer.
+
+    Returns
+    -------
+    Any: a dictionary, list, or scalar value.
+    """
+    stack, keys, result = [], [], None
+    for event, value in events:
+        if event == KEY:
+            keys[-1] = value
+            continue
+        if event == START_MAP or event == START_ARRAY:
+            stack.append({} if event == START_MAP else [])
+            keys.append(None)
+            continue
+        if event == END_MAP or event == END_ARRAY:
+            value = stack.pop()
+            keys.pop()
+        if not stack:
+            result = value
+        elif isinstance(stack[-1], dict):
+            stack[-1][keys[-1]] = value
+        else:
+            stack[-1].append(value)
+    return result
+
+
+class StreamFrame:
+    """An open container on the current path of a streaming search.
+
+    Attributes
+    ----------
+    is_dict (bool): True if container is a dictionary.
+    data (dict, list): kept content of container.  A dictionary keeps only
+            keys which a query needs unless is_kept is True.  None if a
+            list is not kept.
+    is_kept (bool): True if whole content is kept.
+    is_searched (bool): True if keys of container can match a lookup.
+    key (Any): a current key, or a position of a current list item.
+    level (int): a depth of keys of container, i.e. 1 for a root container.
+    states (set): positions of path segments which children can match.
+    result (Result): a Result of dictionary which is shared by its records.
+    slots (list): pending slots of records which parent is this container.
+    slot (list): a pending slot of record which value is this container.
+    """
+    __slots__ = ('is_dict', 'data', 'is_kept', 'is_searched', 'key', 'level',
+                 'states', 'result', 'slots', 'slot')
+
+    def __init__(self, is_dict, is_kept=False, is_searched=True, level=1,
+                 states=None, slot=None):
+        self.is_dict = is_dict
+        self.is_kept = is_kept
+        self.data = {} if is_dict else ([] if is_kept else None)
+        self.is_searched = is_searched
+        self.key = None if is_dict else -1
+        self.level = level
+        self.states = states
+        self.result = None
+        self.slots = []
+        self.slot = slot
+
+
+class StreamSearcher:
+    """Evaluate a lookup on parsing events and yield found records in
+    document order, i.e. the same order as ``DLQuery.find``.
+
+    A found record is held in a slot until its parent dictionary ends,
+    because a select statement may refer to keys after a matched key.
+
+    Attributes
+    ----------
+    lookup_obj (LookupCls): a LookupCls instance.
+    keep_keys (set): keys which a select statement refers to, or None
+            if all keys are needed.
+    max_depth (int): a maximum depth of matched key.  Default is None.
+
+    Methods
+    -------
+    is_left_matched(frame, key) -> bool
+    get_child_states(frame, key) -> set
+    iterfind(events) -> generator
+    """
+    def __init__(self, lookup_obj, select_obj, max_depth=None):
+        self.lookup_obj = lookup_obj
+        self.max_depth = max_depth
+        self._left_cache = dict()
+        self.keep_keys = select_obj.keep_keys
+
+        self.path = lookup_obj.path
+        if self.path:
+            for selector, recursive in self.path:
+                if isinstance(selector, int) and selector < 0 and not recursive:
+                    fmt = 'streaming search does not support a negative position in {!r}.'
+                    raise ArgumentError(fmt.format(lookup_obj.lookup))
+
+    def is_segment_matched(self, index, frame, key):
+        selector = self.path[index][0]
+        return selector is None or (
+            frame.is_dict == isinstance(selector, str) and key == selector
+        )
+
+    def is_left_matched(self, frame, key):
+        """Return True if a key of a dictionary frame matches a left lookup."""
+        if not frame.is_searched:
+            return False
+        if self.path:
+            last = len(self.path) - 1
+            return frame.is_dict and any(
+                i == last and self.is_segment_matched(i, frame, key)
+                for i in frame.states
+            )
+        if not frame.is_dict:
+            return False
+        is_matched = self._left_cache.get(key)
+        if is_matched is None:
+            is_matched = self.lookup_obj.is_left_matched(key)
+            self._left_cache[key] = is_matched
+        return is_matched
+
+    def get_child_states(self, frame, key):
+        """Get positions of path segments which children of a child can match."""
+        last = len(self.path) - 1
+        states = set()
+        for i in frame.states:
+            if i < last and self.is_segment_matched(i, frame, key):
+                states.add(i + 1)
+            if self.path[i][1]:
+                states.add(i)
+        return states
+
+    def get_parent_result(self, frame):
+        if frame.result is None:
+            frame.result = Result(frame.data)
+        return frame.result
+
+    def iterfind(self, events):
+        """Search parsing events and yield found records in document order.
+
+        Parameters
+        ----------
+        events (iterable): (event, value) pairs of a JSONTokenizer.
+
+        Returns
+        -------
+        generator: a generator of Result instances which parent holds a record.
+        """
+        lookup_obj, keep_keys, max_depth = self.lookup_obj, self.keep_keys, self.max_depth
+        is_right = lookup_obj.is_right
+        queue, stack = [], []
+        head = 0
+
+        for event, value in events:
+            if event == KEY:
+                stack[-1].key = value
+                continue
+
+            if event == END_MAP or event == END_ARRAY:
+                frame = stack.pop()
+                for slot in frame.slots:
+                    slot[2] = True
+                value, slot = frame.data, frame.slot
+                if slot is not None:
+                    slot[0] = value
+                    if is_right and not lookup_obj.is_right_matched(value):
+                        slot[1] = None
+                if stack and frame.is_kept:
+                    parent = stack[-1]
+                    if parent.is_dict:
+                        parent.data[parent.key] = value
+                    elif parent.is_kept:
+                        parent.data.append(value)
+
+                while head < len(queue) and queue[head][2]:
+                    slot = queue[head]
+                    head += 1
+                    if slot[1] is not None:
+                        yield Result(slot[0], parent=slot[1])
+                if head == len(queue):
+                    del queue[:]
+                    head = 0
+                continue
+
+            is_container = event == START_MAP or event == START_ARRAY
+            if not stack:
+                if is_container:
+                    states = {0} if self.path else None
+                    is_searched = max_depth is None or max_depth >= 1
+                    stack.append(StreamFrame(event == START_MAP, is_searched=is_searched,
+                                             states=states))
+                continue
+
+            frame = stack[-1]
+            if not frame.is_dict:
+                frame.key += 1
+            key = frame.key
+            is_matched = self.is_left_matched(frame, key)
+            is_needed = frame.is_kept or is_matched or (frame.is_dict and (
+                keep_keys is None or key in keep_keys
+            ))
+
+            slot = None
+            if is_matched:
+                slot = [value, self.get_parent_result(frame), False]
+                queue.append(slot)
+                frame.slots.append(slot)
+
+            if is_container:
+                is_searched = frame.is_searched and (
+                    max_depth is None or frame.level < max_depth
+                )
+                states = None
+                if self.path:
+                    states = self.get_child_states(frame, key) if is_searched else set()
+                    is_searched = bool(states)
+                child = StreamFrame(event == START_MAP, is_kept=is_needed,
+                                    is_searched=is_searched, level=frame.level + 1,
+                                    states=states, slot=slot)
+                stack.append(child)
+                continue
+
+            if slot is not None and is_right and not lookup_obj.is_right_matched(value):
+                slot[1] = None
+            if is_needed:
+                if frame.is_dict:
+                    frame.data[key] = value
+                else:
+                    frame.data.append(value)
+
+
+def open_stream(file):
+    """Get a stream of a filename or a file object and a flag whether
+    the stream is opened here and must be closed by a caller.  A gzip,
+    bzip2, or xz file is decompressed while it is read."""
+    if isinstance(file, IOBase) or hasattr(file, 'read'):
+        return file, False
+    return open_input(file, binary=True), True
+
+
+def stream_iterfind_json(file, lookup='', select='', limit=None,
+                         max_depth=None, on_exception=False,
+                         chunk_size=CHUNK_SIZE):
+    """Lazily search a lookup in a JSON file while it is being parsed.
+    Records are yielded in document order as soon as their parent
+    dictionary is parsed, and a LIMIT stops reading the file.
+
+    Parameters
+    ----------
+    file (str, io.IOBase): a JSON filename, or a readable text or binary stream.
+    lookup (str): a search pattern.
+    select (str): a select statement.  It can have a LIMIT clause.
+    limit (int): a maximum number of result.  Default is None.
+    max_depth (int): a maximum depth of matched key.  Default is None.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+    chunk_size (int): a number of characters or bytes per read.
+
+    Returns
+    -------
+    generator: a generator of filtered records, or a generator of whole
+            document if lookup and select are empty.
+    """
+    lookup = DLQuery._get_lookup(lookup, select, on_exception)
+    select_obj = SelectParser(select, on_exception=on_exception)
+    select_obj.parse_statement()
+    limit = get_limit(select_obj, limit=limit)
+    if limit is not None and limit <= 0:
+        return
+    searcher = None
+    if lookup is not None:
+        searcher = StreamSearcher(LookupCls(lookup), select_obj, max_depth=max_depth)
+
+    stream, is_opened = open_stream(file)
+    try:
+        events = JSONTokenizer(stream, chunk_size=chunk_size).iter_events()
+        if searcher is None:
+            yield build_from_events(events)
+            return
+
+        records = searcher.iterfind(events)
+        result = iter_filter_records(records, select_obj, on_exception=on_exception)
+        for total, item in enumerate(result, 1):
+            yield item
+            if total == limit:
+                return
+    finally:
+        is_opened and stream.close()
+
+
+def stream_find_json(file, lookup='', select='', limit=None, max_depth=None,
+                     on_exception=False, chunk_size=CHUNK_SIZE):
+    """Search a lookup in a JSON file while it is being parsed, without
+    loading whole document to memory.
+
+    Parameters
+    ----------
+    file (str, io.IOBase): a JSON filename, or a readable text or binary stream.
+    lookup (str): a search pattern.
+    select (str): a select statement.  It can have a LIMIT clause.
+    limit (int): a maximum number of result.  Default is None.
+    max_depth (int): a maximum depth of matched key.  Default is None.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+    chunk_size (int): a number of characters or bytes per read.
+
+    Returns
+    -------
+    List: list of Any, or whole document if lookup and select are empty.
+    """
+    records = stream_iterfind_json(file, lookup=lookup, select=select,
+                                   limit=limit, max_depth=max_depth,
+                                   on_exception=on_exception,
+                                   chunk_size=chunk_size)
+    if DLQuery._get_lookup(lookup, select, on_exception) is None:
+        return next(records, None)
+    return List(records)
+
+
+def iter_jsonl_records(stream, start=None, stop=None):
+    """Parse a JSON Lines stream and yield a record per non-blank line.
+
+    Parameters
+    ----------
+    stream (io.IOBase, MappedFile): a readable text or binary stream,
+            or a memory-mapped file.
+    start (int): a byte offset of a first line.  Default is None, i.e.
+            a current position of stream.
+    stop (int): a byte offset at which a last line starts before.
+            Default is None, i.e. end of stream.
+
+    Returns
+    -------
+    generator: a generator of records.
+
+    Raise
+    -----
+    JSONStreamError: if a line is not valid JSON.
+    """
+    start is not None and stream.seek(start)
+    position = start
+    for line_number, line in enumerate(stream, 1):
+        if stop is not None and position >= stop:
+            return
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as ex:
+                if position is None:
+                    fmt = '{} (line {}).'
+                    raise JSONStreamError(fmt.format(ex, line_number))
+                raise JSONStreamError('{} (line at byte {}).'.format(ex, position))
+        if position is not None:
+            position += len(line)
+
+
+def validate_jsonl_lookup(lookup_obj):
+    """Reject a path lookup which refers to a position of a line because
+    lines are searched one by one."""
+    path = lookup_obj.path
+    if path and isinstance(path[0][0], int) and not path[0][1]:
+        fmt = 'JSON Lines search does not support a positional path lookup {!r}.'
+        raise ArgumentError(fmt.format(lookup_obj.lookup))
+
+
+def iter_jsonl_found_records(records, lookup_obj, select_obj, limit=None,
+                             max_depth=None, on_exception=False):
+    """Search records one by one and yield filtered records in document
+    order, i.e. the same order as ``DLQuery.find`` on a list of records."""
+    found_records = chain.from_iterable(
+        iter_lookup_records([record], lookup_obj, max_depth=max_depth)
+        for record in records
+    )
+    result = iter_filter_records(found_records, select_obj, on_exception=on_exception)
+    for total, item in enumerate(result, 1):
+        yield item
+        if total == limit:
+            return
+
+
+def iterfind_jsonl_records(records, lookup='', select='', limit=None,
+                           max_depth=None, on_exception=False):
+    """Lazily search a lookup in records of a JSON Lines file one by one,
+    e.g. records which are reloaded from a snapshot cache.  A result is
+    the same as a result of stream_iterfind_jsonl.
+
+    Parameters
+    ----------
+    records (iterable): records of lines.
+    lookup (str): a search pattern.
+    select (str): a select statement.  It can have a LIMIT clause.
+    limit (int): a maximum number of result.  Default is None.
+    max_depth (int): a maximum depth of matched key.  A record of a line
+            is a top-level list item.  Default is None.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+    Returns
+    -------
+    generator: a generator of filtered records, or a generator of all
+            records if lookup and select are empty.
+    """
+    lookup = DLQuery._get_lookup(lookup, select, on_exception)
+    select_obj = SelectParser(select, on_exception=on_exception)
+    select_obj.parse_statement()
+    limit = get_limit(select_obj, limit=limit)
+    lookup_obj = None if lookup is None else LookupCls(lookup)
+    lookup_obj and validate_jsonl_lookup(lookup_obj)
+    if limit is not None and limit <= 0:
+        return
+
+    if lookup_obj is None:
+        yield from records
+        return
+    yield from iter_jsonl_found_records(records, lookup_obj, select_obj,
+                                        limit=limit, max_depth=max_depth,
+                                        on_exception=on_exception)
+
+
+def stream_iterfind_jsonl(file, lookup='', select='', limit=None,
+                          max_depth=None, on_exception=False):
+    """Lazily search a lookup in a JSON Lines file line by line.  Only one
+    record and matched results are held in memory, and a LIMIT stops
+    reading the file.
+
+    Parameters
+    ----------
+    file (str, io.IOBase): a JSON Lines filename, or a readable text or binary stream.
+    lookup (str): a search pattern.
+    select (str): a select statement.  It can have a LIMIT clause.
+    limit (int): a maximum number of result.  Default is None.
+    max_depth (int): a maximum depth of matched key.  A record of a line
+            is a top-level list item.  Default is None.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+    Returns
+    -------
+    generator: a generator of filtered records, or a generator of all
+            records if lookup and select are empty.
+    """
+    stream, is_opened = open_stream(file)
+    try:
+        yield from iterfind_jsonl_records(iter_jsonl_records(stream),
+                                          lookup=lookup, select=select,
+                                          limit=limit, max_depth=max_depth,
+                                          on_exception=on_exception)
+    finally:
+        is_opened and stream.close()
+
+
+def get_line_chunks(filename, count):
+    """Split a file to (start, stop) byte ranges which begin at lines.
+
+    Parameters
+    ----------
+    filename (str): a filename.
+    count (int): a number of chunks.
+
+    Returns
+    -------
+    list: a list of (start, stop) byte ranges.
+    """
+    boundaries = [0]
+    with MappedFile(filename) as mapped:
+        size = mapped.size
+        count = max(1, min(int(count), size or 1))
+        for i in range(1, count):
+            # a boundary moves to a start of next line unless it is already there
+            position = mapped.find_line_start(max(size * i // count, boundaries[-1]))
+            if position >= size:
+                break
+            boundaries.append(position)
+    boundaries.append(size)
+    chunks = [(start, stop) for start, stop in zip(boundaries, boundaries[1:])
+              if start < stop]
+    return chunks or [(0, 0)]
+
+
+def find_jsonl_chunk(task):
+    """Search a byte range of a JSON Lines file in a worker process.
+
+    Parameters
+    ----------
+    task (tuple): (filename, start, stop, query).
+
+    Returns
+    -------
+    list: a list of filtered records of chunk.
+    """
+    filename, start, stop, query = task
+    select_obj = SelectParser(query['select'], on_exception=query['on_exception'])
+    select_obj.parse_statement()
+    with MappedFile(filename) as mapped:
+        records = iter_jsonl_records(mapped, start=start, stop=stop)
+        if query['lookup'] is None:
+            return list(records)
+        return list(iter_jsonl_found_records(
+            records, LookupCls(query['lookup']), select_obj, limit=query['limit'],
+            max_depth=query['max_depth'], on_exception=query['on_exception']
+        ))
+
+
+def parallel_find_jsonl(filename, lookup='', select='', workers=2, limit=None,
+                        max_depth=None, on_exception=False):
+    """Search a lookup in a JSON Lines file with a process pool.  A file is
+    split at line boundaries, each worker parses and searches its own byte
+    range, and results are merged in original order.
+
+    Parameters
+    ----------
+    filename (str): a JSON Lines filename.
+    lookup (str): a search pattern.
+    select (str): a select statement.  It can have a LIMIT clause.
+    workers (int): a number of worker processes.  Default is 2.
+    limit (int): a maximum number of result.  Default is None.
+    max_depth (int): a maximum depth of matched key.  Default is None.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+    Returns
+    -------
+    List: list of record which is identical to a single-process result.
+    """
+    # validate lookup and select in parent process before starting workers
+    lookup = DLQuery._get_lookup(lookup, select, on_exception)
+    lookup is not None and validate_jsonl_lookup(LookupCls(lookup))
+    select_obj = SelectParser(select, on_exception=on_exception)
+    select_obj.parse_statement()
+    limit = get_limit(select_obj, limit=limit)
+    if limit is not None and limit <= 0:
+        return List()
+
+    query = dict(lookup=lookup, select=select, limit=limit,
+                 max_depth=max_depth, on_exception=on_exception)
+    executor, _ = get_process_pool(workers)
+    try:
+        futures = [
+            executor.submit(find_jsonl_chunk, (filename, start, stop, query))
+            for start, stop in get_line_chunks(filename, workers * CHUNKS_PER_WORKER)
+        ]
+        result = List()
+        for future in futures:
+            result.extend(future.result())
+            if limit is not None and len(result) >= limit:
+                del result[limit:]
+                break
+        for future in futures:
+            future.cancel()
+        return result
+    finally:
+        executor.shutdown(wait=True)
+
+
+def stream_find_jsonl(file, lookup='', select='', limit=None, max_depth=None,
+                      on_exception=False, workers=None):
+    """Search a lookup in a JSON Lines file line by line.
+
+    Parameters
+    ----------
+    file (str, io.IOBase): a JSON Lines filename, or a readable text or binary stream.
+    lookup (str): a search pattern.
+    select (str): a select statement.  It can have a LIMIT clause.
+    limit (int): a maximum number of result.  Default is None.
+    max_depth (int): a maximum depth of matched key.  Default is None.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+    workers (int): a number of worker processes which search byte ranges
+            of a file.  It is capped by CPU count and a stream is searched
+            in a single process, as are a pipe and an empty file.
+            Default is None.
+
+    Returns
+    -------
+    List: list of Any, or a list of all records if lookup and select are empty.
+    """
+    if is_mappable(file) and get_worker_count(workers) > 1:
+        return parallel_find_jsonl(file, lookup=lookup, select=select,
+                                   workers=get_worker_count(workers),
+                                   limit=limit, max_depth=max_depth,
+                                   on_exception=on_exception)
+    records = stream_iterfind_jsonl(file, lookup=lookup, select=select,
+                                    limit=limit, max_depth=max_depth,
+                                    on_exception=on_exception)
+    return List(records)
+
+
+def iter_yaml_documents(stream, loader=None, backend=None):
+    """Parse a YAML stream and yield its documents one at a time.  A YAML
+    loader builds a document only after a previous one is released, and
+    an empty document, e.g. after a trailing ---, is skipped.
+
+    Parameters
+    ----------
+    stream (str, io.IOBase): YAML data, or a readable text or binary stream.
+    loader (yaml.loader.Loader): a YAML loader.  Default is None, i.e. a
+            loader of backend.
+    backend (str): a YAML parser backend, i.e. libyaml or pyyaml.
+            Default is None, i.e. the fastest available one.
+
+    Returns
+    -------
+    generator: a generator of documents.
+    """
+    import yaml
+    from dlapp.factory import get_backend
+    loader = loader or get_backend('yaml', backend)[1]
+    for document in yaml.load_all(stream, Loader=loader):
+        if document is not None:
+            yield document
+
+
+def iterfind_yaml_documents(documents, lookup='', select='', limit=None,
+                            max_depth=None, on_exception=False):
+    """Lazily search a lookup in YAML documents one by one, e.g. documents
+    which are reloaded from a snapshot cache.  A result is the same as a
+    result of stream_iterfind_yaml.
+
+    Parameters
+    ----------
+    documents (iterable): documents of a YAML file.
+    lookup (str): a search pattern.
+    select (str): a select statement.  It can have a LIMIT clause.
+    limit (int): a maximum number of result.  Default is None.
+    max_depth (int): a maximum depth of matched key.  It is counted in
+            each document as in ``DLQuery.find``.  Default is None.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+    Returns
+    -------
+    generator: a generator of filtered records of all documents in order,
+            or a generator of documents if lookup and select are empty.
+    """
+    lookup = DLQuery._get_lookup(lookup, select, on_exception)
+    select_obj = SelectParser(select, on_exception=on_exception)
+    select_obj.parse_statement()
+    limit = get_limit(select_obj, limit=limit)
+    if limit is not None and limit <= 0:
+        return
+
+    if lookup is None:
+        yield from documents
+        return
+    lookup_obj = LookupCls(lookup)
+    found_records = chain.from_iterable(
+        iter_lookup_records(document, lookup_obj, max_depth=max_depth)
+        for document in documents
+    )
+    result = iter_filter_records(found_records, select_obj,
+                                 on_exception=on_exception)
+    for total, item in enumerate(result, 1):
+        yield item
+        if total == limit:
+            return
+
+
+def stream_iterfind_yaml(file, lookup='', select='', limit=None,
+                         max_depth=None, on_exception=False,
+                         loader=None, backend=None):
+    """Lazily search a lookup in a multi-document YAML file document by
+    document.  A document is searched as soon as it is parsed and released
+    afterwards, so memory holds one document and matched results, and a
+    LIMIT stops reading the file.
+
+    Parameters
+    ----------
+    file (str, io.IOBase): a YAML filename, or a readable text or binary stream.
+    lookup (str): a search pattern.
+    select (str): a select statement.  It can have a LIMIT clause.
+    limit (int): a maximum number of result.  Default is None.
+    max_depth (int): a maximum depth of matched key.  It is counted in
+            each document as in ``DLQuery.find``.  Default is None.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+    loader (yaml.loader.Loader): a YAML loader.  Default is None.
+    backend (str): a YAML parser backend.  Default is None, i.e. auto-select.
+
+    Returns
+    -------
+    generator: a generator of filtered records of all documents in order,
+            or a generator of documents if lookup and select are empty.
+    """
+    stream, is_opened = open_stream(file)
+    try:
+        documents = iter_yaml_documents(stream, loader=loader, backend=backend)
+        yield from iterfind_yaml_documents(documents, lookup=lookup,
+                                           select=select, limit=limit,
+                                           max_depth=max_depth,
+                                           on_exception=on_exception)
+    finally:
+        is_opened and stream.close()
+
+
+def stream_find_yaml(file, lookup='', select='', limit=None, max_depth=None,
+                     on_exception=False, loader=None, backend=None):
+    """Search a lookup in a multi-document YAML file document by document,
+    without loading all documents to memory.
+
+    Parameters
+    ----------
+    file (str, io.IOBase): a YAML filename, or a readable text or binary stream.
+    lookup (str): a search pattern.
+    select (str): a select statement.  It can have a LIMIT clause.
+    limit (int): a maximum number of result.  Default is None.
+    max_depth (int): a maximum depth of matched key.  Default is None.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+    loader (yaml.loader.Loader): a YAML loader.  Default is None.
+    backend (str): a YAML parser backend.  Default is None, i.e. auto-select.
+
+    Returns
+    -------
+    List: list of Any, or a list of documents if lookup and select are empty.
+    """
+    records = stream_iterfind_yaml(file, lookup=lookup, select=select,
+                                   limit=limit, max_depth=max_depth,
+                                   on_exception=on_exception,
+                                   loader=loader, backend=backend)
+    return List(records)
@@ -0,0 +1,267 @@
+"""Module containing the logic for the flat node table of dlapp."""
+
+from array import array
+from itertools import takewhile
+
+from dlapp.argumenthelper import validate_argument_type
+from dlapp.collection import List
+from dlapp.collection import Result
+from dlapp.collection import LookupCls
+from dlapp.collection import iter_filter_records
+from dlapp.collection import iter_path_records
+from dlapp.collection import get_limit
+from dlapp.collection import validate_search_order
+from dlapp.parser import SelectParser
+
+SCALAR = 0
+DICT = 1
+LIST = 2
+
+# a number of scanned nodes between checks of a stop flag
+STOP_CHECK_INTERVAL = 1024
+
+
+def get_kind(data):
+    """Get a node kind of data, i.e. DICT, LIST, or SCALAR."""
+    if isinstance(data, dict):
+        return DICT
+    elif isinstance(data, (list, tuple, set)):
+        return LIST
+    return SCALAR
+
+
+class NodeTable:
+    """A flat, array-backed representation of a dictionary or list.
+
+    Nodes are stored in depth-first document order, i.e. the same order
+    that ``Element.find`` visits them.  Node 0 is the root node.
+
+    Attributes
+    ----------
+    parent (array): a position of parent node.  It is -1 for root node.
+    depth (array): a depth of node.  It is 0 for root node.
+    kind (array): a node kind, i.e. SCALAR, DICT, or LIST.
+    key (list): a key of dictionary or a position of list item.
+    value (list): a reference to data of node.
+    on_exception (bool): raise `Exception` if set True, otherwise, return False.
+
+    Properties
+    ----------
+    bfs_positions -> array
+
+    Methods
+    -------
+    build(data) -> None
+    get_path(position) -> list
+    iter_matches(lookup_obj, max_depth=None, positions=None, stop=None) -> generator
+    iterfind(lookup, select='', limit=None, trigram_index=None, token_index=None, max_depth=None, order='dfs', predicate_workers=None, metrics=None, stop=None) -> generator
+    find(lookup, select='', trigram_index=None, token_index=None, limit=None, max_depth=None, order='dfs', predicate_workers=None, metrics=None) -> List
+    """
+    def __init__(self, data, on_exception=False):
+        self.parent = array('l')
+        self.depth = array('l')
+        self.kind = array('b')
+        self.key = []
+        self.value = []
+        self.on_exception = on_exception
+        self._bfs_positions = None
+        self.build(data)
+
+    def __len__(self):
+        return len(self.value)
+
+    def build(self, data):
+        """Build columns of node table in one pass over data.
+
+        Parameters
+        ----------
+        data (dict, list): a dict, dict-like, list, or list-like instance.
+        """
+        validate_argument_type(list, tuple, dict, data=data)
+        parent, depth, kind = array('l'), array('l'), array('b')
+        keys, values = [], []
+
+        stack = [(data, -1, None, 0)]
+        while stack:
+            node, parent_pos, key, level = stack.pop()
+            pos = len(values)
+            node_kind = get_kind(node)
+            parent.append(parent_pos)
+            depth.append(level)
+            kind.append(node_kind)
+            keys.append(key)
+            values.append(node)
+
+            if node_kind == DICT:
+                items = list(node.items())
+            elif node_kind == LIST:
+                items = list(enumerate(node))
+            else:
+                continue
+            for child_key, child in reversed(items):
+                stack.append((child, pos, child_key, level + 1))
+
+        self.parent, self.depth, self.kind = parent, depth, kind
+        self.key, self.value = keys, values
+        self._bfs_positions = None
+
+    @property
+    def bfs_positions(self):
+        """Get node positions in breadth-first order, i.e. document order
+        within each depth.  It is built once on first use."""
+        if self._bfs_positions is None:
+            depth = self.depth
+            self._bfs_positions = array(
+                'l', sorted(range(1, len(depth)), key=depth.__getitem__)
+            )
+        return self._bfs_positions
+
+    def get_path(self, position):
+        """Get a list of keys from root node to a node.
+
+        Parameters
+        ----------
+        position (int): a position of node.
+
+        Returns
+        -------
+        list: a list of keys.
+        """
+        path = []
+        while position > 0:
+            path.append(self.key[position])
+            position = self.parent[position]
+        path.reverse()
+        return path
+
+    def iter_matches(self, lookup_obj, max_depth=None, positions=None,
+                     stop=None):
+        """Scan node table and yield positions of nodes matching a lookup.
+
+        Parameters
+        ----------
+        lookup_obj (LookupCls): a LookupCls instance.
+        max_depth (int): a maximum depth of matched node.  Default is None.
+        positions (iterable): node positions to scan.  Default is None,
+                i.e. all nodes in document order.
+        stop (threading.Event): a stop flag which ends a scan within
+                STOP_CHECK_INTERVAL nodes once it is set.  Default is None.
+
+        Returns
+        -------
+        generator: a generator of node positions.
+        """
+        parent, kind, keys, values = self.parent, self.kind, self.key, self.value
+        depth = self.depth
+        left_cache = dict()
+        is_right = lookup_obj.is_right
+        positions = range(1, len(values)) if positions is None else positions
+        for total, pos in enumerate(positions):
+            if stop is not None and total % STOP_CHECK_INTERVAL == 0 and stop.is_set():
+                return
+            if kind[parent[pos]] != DICT:
+                continue
+            if max_depth is not None and depth[pos] > max_depth:
+                continue
+            key = keys[pos]
+            is_left_matched = left_cache.get(key)
+            if is_left_matched is None:
+                is_left_matched = lookup_obj.is_left_matched(key)
+                left_cache[key] = is_left_matched
+            if not is_left_matched:
+                continue
+            if is_right and not lookup_obj.is_right_matched(values[pos]):
+                continue
+            yield pos
+
+    def iterfind(self, lookup, select='', limit=None, trigram_index=None,
+                 token_index=None, max_depth=None, order='dfs',
+                 predicate_workers=None, metrics=None, stop=None):
+        """Lazily search a lookup by scanning node table and yield
+        filtered records in document order or breadth-first order.
+
+        Parameters
+        ----------
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        limit (int): a maximum number of result.  Default is None.
+        trigram_index (TrigramIndex): a trigram index of data.  Default is None.
+        token_index (TokenIndex): a token index of data.  Default is None.
+        max_depth (int): a maximum depth of matched key.  Default is None.
+        order (str): dfs or bfs.  Default is dfs.
+        predicate_workers (int): a number of threads to evaluate a WHERE
+                clause.  Default is None.
+        metrics (FilterMetrics): a FilterMetrics instance to collect timing
+                metrics.  Default is None.
+        stop (threading.Event): a stop flag which ends a scan once it is
+                set.  Default is None.
+
+        Returns
+        -------
+        generator: a generator of filtered records.
+        """
+        order = validate_search_order(order)
+        lkup_obj = LookupCls(lookup)
+        lkup_obj.apply_trigram_index(trigram_index)
+        select_obj = SelectParser(select, on_exception=self.on_exception,
+                                  token_index=token_index)
+        select_obj.parse_statement()
+        limit = get_limit(select_obj, limit=limit)
+        if limit is not None and limit <= 0:
+            return
+
+        parent, values = self.parent, self.value
+        if lkup_obj.path:
+            records = iter_path_records(values[0], lkup_obj, max_depth=max_depth,
+                                        stop=stop)
+        else:
+            positions = None
+            if order == 'bfs':
+                positions = self.bfs_positions
+                if max_depth is not None:
+                    is_within = lambda pos: self.depth[pos] <= max_depth     # noqa
+                    positions = takewhile(is_within, positions)
+            positions = self.iter_matches(lkup_obj, max_depth=max_depth,
+                                          positions=positions, stop=stop)
+            records = (
+                Result(values[pos], parent=Result(values[parent[pos]]))
+                for pos in positions
+            )
+        result = iter_filter_records(records, select_obj,
+                                     on_exception=self.on_exception,
+                                     workers=predicate_workers, metrics=metrics)
+        for total, item in enumerate(result, 1):
+            yield item
+            if total == limit:
+                return
+
+    def find(self, lookup, select='', trigram_index=None, token_index=None,
+             limit=None, max_depth=None, order='dfs', predicate_workers=None,
+             metrics=None):
+        """Search a lookup by scanning node table.
+
+        Parameters
+        ----------
+        lookup (str): a search pattern.
+        select (str): a select statement.  It can have a LIMIT clause.
+        trigram_index (TrigramIndex): a trigram index of data.  Default is None.
+        token_index (TokenIndex): a token index of data.  Default is None.
+        limit (int): a maximum number of result.  Default is None.
+        max_depth (int): a maximum depth of matched key.  Default is None.
+        order (str): dfs or bfs.  Default is dfs.
+        predicate_workers (int): a number of threads to evaluate a WHERE
+                clause.  Default is None.
+        metrics (FilterMetrics): a FilterMetrics instance to collect timing
+                metrics.  Default is None.
+
+        Returns
+        -------
+        List: list of record
+        """
+        result = List(self.iterfind(lookup, select=select, limit=limit,
+                                    trigram_index=trigram_index,
+                                    token_index=token_index,
+                                    max_depth=max_depth, order=order,
+                                    predicate_workers=predicate_workers,
+                                    metrics=metrics))
+        return result
@@ -1,6 +1,8 @@
 """Module containing the logic for utilities."""
 
 import re
+import gc
+from contextlib import contextmanager
 from collections import OrderedDict
 from dlapp.argumenthelper import validate_argument_type
 
@@ -171,3 +173,16 @@ def foreach(data, choice='keys'):
         return node.values()
     else:
         return node.items()
+
+
+@contextmanager
+def paused_gc():
+    """Pause cyclic garbage collection while a bulk load allocates many
+    containers which do not make reference cycles.  Otherwise, each full
+    collection traverses all containers built so far again."""
+    is_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        is_enabled and gc.enable()
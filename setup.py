@@ -16,6 +16,10 @@ setup(
     maintainer='Tuyen Mathew Duong',
     maintainer_email='tuyen@geekstrident.com',
     install_requires=['pyyaml', 'compare_versions', 'python-dateutil'],
+    extras_require={
+        'orjson': ['orjson'],
+        'ujson': ['ujson'],
+    },
     url='https://github.com/Geeks-Trident-LLC/dlapp',
     packages=find_packages(
         exclude=(
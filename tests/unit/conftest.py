@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from dlapp import DLQuery
+
+INDEX_NAMES = ('trigram_index', 'token_index', 'key_summary', 'node_table')
+
+
+class ExplodingDict(dict):
+    """A dictionary which fails when a traversal visits its items."""
+    def items(self):
+        raise RuntimeError('traversal did not skip this subtree')
+
+
+@pytest.fixture
+def exploding_dict():
+    yield ExplodingDict
+
+
+@pytest.fixture
+def mixed_data():
+    """Records with values which indexes treat differently from a scan,
+    i.e. None, numbers, booleans, empty strings, empty containers,
+    non-string keys, and text without words."""
+    obj = [
+        {'n': 1, 'msg': None, 'code': 42, 'tags': []},
+        {'n': 2, 'msg': 42, 'code': '42', 'tags': ['none']},
+        {'n': 3, 'msg': 'code 42 seen', 'code': None, 'flag': True},
+        {'n': 4, 'msg': '', 'code': 'İstanbul', 'meta': {}},
+        {'n': 5, 'msg': '... ---', 'code': 4.5, 7: 'int key'},
+        {'n': 6, 'msg': 'None of 42', 'code': False, 'meta': {'msg': 'deep'}},
+    ]
+    yield obj
+
+
+@pytest.fixture
+def assert_same_result():
+    """Get a function which asserts that a query returns the same result
+    with each index as without any index, and returns that result."""
+    def check(data, lookup='', select='', index_names=INDEX_NAMES, **kwargs):
+        expected_result = DLQuery(data).find(lookup=lookup, select=select, **kwargs)
+        for name in index_names:
+            query_obj = DLQuery(data)
+            getattr(query_obj, 'build_{}'.format(name))()
+            result = query_obj.find(lookup=lookup, select=select, **kwargs)
+            assert result == expected_result, name
+        return expected_result
+    yield check
+
+
+@pytest.fixture
+def run_async():
+    """Get a function which runs a coroutine in a new event loop.
+    asyncio.run is not used because it needs Python 3.7 or later."""
+    def run(coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+    yield run
@@ -1,9 +1,15 @@
+import time
+import threading
+
 import pytest
 
 from dlapp.collection import Element
 from dlapp.collection import LookupCls
 from dlapp.collection import List
 from dlapp.collection import ListIndexError
+from dlapp.collection import FilterMetrics
+from dlapp import collection
+from dlapp.exceptions import LookupClsError
 
 
 @pytest.fixture
@@ -684,3 +690,104 @@ class TestList:
 
         with pytest.raises(ListIndexError):
             lst_obj.last
+
+
+class TestCompactElement:
+    def test_element_uses_slots(self, list_data):
+        elm = Element(list_data)
+        assert not hasattr(elm, '__dict__')
+        assert [child.index for child in elm.children] == [0, 1]
+        assert elm.value is None
+
+        leaf = Element('abc')
+        assert leaf.value == 'abc'
+        assert leaf.children == ()
+
+    def test_empty_children_are_shared(self):
+        elm = Element({'a': {}, 'b': []})
+        assert elm.children[0].children is elm.children[1].children
+        assert elm.find('a') == [{}]
+
+
+class TestPathLookupCls:
+    @pytest.mark.parametrize(
+        "lookup,expected_path,expected_left",
+        [
+            ('$.a.b', [('a', False), ('b', False)], '^b$'),
+            ('$.a[*].b', [('a', False), (None, False), ('b', False)], '^b$'),
+            ('$.a[-1].b', [('a', False), (-1, False), ('b', False)], '^b$'),
+            ('$..a.*', [('a', True), (None, False)], None),
+            ("$['x.y']..b", [('x.y', False), ('b', True)], '^b$'),
+        ]
+    )
+    def test_parse_path(self, lookup, expected_path, expected_left):
+        lkup_obj = LookupCls(lookup)
+        assert lkup_obj.path == expected_path
+        assert lkup_obj.left == expected_left
+
+    @pytest.mark.parametrize(
+        "lookup",
+        ['$.', '$[0]', '$.a[0]', '$.a[*]', '$..a[*]', '$.a[x]', '$.a..', '$.a]']
+    )
+    def test_invalid_path(self, lookup):
+        with pytest.raises(LookupClsError):
+            LookupCls(lookup)
+
+    @pytest.mark.parametrize(
+        "lookup,expected_left",
+        [
+            ('$ref', '^\\$ref$'),
+            ('$schema', '^\\$schema$'),
+            ('$', '^\\$$'),
+        ]
+    )
+    def test_dollar_key_is_not_path(self, lookup, expected_left):
+        lkup_obj = LookupCls(lookup)
+        assert lkup_obj.path is None
+        assert lkup_obj.left == expected_left
+
+
+class TestThreadedFilter:
+    @pytest.fixture
+    def host_data(self):
+        obj = [
+            {'host': 'h{}'.format(i), 'ip': '10.0.0.{}'.format(i) if i % 3 else 'n/a'}
+            for i in range(30)
+        ]
+        yield obj
+
+    def test_filter_result_keeps_order(self, host_data):
+        elm = Element(host_data)
+        records = collection.iter_found_records(host_data, LookupCls('host'))
+        records = list(records)
+        select_statement = 'host where ip is ipv4_address'
+        expected_result = elm.filter_result(records, select_statement)
+
+        metrics = FilterMetrics()
+        result = elm.filter_result(records, select_statement, workers=4,
+                                   metrics=metrics)
+        assert result == expected_result
+        assert metrics.workers == 4
+        assert metrics.total == 30
+        assert metrics.selected == len(expected_result) == 20
+        assert metrics.max_predicate_time <= metrics.predicate_time
+        assert metrics.average_predicate_time > 0
+
+    def test_find_runs_predicate_in_threads(self, host_data, monkeypatch):
+        select_record = collection.select_record
+        thread_ids = set()
+
+        def slow_select_record(*args, **kwargs):
+            thread_ids.add(threading.get_ident())
+            time.sleep(0.005)
+            return select_record(*args, **kwargs)
+
+        monkeypatch.setattr(collection, 'select_record', slow_select_record)
+        elm = Element(host_data)
+        select_statement = 'host where ip is ipv4_address LIMIT 5'
+        metrics = FilterMetrics()
+        result = elm.find('host', select=select_statement,
+                          predicate_workers=4, metrics=metrics)
+        assert result == [{'host': 'h{}'.format(i)} for i in [1, 2, 4, 5, 7]]
+        assert len(thread_ids) > 1
+        assert metrics.total == 8
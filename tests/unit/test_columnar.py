@@ -0,0 +1,103 @@
+import csv
+import io
+import threading
+
+import pytest
+
+from dlapp import DLQuery
+from dlapp import ColumnTable
+from dlapp import create_from_csv_data
+from dlapp.columnar import MAX_CATEGORIES
+from dlapp.columnar import EncodedColumn
+from dlapp.columnar import ValueColumn
+
+
+@pytest.fixture
+def text():
+    lines = ['hostname,ip,interface,status,mtu']
+    for i in range(300):
+        lines.append('r{0},10.0.0.{1},Gi{2},{3},{4}'.format(
+            i, i % 256, i % 3, 'up' if i % 4 else 'down', 1500 + i % 2 * 7500))
+    lines.insert(5, '')
+    lines.append('short,10.0.0.1')
+    lines.append('long,10.0.0.2,Gi0,up,1500,extra,more')
+    yield '\n'.join(lines)
+
+
+def read_rows(text, **kwargs):
+    return list(csv.DictReader(io.StringIO(text), **kwargs))
+
+
+class TestColumnTable:
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{}, dict(restkey='rest', restval=''), dict(fieldnames=['a', 'b', 'a'])]
+    )
+    def test_rows(self, text, kwargs):
+        table = ColumnTable.from_csv_reader(csv.reader(io.StringIO(text)), **kwargs)
+        rows = read_rows(text, **kwargs)
+        assert len(table) == len(rows)
+        assert table == rows
+        assert table[-1] == rows[-1]
+        assert table[2:5] == rows[2:5]
+
+    def test_encoding(self, text):
+        table = ColumnTable.from_csv_reader(csv.reader(io.StringIO(text)))
+        assert isinstance(table.columns['status'], EncodedColumn)
+        assert table.columns['status'].codes.typecode == 'B'
+        assert table.columns['status'].categories == ['down', 'up', None]
+        assert table.columns['hostname'].codes.typecode == 'H'
+
+        rows = ['{0},{0}'.format(i) for i in range(MAX_CATEGORIES + 1)]
+        table = ColumnTable.from_csv_reader(csv.reader(['a,b'] + rows))
+        assert isinstance(table.columns['a'], ValueColumn)
+        assert table[MAX_CATEGORIES] == {'a': str(MAX_CATEGORIES), 'b': str(MAX_CATEGORIES)}
+
+    def test_numeric(self):
+        text = 'a,b,c,d\n1,1.5,x,7\n-2,2e3,y,\n'
+        query_obj = create_from_csv_data(text, columnar=True, numeric=True)
+        assert query_obj.data == [
+            {'a': 1, 'b': 1.5, 'c': 'x', 'd': '7'},
+            {'a': -2, 'b': 2000.0, 'c': 'y', 'd': ''},
+        ]
+
+    @pytest.mark.parametrize(
+        "lookup,select_statement,kwargs",
+        [
+            ('hostname', '', {}),
+            ('status=down', '', {}),
+            ('status=down', 'hostname, mtu', {}),
+            ('interface=Gi1', 'hostname where mtu gt 1500', {}),
+            ('_wildcard(*t*)=_wildcard(*u*)', '', {}),
+            ('mtu', '', dict(limit=5)),
+            ('mtu', 'limit 3', {}),
+            ('hostname', '*', dict(max_depth=1)),
+            ('hostname', '', dict(order='bfs', max_depth=2)),
+            ('$[1].hostname', '', {}),
+            ('', 'hostname where status eq down', {}),
+            ('missing', '', {}),
+            (None, '', dict(restkey='rest')),
+            ('rest', '', dict(restkey='rest')),
+        ]
+    )
+    def test_find(self, text, lookup, select_statement, kwargs):
+        restkey = kwargs.pop('restkey', None)
+        query_obj = DLQuery(read_rows(text, restkey=restkey))
+        expected_result = query_obj.find(lookup=lookup or '', select=select_statement,
+                                         **kwargs)
+        query_obj = create_from_csv_data(text, restkey=restkey, columnar=True)
+        result = query_obj.find(lookup=lookup or '', select=select_statement, **kwargs)
+        assert result == expected_result
+
+    def test_find_many_and_iterfind(self, text):
+        query_obj = create_from_csv_data(text, columnar=True)
+        expected_result = DLQuery(read_rows(text)).find_many(
+            ['status=down', ('mtu', 'hostname where mtu gt 1500')]
+        )
+        assert query_obj.find_many(
+            ['status=down', ('mtu', 'hostname where mtu gt 1500')]
+        ) == expected_result
+
+        stop = threading.Event()
+        stop.set()
+        assert list(query_obj.iterfind('hostname', stop=stop)) == []
@@ -0,0 +1,130 @@
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import threading
+from os import path
+
+import pytest
+
+from dlapp import DLQuery
+from dlapp import create_from_csv_file
+from dlapp import create_from_json_file
+from dlapp import create_from_jsonl_file
+from dlapp import create_from_yaml_file
+from dlapp import iter_from_yaml_file
+from dlapp import stream_find_json
+from dlapp import stream_find_jsonl
+from dlapp import stream_find_yaml
+from dlapp.compressed import get_compression
+from dlapp.compressed import open_input
+from dlapp.compressed import strip_compression_extension
+from dlapp.csvfile import parallel_read_csv
+from dlapp.mapped import is_mappable
+
+test_path = path.dirname(__file__)
+
+COMPRESSORS = {'gzip': gzip.compress, 'bz2': bz2.compress, 'xz': lzma.compress}
+
+
+def read_sample(name):
+    with open(path.join(test_path, 'data', name), 'rb') as stream:
+        return stream.read()
+
+
+def write_compressed(tmpdir, name, data, compression):
+    filename = str(tmpdir.join(name))
+    with open(filename, 'wb') as stream:
+        stream.write(COMPRESSORS[compression](data))
+    return filename
+
+
+@pytest.mark.parametrize("compression", ['gzip', 'bz2', 'xz'])
+class TestCompressedInput:
+    def test_get_compression(self, tmpdir, compression):
+        # detection is by magic bytes, so an extension does not matter
+        filename = write_compressed(tmpdir, 'sample.data', b'{}', compression)
+        assert get_compression(filename) == compression
+        assert not is_mappable(filename)
+        with open_input(filename) as stream:
+            assert stream.read() == '{}'
+        with open_input(filename, binary=True) as stream:
+            assert stream.read() == b'{}'
+
+    @pytest.mark.parametrize(
+        "func,name",
+        [
+            (create_from_json_file, 'sample.json'),
+            (create_from_yaml_file, 'sample.yaml'),
+            (create_from_csv_file, 'sample.csv'),
+            (create_from_jsonl_file, 'sample.jsonl'),
+        ]
+    )
+    def test_creating_dlquery(self, tmpdir, compression, func, name):
+        filename = write_compressed(tmpdir, name + '.z', read_sample(name), compression)
+        query_obj = func(filename)
+        assert query_obj.data == func(path.join(test_path, 'data', name)).data
+
+    def test_creating_dlquery_with_mmap_and_workers(self, tmpdir, compression):
+        data = read_sample('sample.csv') * 3
+        filename = write_compressed(tmpdir, 'sample.csv.z', data, compression)
+        expected_result = create_from_csv_file(io.StringIO(data.decode(), newline=''))
+        assert create_from_csv_file(filename, use_mmap=True).data == expected_result.data
+        assert parallel_read_csv(filename, workers=2) == expected_result.data
+
+        data = read_sample('sample.json')
+        filename = write_compressed(tmpdir, 'sample.json.z', data, compression)
+        assert create_from_json_file(filename, use_mmap=True).data == json.loads(data)
+
+    def test_streaming_search(self, tmpdir, compression):
+        data = read_sample('sample.json')
+        filename = write_compressed(tmpdir, 'sample.json.z', data, compression)
+        expected_result = DLQuery(json.loads(data)).find(lookup='a')
+        assert stream_find_json(filename, lookup='a') == expected_result
+
+        data = read_sample('sample.jsonl')
+        filename = write_compressed(tmpdir, 'sample.jsonl.z', data, compression)
+        records = create_from_jsonl_file(path.join(test_path, 'data/sample.jsonl')).data
+        expected_result = DLQuery(records).find(lookup='a')
+        assert stream_find_jsonl(filename, lookup='a', workers=2) == expected_result
+
+        filename = write_compressed(tmpdir, 'docs.yaml.z', b'a: 1\n---\na: 2\n', compression)
+        assert stream_find_yaml(filename, lookup='a') == [1, 2]
+        assert [obj.data for obj in iter_from_yaml_file(filename)] == [{'a': 1}, {'a': 2}]
+
+    def test_binary_stream(self, compression):
+        stream = io.BufferedReader(io.BytesIO(COMPRESSORS[compression](b'a,b\r\n1,2\r\n')))
+        with open_input(stream, newline='') as text:
+            assert create_from_csv_file(text).data == [{'a': '1', 'b': '2'}]
+
+
+@pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason='requires named pipes')
+def test_named_pipe_by_extension(tmpdir):
+    filename = str(tmpdir.join('pipe.json.gz'))
+    os.mkfifo(filename)
+
+    def write():
+        with open(filename, 'wb') as stream:
+            stream.write(gzip.compress(b'{"a": "Apricot"}'))
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    assert get_compression(filename) == 'gzip'
+    query_obj = create_from_json_file(filename)
+    writer.join(timeout=10)
+    assert query_obj.get('a') == 'Apricot'
+
+
+@pytest.mark.parametrize(
+    "filename,expected_result",
+    [
+        ('inventory.json.gz', 'inventory.json'),
+        ('inventory.csv.XZ', 'inventory.csv'),
+        ('inventory.yaml.bz2', 'inventory.yaml'),
+        ('inventory.json', 'inventory.json'),
+    ]
+)
+def test_strip_compression_extension(filename, expected_result):
+    assert strip_compression_extension(filename) == expected_result
@@ -0,0 +1,258 @@
+import io
+import csv
+import pickle
+
+import pytest
+
+from dlapp import ColumnTable
+from dlapp import create_from_csv_file
+from dlapp import DLQuery
+from dlapp import csvfile
+from dlapp.csvfile import get_csv_chunks
+from dlapp.csvfile import get_query_columns
+from dlapp.csvfile import get_quoted_pattern
+from dlapp.csvfile import get_safe_dialect
+from dlapp.csvfile import is_well_quoted
+from dlapp.csvfile import parallel_read_csv
+from dlapp.csvfile import read_csv_chunk
+from dlapp.csvfile import read_csv_rows
+from dlapp.mapped import MappedFile
+
+
+@pytest.fixture
+def text():
+    lines = ['hostname,description,status,mtu']
+    for i in range(400):
+        description = 'uplink "core"\nport {}'.format(i) if i % 7 == 0 else 'port {}'.format(i)
+        lines.append('r{},"{}",{},{}'.format(
+            i, description.replace('"', '""'), 'up' if i % 4 else 'down', 1500 + i % 2))
+    lines.insert(9, '')
+    lines.append('short,only')
+    lines.append('long,"a",up,1500,extra,more')
+    yield '\r\n'.join(lines) + '\r\n'
+
+
+def write_file(tmp_path, text, name='data.csv'):
+    filename = str(tmp_path / name)
+    with open(filename, 'w', newline='', encoding='utf-8') as stream:
+        stream.write(text)
+    return filename
+
+
+def read_serially(filename, columnar=False, **kwargs):
+    with open(filename, newline='', encoding='utf-8') as stream:
+        if columnar:
+            return ColumnTable.from_csv_reader(csv.reader(stream), **kwargs)
+        return list(csv.DictReader(stream, **kwargs))
+
+
+class TestParallelReadCsv:
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {},
+            dict(restkey='rest', restval=''),
+            dict(fieldnames=['a', 'b', 'c', 'd']),
+        ]
+    )
+    @pytest.mark.parametrize("columnar", [False, True])
+    def test_parallel_read_csv(self, tmp_path, text, kwargs, columnar):
+        filename = write_file(tmp_path, text)
+        expected_result = read_serially(filename, columnar=columnar, **kwargs)
+        result = parallel_read_csv(filename, workers=2, columnar=columnar, **kwargs)
+        assert len(result) == len(expected_result)
+        assert result == expected_result
+        assert isinstance(result, ColumnTable) == columnar
+
+    def test_numeric(self, tmp_path, text):
+        text = text.rsplit('short', 1)[0]
+        filename = write_file(tmp_path, text)
+        table = parallel_read_csv(filename, workers=2, columnar=True, numeric=True)
+        assert table == read_serially(filename, columnar=True, numeric=True)
+        assert table[1]['mtu'] == 1501
+
+    @pytest.mark.parametrize(
+        "line",
+        ['r1,5\'10",up,1500', 'r1,"a"b,up,1500', 'r1,"unterminated,up,1500'],
+    )
+    def test_fallback_on_malformed_quotes(self, tmp_path, text, line):
+        lines = text.split('\r\n')
+        lines.insert(len(lines) // 2, line)
+        filename = write_file(tmp_path, '\r\n'.join(lines))
+        result = parallel_read_csv(filename, workers=2)
+        assert result == read_serially(filename)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [dict(escapechar='\\'), dict(skipinitialspace=True), dict(doublequote=False)]
+    )
+    def test_fallback_on_unsafe_dialect(self, tmp_path, text, kwargs):
+        assert get_safe_dialect('excel', **kwargs) is None
+        filename = write_file(tmp_path, text)
+        result = parallel_read_csv(filename, workers=2, **kwargs)
+        with open(filename, newline='') as stream:
+            assert result == list(csv.DictReader(stream, **kwargs))
+
+    def test_quote_none(self, tmp_path):
+        text = 'a,b\n"x,1\n2,y"\n' * 50
+        filename = write_file(tmp_path, text)
+        kwargs = dict(quoting=csv.QUOTE_NONE)
+        assert get_quoted_pattern(get_safe_dialect(**kwargs)) is None
+        result = parallel_read_csv(filename, workers=2, **kwargs)
+        with open(filename, newline='') as stream:
+            assert result == list(csv.DictReader(stream, **kwargs))
+
+    def test_read_csv_chunk(self, tmp_path):
+        filename = write_file(tmp_path, 'a,"b\nc"\nd,e"f\n')
+        options = dict(restkey=None, restval=None, dialect='excel',
+                       columnar=False, numeric=False, args=(), kwds=dict())
+        result = read_csv_chunk((filename, 0, 8, ['x', 'y'], options))
+        assert result == [dict(x='a', y='b\nc')]
+        assert read_csv_chunk((filename, 8, 15, ['x', 'y'], options)) is None
+
+    @pytest.mark.parametrize(
+        "data,expected_result",
+        [
+            (b'a,b\r\nc,d', True),
+            (b'"a",b\n"c\nd","e,""f"""\r\n"",', True),
+            (b'"a","b"', True),
+            (b'a,b"c', False),
+            (b'a,"b"c', False),
+            (b'a,"b', False),
+            (b'"a"x,"b"', False),
+            (b'a,"b"' + b'x' * 5000 + b'"', False),
+        ]
+    )
+    def test_is_well_quoted(self, data, expected_result):
+        dialect = get_safe_dialect()
+        assert is_well_quoted(data, 0, len(data), dialect) is expected_result
+
+    @pytest.mark.parametrize("count", [1, 2, 3, 8, 1000])
+    def test_get_csv_chunks(self, tmp_path, text, count):
+        filename = write_file(tmp_path, text)
+        with MappedFile(filename) as mapped:
+            chunks = get_csv_chunks(mapped, 0, count, quotechar='"')
+            assert chunks[0][0] == 0 and chunks[-1][1] == mapped.size
+            assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+            for start, stop in chunks:
+                assert mapped.mmap[:start].count(b'"') % 2 == 0
+
+    def test_small_file_is_read_serially(self, tmp_path, text, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError('a small file is read in a process pool')
+
+        monkeypatch.setattr(csvfile, 'parallel_read_csv', fail)
+        monkeypatch.setattr(csvfile, 'get_worker_count', lambda workers: 2)
+        filename = write_file(tmp_path, text)
+        query_obj = create_from_csv_file(filename, workers=2)
+        assert query_obj.data == read_serially(filename)
+
+    def test_large_file_is_read_in_parallel(self, tmp_path, text, monkeypatch):
+        calls = []
+
+        def read(*args, **kwargs):
+            calls.append(kwargs['workers'])
+            return parallel_read_csv(*args, **kwargs)
+
+        monkeypatch.setattr(csvfile, 'parallel_read_csv', read)
+        monkeypatch.setattr(csvfile, 'get_worker_count', lambda workers: 2)
+        monkeypatch.setattr(csvfile, 'PARALLEL_CSV_THRESHOLD', 1)
+        filename = write_file(tmp_path, text)
+        query_obj = create_from_csv_file(filename, workers=2, columnar=True)
+        assert calls == [2]
+        assert query_obj.data == read_serially(filename)
+
+
+class TestColumnTableConcat:
+    def test_concat(self, text):
+        lines = text.split('\r\n')
+        header, first, second = lines[0], lines[1:200], lines[200:]
+        tables = [
+            ColumnTable.from_csv_reader(csv.reader(rows), fieldnames=header.split(','),
+                                        restkey='rest')
+            for rows in (first, second)
+        ]
+        tables = pickle.loads(pickle.dumps(tables))
+        table = ColumnTable.concat(tables)
+        expected_result = list(csv.DictReader(lines, restkey='rest'))
+        assert table == expected_result
+        assert 'rest' not in table[0]
+        assert table[-1]['rest'] == ['extra', 'more']
+
+
+class TestProjection:
+    @pytest.mark.parametrize(
+        "columns",
+        [
+            [],
+            ['mtu'],
+            ['status', 'hostname', 'missing'],
+            ['hostname', 'rest'],
+        ]
+    )
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            dict(restkey='rest', restval=''),
+            dict(fieldnames=['hostname', 'status', 'hostname']),
+        ]
+    )
+    def test_read_csv_rows(self, text, columns, kwargs):
+        records = list(csv.DictReader(io.StringIO(text, newline=''), **kwargs))
+        expected_result = [{key: value for key, value in record.items() if key in columns}
+                           for record in records]
+        result = read_csv_rows(io.StringIO(text, newline=''), columns=columns, **kwargs)
+        assert result == expected_result
+        assert [list(record) for record in result] == [list(record) for record in expected_result]
+
+        table = read_csv_rows(io.StringIO(text, newline=''), columnar=True,
+                              columns=columns, **kwargs)
+        if table.columns:
+            assert table == expected_result
+
+    @pytest.mark.parametrize(
+        "lookup,select_statement",
+        [
+            ('hostname=r7', ''),
+            ('_wildcard(host*)', 'SELECT status WHERE mtu eq 1501'),
+            ('', 'SELECT description, status WHERE hostname match r1[0-9]'),
+            ('mtu', 'limit 3'),
+            ('=down', ''),
+            ('hostname', 'SELECT *'),
+            ('$[*].status', ''),
+        ]
+    )
+    @pytest.mark.parametrize("columnar", [False, True])
+    def test_query_columns(self, tmp_path, text, lookup, select_statement, columnar):
+        filename = write_file(tmp_path, text)
+        expected_result = create_from_csv_file(filename).find(lookup=lookup, select=select_statement)
+        columns = get_query_columns(lookup, select_statement)
+        query_obj = create_from_csv_file(filename, columnar=columnar, columns=columns)
+        assert query_obj.find(lookup=lookup, select=select_statement) == expected_result
+
+        result = parallel_read_csv(filename, workers=2, columnar=columnar, columns=columns)
+        assert DLQuery(result).find(lookup=lookup, select=select_statement) == expected_result
+
+    def test_get_query_columns(self):
+        columns = get_query_columns('_iwildcard(host*)', 'SELECT ip WHERE mtu gt 1000')
+        assert [name for name in ['Hostname', 'ip', 'mtu', 'status'] if columns(name)] == \
+            ['Hostname', 'ip', 'mtu']
+        assert repr(columns) == "QueryColumns(lookup='_iwildcard(host*)', keys=['ip', 'mtu'])"
+
+        # a query which may need any field is not projected
+        assert get_query_columns('', '') is None
+        assert get_query_columns('hostname', 'SELECT *') is None
+        assert get_query_columns('=r1') is None
+        assert get_query_columns('$.devices[*].hostname') is None
+
+    def test_cache_key(self, tmp_path, text):
+        filename = write_file(tmp_path, text)
+        cache = str(tmp_path / 'cache')
+        mtu = create_from_csv_file(filename, columns=get_query_columns('mtu'), cache=cache)
+        status = create_from_csv_file(filename, columns=get_query_columns('status'), cache=cache)
+        assert mtu.snapshot.path != status.snapshot.path
+        assert list(status.data[0]) == ['status']
+
+        query_obj = create_from_csv_file(filename, columns=lambda name: name == 'mtu', cache=cache)
+        assert query_obj.snapshot is None
+        assert list(query_obj.data[0]) == ['mtu']
@@ -1,4 +1,10 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from dlapp import DLQuery
+from dlapp.exceptions import ArgumentError
 import pytest
 
 
@@ -430,3 +436,287 @@ class TestQueryingDLQuery:
         result_a = dl_obj.find(lookup=lookup_a, select=select_a)
         result_b = dl_obj.find(node=result_a, lookup=lookup_b, select=select_b)
         assert result_b == expected_result
+
+
+class TestIterFindDLQuery:
+    def test_iterfind_yields_in_document_order(self, another_list_data):
+        query_obj = DLQuery(another_list_data)
+        result = query_obj.iterfind('name', select='width')
+        assert not isinstance(result, list)
+        assert list(result) == query_obj.find(lookup='name', select='width')
+
+    @pytest.mark.parametrize(
+        "lookup,select_statement,limit,expected_result",
+        [
+            ('name', 'LIMIT 2', None, ['window abc', 'image abc']),
+            ('name', 'name WHERE width gt 100 LIMIT 1', None, [{'name': 'window abc'}]),
+            ('name', 'name WHERE width gt 100 limit 3', 2, [{'name': 'window abc'}, {'name': 'text abc'}]),
+            ('name', '', 1, ['window abc']),
+            ('name', '', 0, []),
+        ]
+    )
+    def test_find_with_limit(self, another_list_data, lookup, select_statement,
+                             limit, expected_result):
+        query_obj = DLQuery(another_list_data)
+        result = query_obj.find(lookup=lookup, select=select_statement, limit=limit)
+        assert result == expected_result
+
+        result = list(query_obj.iterfind(lookup, select=select_statement, limit=limit))
+        assert result == expected_result
+
+    def test_iterfind_stops_early(self, exploding_dict):
+        data = [{'name': 'a'}, exploding_dict(name='b')]
+        query_obj = DLQuery(data)
+        assert query_obj.find(lookup='name', limit=1) == ['a']
+        assert list(query_obj.iterfind('name', select='LIMIT 1')) == ['a']
+
+        with pytest.raises(RuntimeError):
+            query_obj.find(lookup='name')
+
+
+class TestFindManyDLQuery:
+    def test_find_many_matches_find(self, another_list_data):
+        queries = [
+            ('name', ''),
+            ('=_iwildcard(*.png)', 'src'),
+            ('debug=off', 'window'),
+            ('alignment', 'name where width == 300 || data match (?i).+ abc'),
+            ('name', 'LIMIT 2'),
+            'width',
+            ('', 'SELECT height'),
+            ('', ''),
+        ]
+        query_obj = DLQuery(another_list_data)
+        result = query_obj.find_many(queries)
+        assert len(result) == len(queries)
+        for query, items in zip(queries, result):
+            lookup, select = (query, '') if isinstance(query, str) else query
+            assert items == query_obj.find(lookup=lookup, select=select)
+
+    def test_find_many_stops_when_all_limits_are_reached(self, exploding_dict):
+        data = [{'name': 'a', 'id': 1}, exploding_dict(name='b')]
+        query_obj = DLQuery(data)
+        result = query_obj.find_many([('name', 'LIMIT 1'), ('id', 'LIMIT 1')])
+        assert result == [['a'], [1]]
+
+
+class TestPathLookupDLQuery:
+    @pytest.fixture
+    def device_data(self, exploding_dict):
+        obj = {
+            'devices': [
+                {'hostname': 'r1', 'interfaces': [{'name': 'e1'}, {'name': 'e2'}]},
+                {'hostname': 's1', 'meta': {'hostname': 'mgmt'}},
+            ],
+            'other': exploding_dict(hostname='x'),
+            'hostname': 'top',
+        }
+        yield obj
+
+    @pytest.mark.parametrize(
+        "lookup,select_statement,expected_result",
+        [
+            ('$.devices[*].hostname', '', ['r1', 's1']),
+            ('$.devices[-1].hostname', '', ['s1']),
+            ('$.devices[0].interfaces[*].name', '', ['e1', 'e2']),
+            ('$.devices.*.hostname=_wildcard(r*)', 'SELECT hostname', [{'hostname': 'r1'}]),
+            ('$.devices..hostname', '', ['r1', 's1', 'mgmt']),
+            ('$.devices[*].interfaces', '', [[{'name': 'e1'}, {'name': 'e2'}]]),
+            ('$.hostname', '', ['top']),
+            ('$.devices[5].hostname', '', []),
+        ]
+    )
+    def test_find_path(self, assert_same_result, device_data, lookup,
+                       select_statement, expected_result):
+        query_obj = DLQuery(device_data)
+        assert query_obj.find(lookup=lookup, select=select_statement) == expected_result
+
+        device_data['other'] = dict(device_data['other'])
+        result = assert_same_result(device_data, lookup=lookup, select=select_statement)
+        assert result == expected_result
+
+    @pytest.mark.parametrize(
+        "lookup,expected_result",
+        [
+            ('$ref', ['#/defs/a', '#/defs/b']),
+            ('$schema', ['s']),
+            ('$id=_wildcard(x*)', ['x1']),
+            ('$.defs.a.$ref', ['#/defs/b']),
+        ]
+    )
+    def test_find_dollar_keys(self, lookup, expected_result):
+        data = {
+            '$schema': 's', '$id': 'x1',
+            'items': {'$ref': '#/defs/a'},
+            'defs': {'a': {'$ref': '#/defs/b'}},
+        }
+        assert DLQuery(data).find(lookup=lookup) == expected_result
+
+    def test_find_many_with_path(self, device_data):
+        del device_data['other']
+        query_obj = DLQuery(device_data)
+        result = query_obj.find_many(['$.devices[*].hostname', 'hostname', 'name'])
+        assert result == [['r1', 's1'], ['r1', 's1', 'mgmt', 'top'], ['e1', 'e2']]
+
+
+class TestDepthOrderDLQuery:
+    @pytest.fixture
+    def tree_data(self):
+        obj = {
+            'name': 'root',
+            'a': {'b': {'name': 'deep'}, 'name': 'a1'},
+            'items': [{'name': 'i1'}, {'c': {'name': 'i2'}}],
+        }
+        yield obj
+
+    @pytest.mark.parametrize(
+        "lookup,max_depth,order,expected_result",
+        [
+            ('name', None, 'dfs', ['root', 'deep', 'a1', 'i1', 'i2']),
+            ('name', None, 'bfs', ['root', 'a1', 'deep', 'i1', 'i2']),
+            ('name', 1, 'dfs', ['root']),
+            ('name', 2, 'DFS', ['root', 'a1']),
+            ('name', 3, 'dfs', ['root', 'deep', 'a1', 'i1']),
+            ('name', 3, 'bfs', ['root', 'a1', 'deep', 'i1']),
+            ('name', 0, 'bfs', []),
+            ('$..name', 2, 'dfs', ['root', 'a1']),
+        ]
+    )
+    def test_find(self, tree_data, lookup, max_depth, order, expected_result):
+        query_obj = DLQuery(tree_data)
+        result = query_obj.find(lookup=lookup, max_depth=max_depth, order=order)
+        assert result == expected_result
+
+        query_obj.build_node_table()
+        result = query_obj.find(lookup=lookup, max_depth=max_depth, order=order)
+        assert result == expected_result
+
+    def test_bfs_with_limit(self, exploding_dict, tree_data):
+        tree_data['a']['b']['c'] = exploding_dict(name='x')
+        query_obj = DLQuery(tree_data)
+        result = query_obj.iterfind(lookup='name', select='LIMIT 3', order='bfs')
+        assert list(result) == ['root', 'a1', 'deep']
+
+    def test_max_depth_does_not_descend(self, exploding_dict, tree_data):
+        tree_data['a']['b']['c'] = exploding_dict(name='x')
+        query_obj = DLQuery(tree_data)
+        assert query_obj.find(lookup='name', max_depth=2) == ['root', 'a1']
+
+    def test_invalid_order(self, tree_data):
+        with pytest.raises(ArgumentError):
+            DLQuery(tree_data).find(lookup='name', order='random')
+
+
+class TestAsyncDLQuery:
+    @pytest.fixture
+    def records(self):
+        yield [{'name': 'r{}'.format(i), 'id': i} for i in range(25)]
+
+    def test_afind(self, run_async, records):
+        query_obj = DLQuery(records)
+        for kwargs in [dict(lookup='name'), dict(lookup='id', select='name where id gt 20'),
+                       dict(lookup='name', limit=3), dict(lookup='', select='')]:
+            result = run_async(query_obj.afind(batch_size=4, **kwargs))
+            assert result == query_obj.find(**kwargs)
+
+    def test_prepare_search_once(self, monkeypatch, run_async, records):
+        query_obj = DLQuery(records)
+        prepare_search = query_obj._prepare_search
+        calls = []
+
+        def tracked_prepare_search(*args):
+            calls.append(args)
+            return prepare_search(*args)
+
+        monkeypatch.setattr(query_obj, '_prepare_search', tracked_prepare_search)
+        result = run_async(query_obj.afind(select='name where id gt 20'))
+        assert result == [{'name': 'r{}'.format(i)} for i in range(21, 25)]
+        assert len(calls) == 1
+
+        async def collect():
+            return [item async for item in query_obj.aiterfind('name', limit=2)]
+
+        assert run_async(collect()) == ['r0', 'r1']
+        assert len(calls) == 2
+
+    def test_aiterfind_with_executor(self, run_async, records):
+        async def collect():
+            query_obj = DLQuery(records)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                return [item async for item in query_obj.aiterfind(
+                    'name', batch_size=10, executor=executor, order='bfs')]
+
+        assert run_async(collect()) == ['r{}'.format(i) for i in range(25)]
+
+    def test_cancel_closes_traversal(self, run_async, records):
+        query_obj = DLQuery(records)
+        iterfind = query_obj._iterfind_prepared
+        events = []
+
+        def tracked_iterfind(*args, **kwargs):
+            try:
+                yield from iterfind(*args, **kwargs)
+            finally:
+                events.append('closed')
+
+        query_obj._iterfind_prepared = tracked_iterfind
+
+        async def consume():
+            async for _ in query_obj.aiterfind('name', batch_size=2):
+                events.append('item')
+                await asyncio.sleep(0.01)
+
+        async def main():
+            task = asyncio.ensure_future(consume())
+            await asyncio.sleep(0.03)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        run_async(main())
+        assert events[-1] == 'closed'
+        assert 0 < events.count('item') < 25
+
+    def test_cancel_stops_traversal_without_matches(self, run_async):
+        visited = []
+
+        class SlowDict(dict):
+            def items(self):
+                visited.append(1)
+                time.sleep(0.001)
+                return super().items()
+
+        total = 2000
+        data = [SlowDict(name='r{}'.format(i)) for i in range(total)]
+        query_obj = DLQuery(data)
+
+        async def main():
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                task = asyncio.ensure_future(query_obj.afind(
+                    lookup='name', select='name where name eq missing',
+                    executor=executor
+                ))
+                await asyncio.sleep(0.05)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+                # the executor thread is freed by stop flag, not by a full scan
+                start = time.perf_counter()
+                await asyncio.get_event_loop().run_in_executor(executor, len, '')
+                return time.perf_counter() - start
+
+        elapsed = run_async(main())
+        assert elapsed < 0.5
+        assert len(visited) < total
+
+    def test_iterfind_with_stop(self, records):
+        stop = threading.Event()
+        query_obj = DLQuery(records)
+        generator = query_obj.iterfind(lookup='name', stop=stop)
+        assert next(generator) == 'r0'
+        stop.set()
+        assert list(generator) == []
+
+        query_obj.build_node_table()
+        assert list(query_obj.iterfind(lookup='name', stop=stop)) == []
+        assert list(query_obj.iterfind(lookup='$[*].name', stop=stop)) == []
@@ -2,9 +2,28 @@ from dlapp import create_from_yaml_file
 from dlapp import create_from_yaml_data
 from dlapp import create_from_json_file
 from dlapp import create_from_json_data
+from dlapp import create_from_jsonl_file
+from dlapp import create_from_jsonl_data
 from dlapp import create_from_csv_file
 from dlapp import create_from_csv_data
+from dlapp import acreate_from_yaml_file
+from dlapp import acreate_from_json_file
+from dlapp import acreate_from_csv_file
+from dlapp import register_backend
+from dlapp.exceptions import ParserBackendError
+from dlapp.factory import PARSER_BACKENDS
+from dlapp.factory import get_backend
+from dlapp.factory import get_backend_names
+from dlapp.factory import parse_json
+from collections import OrderedDict
 from os import path
+import os
+import io
+import json
+import asyncio
+import threading
+
+import pytest
 
 test_path = path.dirname(__file__)
 
@@ -35,6 +54,20 @@ class TestDynamicDict:
         query_obj = create_from_json_data(data)
         assert query_obj.get('a') == 'Apricot'
 
+    def test_creating_dlquery_from_jsonl_file(self):
+        """Test creating a dlapp instance from JSON Lines file."""
+        filename = path.join(test_path, 'data/sample.jsonl')
+        query_obj = create_from_jsonl_file(filename)
+        result = query_obj.find(lookup='a=_wildcard(Ap*)')
+        assert result == ['Apple', 'Apricot']
+        assert len(query_obj.data) == 3
+
+    def test_creating_dlquery_from_jsonl_data(self):
+        """Test creating a dlapp instance from JSON Lines data."""
+        data = '{"a": "Apricot"}\n[1, 2]\n"text"\n'
+        query_obj = create_from_jsonl_data(data)
+        assert query_obj.data == [{'a': 'Apricot'}, [1, 2], 'text']
+
     def test_creating_dlquery_from_csv_file(self):
         """Test creating a dlapp instance from CSV file."""
         filename = path.join(test_path, 'data/sample.csv')
@@ -60,3 +93,130 @@ class TestDynamicDict:
         query_obj = create_from_csv_data(data)
         result = query_obj.find(lookup='b=_iregex(.+n.+)')
         assert result == ['Banana', 'Boysenberry']
+
+    def test_creating_dlquery_from_file_asynchronously(self, run_async):
+        """Test creating a dlapp instance from file in an event loop."""
+        async def create():
+            return await asyncio.gather(
+                acreate_from_yaml_file(path.join(test_path, 'data/sample.yaml')),
+                acreate_from_json_file(path.join(test_path, 'data/sample.json')),
+                acreate_from_csv_file(path.join(test_path, 'data/sample.csv')),
+            )
+
+        yaml_obj, json_obj, csv_obj = run_async(create())
+        assert yaml_obj.get('a') == 'Apricot'
+        assert json_obj.get('a') == 'Apricot'
+        assert csv_obj.find(lookup='a=_iwildcard(Ap*)') == ['Apple', 'Apricot']
+
+    def test_creating_dlquery_from_csv_file_in_columnar_mode(self):
+        """Test creating a dlapp instance with a columnar CSV table."""
+        filename = path.join(test_path, 'data/sample.csv')
+        query_obj = create_from_csv_file(filename, columnar=True)
+        assert query_obj.data == create_from_csv_file(filename).data
+        result = query_obj.find(lookup='a=_iwildcard(Ap*)', select='b')
+        assert result == [{'b': 'Banana'}, {'b': 'Boysenberry'}]
+
+    @pytest.mark.parametrize(
+        "func,basename",
+        [
+            (create_from_yaml_file, 'sample.yaml'),
+            (create_from_json_file, 'sample.json'),
+            (create_from_csv_file, 'sample.csv'),
+        ]
+    )
+    def test_creating_dlquery_from_file_with_mmap(self, func, basename):
+        """Test creating a dlapp instance from a memory-mapped file."""
+        filename = path.join(test_path, 'data', basename)
+        assert func(filename, use_mmap=True).data == func(filename).data
+
+    def test_creating_dlquery_from_csv_file_with_mmap_and_bom(self, tmpdir):
+        """Test decoding a byte order mark and quoted newlines from a memory map."""
+        filename = str(tmpdir.join('bom.csv'))
+        with open(filename, 'w', newline='', encoding='utf-8-sig') as stream:
+            stream.write('a,b\r\n"x\r\ny",café\r\n')
+        query_obj = create_from_csv_file(filename, use_mmap=True)
+        assert query_obj.data == [{'a': 'x\r\ny', 'b': 'café'}]
+
+    @pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason='requires named pipes')
+    def test_creating_dlquery_from_pipe_with_mmap(self, tmpdir):
+        """Test falling back to a stream for a named pipe and a file object."""
+        filename = str(tmpdir.join('pipe.json'))
+        os.mkfifo(filename)
+
+        def write():
+            with open(filename, 'w') as stream:
+                stream.write('{"a": "Apricot"}')
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        query_obj = create_from_json_file(filename, use_mmap=True)
+        writer.join(timeout=10)
+        assert query_obj.get('a') == 'Apricot'
+
+        stream = io.StringIO('a,b\nApple,Banana\n')
+        query_obj = create_from_csv_file(stream, use_mmap=True)
+        assert query_obj.data == [{'a': 'Apple', 'b': 'Banana'}]
+        query_obj = create_from_yaml_file(io.StringIO('a: Apricot'), use_mmap=True)
+        assert query_obj.get('a') == 'Apricot'
+
+
+class TestParserBackend:
+    @pytest.mark.parametrize("backend", get_backend_names('json'))
+    def test_creating_dlquery_from_json_file_with_backend(self, backend):
+        filename = path.join(test_path, 'data/sample.json')
+        query_obj = create_from_json_file(filename, backend=backend)
+        with open(filename) as stream:
+            assert query_obj.data == json.load(stream)
+
+    @pytest.mark.parametrize("backend", get_backend_names('yaml'))
+    def test_creating_dlquery_from_yaml_file_with_backend(self, backend):
+        filename = path.join(test_path, 'data/sample.yaml')
+        query_obj = create_from_yaml_file(filename, backend=backend)
+        assert query_obj.get('a') == 'Apricot'
+        query_obj = create_from_yaml_data('a: [1, 2.5, null]', backend=backend)
+        assert query_obj.data == {'a': [1, 2.5, None]}
+
+    def test_auto_selection(self, monkeypatch):
+        monkeypatch.setitem(PARSER_BACKENDS, 'json', OrderedDict())
+        register_backend('json', 'json', json.loads)
+        register_backend('json', 'fast', lambda data: ['fast'], fastest=True)
+        register_backend('json', 'slow', lambda data: ['slow'])
+        assert get_backend_names('json') == ['fast', 'json', 'slow']
+        assert get_backend('json')[0] == 'fast'
+        assert get_backend('json', 'auto')[0] == 'fast'
+        assert create_from_json_data('[1]').data == ['fast']
+        assert create_from_json_data('[1]', backend='slow').data == ['slow']
+        # keyword arguments are only taken by json module
+        assert create_from_json_data('[1.5]', parse_float=str).data == ['1.5']
+        with pytest.raises(ParserBackendError):
+            create_from_json_data('[1.5]', backend='fast', parse_float=str)
+
+    @pytest.mark.parametrize(
+        "data,expected_result",
+        [
+            ('[NaN]', 'nan'),
+            ('[123456789012345678901234567890]', [123456789012345678901234567890]),
+            (b'[-9223372036854775809]', [-9223372036854775809]),
+            ('["\\ud800"]', ['\ud800']),
+        ]
+    )
+    def test_falling_back_to_json_module(self, data, expected_result):
+        result = parse_json(data)
+        if expected_result == 'nan':
+            assert result[0] != result[0]
+        else:
+            assert result == expected_result
+
+    def test_invalid_json_raises_json_error(self):
+        with pytest.raises(json.JSONDecodeError):
+            parse_json('[1,')
+
+    @pytest.mark.parametrize(
+        "filetype,backend",
+        [('json', 'not-installed'), ('yaml', 'not-installed'), ('toml', None)]
+    )
+    def test_unavailable_backend(self, filetype, backend):
+        with pytest.raises(ParserBackendError):
+            get_backend(filetype, backend)
+        with pytest.raises(ParserBackendError):
+            register_backend('toml', 'toml', None)
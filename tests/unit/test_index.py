@@ -0,0 +1,278 @@
+import copy
+import pickle
+
+import pytest
+
+from dlapp import DLQuery
+from dlapp.index import TrigramIndex
+from dlapp.index import TokenIndex
+from dlapp.index import KeySummary
+from dlapp.collection import LookupCls
+from dlapp.exceptions import TokenIndexError
+from dlapp.index import get_required_literals
+
+
+@pytest.fixture
+def log_data():
+    obj = [
+        {"host": "r1", "msg": "BGP neighbor 10.0.0.1 down"},
+        {"host": "r2", "msg": "BGP neighbor 10.0.0.2 up"},
+        {"host": "r3", "msg": "session timeout reached"},
+        {"host": "r4", "msg": "OSPF adjacency down", "tags": ["bgp-down"]},
+    ]
+    yield obj
+
+
+class TestRequiredLiterals:
+    @pytest.mark.parametrize(
+        "pattern,expected_result",
+        [
+            ('^.*timeout.*$', ['timeout']),
+            ('.*BGP.*down', ['BGP', 'down']),
+            ('^abc(def)+x?$', ['abc', 'def']),
+            ('(abc|xyz)', []),
+            ('a.b', []),
+            ('[', []),
+        ]
+    )
+    def test_get_required_literals(self, pattern, expected_result):
+        assert get_required_literals(pattern) == expected_result
+
+
+class TestTrigramIndex:
+    def test_get_candidates(self, log_data):
+        index = TrigramIndex(log_data)
+        candidates = index.get_candidates('.*BGP.*down')
+        values = sorted(index.values[i] for i in candidates)
+        assert values == ['BGP neighbor 10.0.0.1 down', 'bgp-down']
+        assert index.get_candidates('(?i).*') is None
+        assert index.get_candidates('.*zzzz.*') == set()
+
+    @pytest.mark.parametrize(
+        "lookup",
+        [
+            'v=_iregex(istanbul)',
+            'v=_iwildcard(*STANBUL)',
+            'v=_iregex(.*kelvin.*)',
+            'v=_iregex(ΐx.*)',
+            'v=_regex(İst.*)',
+        ]
+    )
+    def test_find_with_length_changing_case_fold(self, assert_same_result, lookup):
+        data = [
+            {'v': 'İstanbul'}, {'v': 'istanbul'}, {'v': 'ISTANBUL'},
+            {'v': 'at \u212aelvin scale'}, {'v': '\u1fd3xy'},
+        ]
+        assert assert_same_result(data, lookup=lookup, index_names=['trigram_index'])
+
+    def test_incremental_update(self, log_data):
+        index = TrigramIndex(log_data[:2])
+        total = len(index)
+        index.update(log_data)
+        assert len(index) > total
+        assert 'session timeout reached' in index
+        assert index.memory_usage() > 0
+
+    @pytest.mark.parametrize(
+        "lookup,select_statement",
+        [
+            ('=_wildcard(*timeout*)', ''),
+            ('msg=_regex(.*BGP.*down)', 'host'),
+            ('=_iwildcard(*bgp*)', ''),
+            ('msg=_iregex(.*(up|down))', 'host'),
+            ('host=r3', ''),
+        ]
+    )
+    def test_find_with_trigram_index(self, assert_same_result, log_data,
+                                     lookup, select_statement):
+        assert_same_result(log_data, lookup=lookup, select=select_statement,
+                           index_names=['trigram_index'])
+
+
+class TestTokenIndex:
+    @pytest.mark.parametrize(
+        "select_statement,expected_result",
+        [
+            ('host where msg has_word down', [{'host': 'r1'}, {'host': 'r4'}]),
+            ('host where msg has_all_words BGP down', [{'host': 'r1'}]),
+            ('host where msg has_word timeouts', []),
+        ]
+    )
+    def test_find_with_token_index(self, log_data, select_statement, expected_result):
+        query_obj = DLQuery(log_data)
+        assert query_obj.find(lookup='host', select=select_statement) == expected_result
+
+        query_obj.build_token_index()
+        assert query_obj.find(lookup='host', select=select_statement) == expected_result
+
+    @pytest.mark.parametrize(
+        "select_statement,expected_result",
+        [
+            ('n where msg has_word none', []),
+            ('n where msg has_word 42', [{'n': 3}]),
+            ('n where msg has_all_words ; ,', []),
+            ('n where msg has_word ...', []),
+            ('n where code has_word 42', []),
+            ('n where msg has_all_words code 42', [{'n': 3}]),
+        ]
+    )
+    @pytest.mark.parametrize("is_indexed", [False, True])
+    def test_non_string_and_empty_words(self, select_statement, expected_result,
+                                        is_indexed):
+        data = [
+            {'n': 1, 'msg': None, 'code': 42},
+            {'n': 2, 'msg': 42, 'code': '41'},
+            {'n': 3, 'msg': 'code 42 seen', 'code': None},
+        ]
+        query_obj = DLQuery(data)
+        is_indexed and query_obj.build_token_index()
+        assert query_obj.find(lookup='n', select=select_statement) == expected_result
+
+    def test_find_positions(self, log_data):
+        index = TokenIndex(log_data, keys=['msg'])
+        assert index.total == 4
+        assert index.find_positions('msg', 'neighbor 10') == {0, 1}
+        assert index.find_positions('host', 'r1') == set()
+
+    def test_save_and_load(self, log_data, tmp_path):
+        filename = str(tmp_path / 'index.json')
+        TokenIndex(log_data).save(filename)
+
+        query_obj = DLQuery(log_data)
+        query_obj.load_token_index(filename)
+        result = query_obj.find(lookup='host', select='host where msg has_word adjacency')
+        assert result == [{'host': 'r4'}]
+
+        with pytest.raises(TokenIndexError):
+            TokenIndex.load(filename, data=log_data[:2])
+
+    def test_custom_tokenizer(self, log_data, tmp_path):
+        index = TokenIndex(log_data, tokenizer=str.split)
+        assert index.find_positions('msg', ['BGP', 'up']) == {1}
+
+        filename = str(tmp_path / 'index.json')
+        index.save(filename)
+        with pytest.raises(TokenIndexError):
+            TokenIndex.load(filename)
+
+    def test_pickle_and_attach(self, log_data):
+        index = pickle.loads(pickle.dumps(TokenIndex(log_data)))
+        data = copy.deepcopy(log_data)
+        assert index.get_position(data[0]) is None
+        index.attach(data)
+        assert index.get_position(data[3]) == 3
+        assert index.find_positions('msg', 'BGP down') == {0}
+
+
+class TestKeySummary:
+    @pytest.fixture
+    def nested_data(self):
+        obj = {
+            'devices': [
+                {'hostname': 'r1', 'interfaces': [{'name': 'e1', 'mtu': 1500}]},
+                {'hostname': 's1', 'vlans': [{'id': 10}]},
+            ],
+            'logs': [{'seq': 1, 'detail': {'level': 'info'}}],
+        }
+        yield obj
+
+    def test_may_contain(self, nested_data):
+        summary = KeySummary(nested_data)
+        devices = nested_data['devices']
+        mtu_masks = [summary.get_key_mask('mtu')]
+        assert summary.may_contain(nested_data, mtu_masks)
+        assert summary.may_contain(devices[0], mtu_masks)
+        assert not summary.may_contain(devices[1], mtu_masks)
+        assert not summary.may_contain(nested_data['logs'], mtu_masks)
+        assert summary.get_masks(LookupCls('=r1')) is None
+        assert summary.get_masks(LookupCls('missing')) == []
+
+    @pytest.mark.parametrize(
+        "lookup,select_statement",
+        [
+            ('mtu', ''),
+            ('name', 'SELECT name, mtu'),
+            ('_wildcard(*e*)', ''),
+            ('=_wildcard(*1*)', ''),
+            ('level=info', '*'),
+            ('missing', ''),
+            ('id', 'id where id gt 5'),
+        ]
+    )
+    def test_find_with_key_summary(self, assert_same_result, nested_data,
+                                   lookup, select_statement):
+        expected_result = assert_same_result(nested_data, lookup=lookup,
+                                             select=select_statement,
+                                             index_names=['key_summary'])
+        query_obj = DLQuery(nested_data)
+        query_obj.build_key_summary()
+        assert query_obj.find_many([(lookup, select_statement)]) == [expected_result]
+
+    def test_skip_subtree(self, exploding_dict, nested_data):
+        nested_data['logs'].append(exploding_dict(seq=2))
+        query_obj = DLQuery(nested_data)
+        query_obj.build_key_summary()
+        assert query_obj.find(lookup='mtu') == [1500]
+        assert query_obj.find(lookup='hostname=s1', select='vlans') == [{'vlans': [{'id': 10}]}]
+
+    def test_leaf_root(self):
+        query_obj = DLQuery({'a': 1, 'b': 2})
+        query_obj.build_key_summary()
+        assert query_obj.find(lookup='b') == [2]
+
+    def test_attach_mask_list(self, nested_data):
+        summary = KeySummary(nested_data)
+        mask_list = summary.get_mask_list(nested_data)
+        data = copy.deepcopy(nested_data)
+
+        other = KeySummary()
+        other.keys = summary.keys
+        other.attach(data, mask_list)
+        assert len(other) == len(summary)
+        mtu_masks = [other.get_key_mask('mtu')]
+        assert other.may_contain(data['devices'][0], mtu_masks)
+        assert not other.may_contain(data['devices'][1], mtu_masks)
+
+        data['logs'].append([])
+        with pytest.raises(ValueError):
+            other.attach(data, mask_list)
+
+    def test_reassign_data_clears_indexes(self, nested_data):
+        query_obj = DLQuery(nested_data)
+        query_obj.build_key_summary()
+        query_obj.build_node_table()
+        query_obj.build_trigram_index()
+        query_obj.build_token_index()
+        assert query_obj.find(lookup='mtu') == [1500]
+
+        query_obj.data = [{'other': {'mtu': 9000}}]
+        assert query_obj.key_summary is None
+        assert query_obj.node_table is None
+        assert query_obj.trigram_index is None
+        assert query_obj.token_index is None
+        assert query_obj.find(lookup='mtu') == [9000]
+
+
+class TestIndexEquivalence:
+    @pytest.mark.parametrize(
+        "lookup,select_statement",
+        [
+            ('n', 'n where msg has_word none'),
+            ('n', 'n where msg has_word 42'),
+            ('n', 'n where code has_all_words 42'),
+            ('n', 'n where msg has_word ...'),
+            ('msg', ''),
+            ('msg=_wildcard(*42*)', ''),
+            ('=_iwildcard(*ISTANBUL*)', ''),
+            ('code=_iregex(.*stan.*)', 'n'),
+            ('=_regex(.*)', ''),
+            ('meta', '*'),
+            ('tags', ''),
+            ('flag', 'n where flag is true'),
+            ('n', 'n where code gt 4'),
+            ('$.*.msg', ''),
+        ]
+    )
+    def test_find_mixed_data(self, assert_same_result, mixed_data, lookup,
+                             select_statement):
+        assert_same_result(mixed_data, lookup=lookup, select=select_statement)
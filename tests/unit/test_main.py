@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from dlapp.main import Cli
+
+
+def run_cli(monkeypatch, capsys, *args):
+    monkeypatch.setattr('sys.argv', ['dlapp'] + list(args))
+    with pytest.raises(SystemExit) as ex:
+        Cli().run()
+    return ex.value.code, capsys.readouterr().out
+
+
+@pytest.fixture
+def yaml_files(tmp_path):
+    content = 'devices:\n- hostname: r1\n  mtu: 1500\n- hostname: r2\n  mtu: 9000\n'
+    filenames = []
+    for name, text in [('single.yaml', content), ('multi.yaml', content + '---\n' + content)]:
+        filename = str(tmp_path / name)
+        with open(filename, 'w') as stream:
+            stream.write(text)
+        filenames.append(filename)
+    yield filenames
+
+
+@pytest.fixture
+def jsonl_file(tmp_path):
+    filename = str(tmp_path / 'sample.jsonl')
+    with open(filename, 'w') as stream:
+        for name in ['r1', 'r2']:
+            stream.write(json.dumps({'a': name}) + '\n')
+    yield filename
+
+
+class TestCli:
+    @pytest.mark.parametrize(
+        "lookup,message",
+        [
+            ('$[0].a', '*** JSON Lines search does not support'),
+            ('$[1]', '*** Failed to parse this path lookup'),
+        ]
+    )
+    def test_invalid_lookup(self, monkeypatch, capsys, jsonl_file, lookup, message):
+        code, output = run_cli(monkeypatch, capsys, '-f', jsonl_file, '-l', lookup)
+        assert code == 1
+        assert output.startswith(message)
+
+    def test_invalid_jsonl_line(self, monkeypatch, capsys, jsonl_file):
+        with open(jsonl_file, 'a') as stream:
+            stream.write('{"a": \n')
+        code, output = run_cli(monkeypatch, capsys, '-f', jsonl_file, '-l', 'a')
+        assert code == 1
+        assert output.startswith('*** ')
+
+    def test_find(self, monkeypatch, capsys, jsonl_file):
+        code, output = run_cli(monkeypatch, capsys, '-f', jsonl_file, '-l', 'a')
+        assert code == 0
+        assert output.strip() == "['r1', 'r2']"
+
+    @pytest.mark.parametrize(
+        "lookup,select",
+        [
+            ('$.devices[*].hostname', ''),
+            ('hostname', 'hostname where mtu gt 1500'),
+            ('hostname', 'limit 3'),
+            ('devices', ''),
+        ]
+    )
+    def test_cache_keeps_yaml_result(self, monkeypatch, capsys, tmp_path,
+                                     yaml_files, lookup, select):
+        monkeypatch.setenv('DLAPP_CACHE_DIR', str(tmp_path / 'cache'))
+        for filename in yaml_files:
+            args = ['-f', filename, '-l', lookup, '-s', select]
+            expected = run_cli(monkeypatch, capsys, *args)
+            assert expected[0] == 0
+            for _ in range(2):
+                # a snapshot is saved first and then reloaded
+                assert run_cli(monkeypatch, capsys, '--cache', *args) == expected
+        assert len(list((tmp_path / 'cache').iterdir())) == len(yaml_files)
+
+    @pytest.mark.parametrize(
+        "lookup",
+        [
+            'a',
+            '$.a',
+            '$[0].a',
+        ]
+    )
+    def test_cache_keeps_jsonl_result(self, monkeypatch, capsys, tmp_path,
+                                      jsonl_file, lookup):
+        monkeypatch.setenv('DLAPP_CACHE_DIR', str(tmp_path / 'cache'))
+        expected = run_cli(monkeypatch, capsys, '-f', jsonl_file, '-l', lookup)
+        for _ in range(2):
+            assert run_cli(monkeypatch, capsys, '--cache', '-f', jsonl_file, '-l', lookup) == expected
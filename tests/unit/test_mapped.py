@@ -0,0 +1,74 @@
+import io
+import os
+
+import pytest
+
+from dlapp.mapped import MappedFile
+from dlapp.mapped import is_mappable
+
+
+@pytest.fixture
+def mapped_file(tmpdir):
+    filename = str(tmpdir.join('lines.txt'))
+    with open(filename, 'wb') as stream:
+        stream.write(b'\xef\xbb\xbfab\ncaf\xc3\xa9\n\nlast')
+    yield filename
+
+
+class TestMappedFile:
+    def test_view_and_read_text(self, mapped_file):
+        with MappedFile(mapped_file) as mapped:
+            assert len(mapped) == 17
+            with mapped.view(3, 5) as view:
+                assert bytes(view) == b'ab'
+            assert mapped.read_text() == 'ab\ncafé\n\nlast'
+            assert mapped.read_text(6, 11) == 'café'
+        assert mapped.mmap is None
+
+    @pytest.mark.parametrize(
+        "start,stop,expected_result",
+        [
+            (0, None, [b'\xef\xbb\xbfab\n', b'caf\xc3\xa9\n', b'\n', b'last']),
+            (6, 12, [b'caf\xc3\xa9\n']),
+            (6, 13, [b'caf\xc3\xa9\n', b'\n']),
+            (13, 1000, [b'last']),
+        ]
+    )
+    def test_iter_lines(self, mapped_file, start, stop, expected_result):
+        with MappedFile(mapped_file) as mapped:
+            assert list(mapped.iter_lines(start, stop)) == expected_result
+
+    def test_iter_text_lines(self, mapped_file):
+        with MappedFile(mapped_file) as mapped:
+            assert list(mapped.iter_text_lines()) == ['ab\n', 'café\n', '\n', 'last']
+            mapped.seek(6)
+            assert list(mapped) == [b'caf\xc3\xa9\n', b'\n', b'last']
+            mapped.seek(13)
+            assert mapped.read(2) == b'la' and mapped.read() == b'st'
+
+    @pytest.mark.parametrize(
+        "position,expected_result",
+        [(-1, 0), (0, 0), (1, 6), (6, 6), (7, 12), (12, 12), (13, 13), (14, 17), (17, 17)]
+    )
+    def test_find_line_start(self, mapped_file, position, expected_result):
+        with MappedFile(mapped_file) as mapped:
+            assert mapped.find_line_start(position) == expected_result
+
+    def test_empty_file(self, tmpdir):
+        filename = str(tmpdir.join('empty.txt'))
+        open(filename, 'w').close()
+        assert not is_mappable(filename)
+        with MappedFile(filename) as mapped:
+            assert mapped.read_text() == ''
+            assert list(mapped.iter_lines()) == []
+            assert mapped.find_line_start(5) == 0
+
+    def test_is_mappable(self, mapped_file, tmpdir):
+        assert is_mappable(mapped_file)
+        assert not is_mappable(str(tmpdir))
+        assert not is_mappable(str(tmpdir.join('missing.txt')))
+        assert not is_mappable(io.StringIO('text'))
+        if hasattr(os, 'mkfifo'):
+            filename = str(tmpdir.join('pipe'))
+            os.mkfifo(filename)
+            assert not is_mappable(filename)
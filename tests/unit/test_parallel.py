@@ -0,0 +1,78 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from dlapp import DLQuery
+from dlapp.parallel import get_chunks
+from dlapp.parallel import is_parallel
+from dlapp.parallel import parallel_find
+
+
+@pytest.fixture
+def records():
+    obj = [
+        {'name': 'r{}'.format(i), 'mtu': 1500 + i % 3,
+         'interfaces': [{'name': 'e{}'.format(i)}]}
+        for i in range(50)
+    ]
+    yield obj
+
+
+@pytest.mark.parametrize(
+    "total,workers,expected_result",
+    [
+        (10, 2, [(0, 2), (2, 4), (4, 5), (5, 6), (6, 7), (7, 8), (8, 9), (9, 10)]),
+        (3, 4, [(0, 1), (1, 2), (2, 3)]),
+        (0, 2, [(0, 0)]),
+    ]
+)
+def test_get_chunks(total, workers, expected_result):
+    assert get_chunks(total, workers) == expected_result
+
+
+def test_is_parallel(records):
+    assert not is_parallel(records, 'name', None)
+    assert not is_parallel(records, 'name', 4, threshold=100)
+    assert not is_parallel(dict(a=records), 'name', 4, threshold=1)
+    assert not is_parallel(records, '$[0].name', 4, threshold=1)
+    assert not is_parallel(records, 'name', 4, order='bfs', threshold=1)
+
+
+@pytest.mark.parametrize(
+    "lookup,select_statement,limit",
+    [
+        ('name', '', None),
+        ('name=_wildcard(e*)', '', None),
+        ('mtu', 'name where mtu gt 1500', None),
+        ('name', 'LIMIT 7', None),
+        ('name', '', 33),
+        ('name', '', 0),
+    ]
+)
+def test_parallel_find(records, lookup, select_statement, limit):
+    query_obj = DLQuery(records)
+    expected_result = query_obj.find(lookup=lookup, select=select_statement,
+                                     limit=limit)
+    result = parallel_find(records, lookup, select=select_statement,
+                           workers=2, limit=limit)
+    assert result == expected_result
+
+
+def test_parallel_find_with_key_summary(records):
+    query_obj = DLQuery(records)
+    expected_result = query_obj.find(lookup='name', max_depth=2)
+    query_obj.build_key_summary()
+    result = parallel_find(records, 'name', workers=2, max_depth=2,
+                           key_summary=query_obj.key_summary)
+    assert result == expected_result
+
+
+def test_concurrent_parallel_find(records):
+    other_records = [{'name': 'x{}'.format(i)} for i in range(40)]
+    datasets = [records, other_records] * 3
+    expected_results = [DLQuery(data).find(lookup='name') for data in datasets]
+
+    with ThreadPoolExecutor(max_workers=len(datasets)) as executor:
+        futures = [executor.submit(parallel_find, data, 'name', workers=2)
+                   for data in datasets]
+        results = [future.result() for future in futures]
+    assert results == expected_results
@@ -517,3 +517,36 @@ class TestSelectParser:
         obj.parse_statement()
         result = obj.predicate(data, on_exception=False)
         assert result is True
+
+
+class TestSelectParserLimit:
+    @pytest.mark.parametrize(
+        "statement,columns,limit",
+        [
+            ('SELECT a, b LIMIT 10', ['a', 'b'], 10),
+            ('SELECT a WHERE b gt 1 limit 3', ['a'], 3),
+            ('SELECT a WHERE b is not_empty LIMIT 3', ['a'], 3),
+            ('a WHERE b lt version(1.2 beta) limit 3', ['a'], 3),
+            ('LIMIT 5', [None], 5),
+            ('SELECT a', ['a'], None),
+        ]
+    )
+    def test_parse_limit(self, statement, columns, limit):
+        parser = SelectParser(statement)
+        parser.parse_statement()
+        assert parser.columns == columns
+        assert parser.limit == limit
+
+    @pytest.mark.parametrize(
+        "statement,data",
+        [
+            ('SELECT a WHERE msg contain speed limit 50', {'msg': 'a speed limit 50 sign'}),
+            ('SELECT a WHERE b eq 1 limit 3', {'b': '1 limit 3'}),
+            ('SELECT a WHERE b gt 1 and_ msg contain limit 9', {'b': 2, 'msg': 'no limit 9'}),
+        ]
+    )
+    def test_parse_limit_of_operand(self, statement, data):
+        parser = SelectParser(statement)
+        parser.parse_statement()
+        assert parser.limit is None
+        assert parser.predicate(data) is True
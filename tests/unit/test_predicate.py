@@ -227,3 +227,34 @@ class TestPredicateDate:
         """Test comparing a datetime vs other datetime."""
         chk = Predicate.compare_datetime(data, key=key, op=op, other=other)
         assert chk is True
+
+
+class TestPredicateWord:
+    """Test class for validating word operators."""
+    @pytest.mark.parametrize(
+        "data,key,other,expected_result",
+        [
+            (dict(msg='BGP session Down'), 'msg', 'down', True),
+            (dict(msg='BGP session Down'), 'msg', 'sess', False),
+            (dict(msg=None), 'msg', 'none', False),
+            (dict(msg=42), 'msg', '42', False),
+            (dict(msg='BGP session Down'), 'msg', '', False),
+        ]
+    )
+    def test_has_word(self, data, key, other, expected_result):
+        """Test a value has a word."""
+        chk = Predicate.has_word(data, key=key, other=other)
+        assert chk is expected_result
+
+    @pytest.mark.parametrize(
+        "data,key,other,expected_result",
+        [
+            (dict(msg='BGP session Down'), 'msg', 'bgp down', True),
+            (dict(msg='BGP session Down'), 'msg', 'bgp up', False),
+            (dict(msg='BGP session Down'), 'msg', '', False),
+        ]
+    )
+    def test_has_all_words(self, data, key, other, expected_result):
+        """Test a value has all words."""
+        chk = Predicate.has_all_words(data, key=key, other=other)
+        assert chk is expected_result
@@ -0,0 +1,116 @@
+import pytest
+
+from dlapp import DLQuery
+from dlapp import ShardedDLQuery
+from dlapp.exceptions import ArgumentError
+from dlapp.exceptions import ShardedDLQueryError
+from dlapp.shard import get_placements
+from dlapp.shard import get_shard
+
+
+@pytest.fixture
+def records():
+    obj = [
+        {'name': 'r{}'.format(i), 'mtu': 1500 + i % 3,
+         'interfaces': [{'name': 'e{}'.format(i)}]}
+        for i in range(10)
+    ]
+    yield obj
+
+
+@pytest.fixture
+def sharded_query(records):
+    query_obj = ShardedDLQuery(records, count=3)
+    yield query_obj
+    query_obj.close()
+
+
+@pytest.mark.parametrize(
+    "total,count,size,expected_result",
+    [
+        (10, 3, None, [(0, 4), (4, 7), (7, 10)]),
+        (2, 4, None, [(0, 1), (1, 2)]),
+        (10, None, 4, [(0, 4), (4, 8), (8, 10)]),
+        (0, 2, None, [(0, 0)]),
+        (0, None, 2, [(0, 0)]),
+    ]
+)
+def test_get_placements(total, count, size, expected_result):
+    assert get_placements(total, count=count, size=size) == expected_result
+
+
+class TestShardedDLQuery:
+    @pytest.mark.parametrize(
+        "lookup,select_statement,limit",
+        [
+            ('name', '', None),
+            ('name', 'name where mtu eq 1501', None),
+            ('name=_wildcard(e*)', '', None),
+            ('interfaces', 'name', None),
+            ('name', '', 5),
+            ('name', 'name limit 3', None),
+            ('$[*].interfaces[*].name', '', None),
+        ]
+    )
+    def test_find(self, records, sharded_query, lookup, select_statement, limit):
+        query_obj = DLQuery(records)
+        expected_result = query_obj.find(lookup=lookup, select=select_statement,
+                                         limit=limit)
+        result = sharded_query.find(lookup=lookup, select=select_statement,
+                                    limit=limit)
+        assert len(sharded_query) == 3
+        assert result == expected_result
+
+    def test_find_many(self, records, sharded_query):
+        queries = ['name', ('interfaces', 'name'), ('mtu', 'mtu where mtu eq 1500')]
+        expected_result = DLQuery(records).find_many(queries)
+        result = sharded_query.find_many(queries)
+        assert result == expected_result
+
+    def test_build_index(self, records, sharded_query):
+        sharded_query.build_index('key_summary')
+        sharded_query.build_index('node_table')
+        result = sharded_query.find(lookup='name=_wildcard(r1*)')
+        assert result == ['r1']
+
+        with pytest.raises(ArgumentError):
+            sharded_query.build_index('unknown')
+
+    def test_dict_shard(self):
+        data = dict(a={'name': 'x'}, b={'name': 'y'}, c=1)
+        with ShardedDLQuery(data, size=1) as query_obj:
+            assert query_obj.placements == [(0, 1), (1, 2), (2, 3)]
+            assert query_obj.find(lookup='name') == ['x', 'y']
+            assert query_obj.find(lookup='$.b.name') == ['y']
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            dict(a={'name': 'x'}, b={'name': 'y'}, c=1),
+            [{'name': 'x'}, {'name': 'y'}, 1],
+        ]
+    )
+    def test_find_whole_data(self, data):
+        with ShardedDLQuery(data, size=1) as query_obj:
+            # each worker holds its own shard only
+            shards = query_obj.broadcast('find')
+            assert shards == [get_shard(data, *placement)
+                              for placement in query_obj.placements]
+            assert query_obj.find() == data
+            assert query_obj.find(lookup='', select='select *') == data
+            assert query_obj.find_many([('', ''), 'name']) == [data, ['x', 'y']]
+
+    def test_errors(self, sharded_query):
+        with pytest.raises(ArgumentError):
+            sharded_query.find(lookup='$[0].name')
+
+        with pytest.raises(ValueError):
+            sharded_query.find(lookup='name', select='name where mtu gt')
+
+        # workers still serve queries after an error
+        assert sharded_query.find(lookup='name', limit=1) == ['r0']
+
+        sharded_query.close()
+        assert sharded_query.workers == []
+        with pytest.raises(ShardedDLQueryError):
+            sharded_query.find(lookup='name')
@@ -0,0 +1,118 @@
+import threading
+import multiprocessing
+
+import pytest
+
+from dlapp import DLQuery
+from dlapp import SharedDataset
+from dlapp.exceptions import SharedDatasetError
+from dlapp.shared import shared_memory
+
+
+@pytest.fixture
+def data():
+    obj = {
+        "devices": [
+            {"hostname": "r1", "interfaces": [{"name": "Gi1", "mtu": 1500}]},
+            {"hostname": "r2", "interfaces": [{"name": "Gi1", "mtu": 9000}, {}]},
+        ],
+        "name": "inventory",
+        "empty": [],
+        "values": [None, True, False, 2 ** 70, -1.5, 'café', (1, 'a')],
+        1: 'int key',
+    }
+    yield obj
+
+
+def find_in_worker(name, queue):
+    with SharedDataset.attach(name) as dataset:
+        queue.put(list(dataset.find('hostname', select='interfaces')))
+
+
+class TestSharedDataset:
+    def test_materialize(self, data):
+        dataset = SharedDataset(SharedDataset.serialize(data))
+        expected_result = dict(data, values=data['values'][:-1] + [[1, 'a']])
+        assert dataset.materialize() == expected_result
+        assert dataset.materialize(1) == data['devices']
+
+    @pytest.mark.parametrize(
+        "lookup,select_statement,kwargs",
+        [
+            ('name', '', {}),
+            ('name=Gi1', 'mtu', {}),
+            ('hostname', 'interfaces', {}),
+            ('mtu', 'name where mtu gt 1500', {}),
+            ('=_wildcard(r*)', '*', {}),
+            ('_wildcard(*name)', '', {}),
+            ('name', '', dict(order='bfs')),
+            ('name', '', dict(max_depth=1)),
+            ('name', 'limit 1', {}),
+            ('missing', '', {}),
+            ('$.devices[*].interfaces[*].name', '', {}),
+            ('$..mtu', '', {}),
+            ('$.devices[-1].hostname', '', {}),
+        ]
+    )
+    def test_find(self, data, lookup, select_statement, kwargs):
+        expected_result = DLQuery(data).find(lookup=lookup, select=select_statement,
+                                             **kwargs)
+        dataset = SharedDataset(SharedDataset.serialize(data))
+        result = dataset.find(lookup, select=select_statement, **kwargs)
+        assert result == expected_result
+
+    def test_iterfind_with_stop(self, data):
+        stop = threading.Event()
+        dataset = SharedDataset(SharedDataset.serialize(data))
+        stop.set()
+        assert list(dataset.iterfind('name', stop=stop)) == []
+
+    def test_save_and_open(self, data, tmpdir):
+        filename = str(tmpdir.join('inventory.dlds'))
+        DLQuery(data).save_dataset(filename)
+        with SharedDataset.open(filename) as dataset:
+            assert dataset.name == filename
+            assert dataset.find('hostname') == ['r1', 'r2']
+
+    @pytest.mark.skipif(shared_memory is None, reason='requires Python 3.8')
+    def test_create_and_attach(self, data):
+        dataset = DLQuery(data).create_shared_dataset()
+        try:
+            with SharedDataset.attach(dataset.name) as attached_dataset:
+                assert attached_dataset.nbytes == dataset.nbytes
+                assert attached_dataset.find('mtu') == [1500, 9000]
+        finally:
+            dataset.unlink()
+
+    @pytest.mark.skipif(
+        shared_memory is None or 'fork' not in multiprocessing.get_all_start_methods(),
+        reason='requires Python 3.8 and fork start method'
+    )
+    def test_attach_in_worker_process(self, data):
+        dataset = SharedDataset.create(data)
+        try:
+            context = multiprocessing.get_context('fork')
+            queue = context.Queue()
+            worker = context.Process(target=find_in_worker,
+                                     args=(dataset.name, queue))
+            worker.start()
+            result = queue.get(timeout=10)
+            worker.join(timeout=10)
+            expected_result = DLQuery(data).find(lookup='hostname',
+                                                 select='interfaces')
+            assert result == list(expected_result)
+            assert worker.exitcode == 0
+        finally:
+            dataset.unlink()
+
+    @pytest.mark.parametrize(
+        "buffer",
+        [
+            b'',
+            b'x' * 128,
+            bytes(SharedDataset.serialize([1, 2]))[:-16],
+        ]
+    )
+    def test_invalid_buffer(self, buffer):
+        with pytest.raises(SharedDatasetError):
+            SharedDataset(buffer)
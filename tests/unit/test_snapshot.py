@@ -0,0 +1,222 @@
+import os
+import json
+import time
+from os import path
+
+import pytest
+import yaml
+
+from dlapp import create_from_csv_file
+from dlapp import create_from_json_file
+from dlapp import create_from_jsonl_file
+from dlapp import create_from_yaml_file
+from dlapp.exceptions import SnapshotError
+from dlapp.snapshot import SUFFIX
+from dlapp.snapshot import SnapshotCache
+from dlapp.snapshot import get_default_cache_dir
+
+test_path = path.dirname(__file__)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    yield SnapshotCache(directory=str(tmp_path / 'cache'))
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    filename = str(tmp_path / 'sample.json')
+    with open(filename, 'w') as stream:
+        json.dump([{'hostname': 'r1', 'mtu': 1500}, {'hostname': 's1', 'mtu': 9000}], stream)
+    yield filename
+
+
+def list_snapshots(cache):
+    return sorted(name for name in os.listdir(cache.directory) if name.endswith(SUFFIX))
+
+
+def disable_parsers(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('file is parsed again')
+    monkeypatch.setattr('dlapp.factory.parse_json', fail)
+    monkeypatch.setattr('dlapp.factory.yaml.load', fail)
+    monkeypatch.setattr('dlapp.factory.read_csv_file', fail)
+    monkeypatch.setattr('dlapp.factory.iter_jsonl_records', fail)
+
+
+class TestSnapshotCache:
+    @pytest.mark.parametrize(
+        "func,name",
+        [
+            (create_from_json_file, 'sample.json'),
+            (create_from_yaml_file, 'sample.yaml'),
+            (create_from_csv_file, 'sample.csv'),
+            (create_from_jsonl_file, 'sample.jsonl'),
+        ]
+    )
+    def test_reload_snapshot(self, monkeypatch, cache, func, name):
+        filename = path.join(test_path, 'data', name)
+        query_obj = func(filename, cache=cache)
+        assert len(list_snapshots(cache)) == 1
+
+        disable_parsers(monkeypatch)
+        other = func(filename, cache=cache)
+        assert other.data == query_obj.data
+        assert other.snapshot.path == query_obj.snapshot.path
+
+    def test_modified_file(self, cache, json_file):
+        assert create_from_json_file(json_file, cache=cache).find(lookup='mtu') == [1500, 9000]
+        with open(json_file, 'w') as stream:
+            json.dump([{'hostname': 'r2', 'mtu': 1400}], stream)
+        assert create_from_json_file(json_file, cache=cache).find(lookup='mtu') == [1400]
+        assert len(list_snapshots(cache)) == 1
+
+    def test_touched_file(self, monkeypatch, cache, json_file):
+        create_from_json_file(json_file, cache=cache)
+        os.utime(json_file, ns=(0, 10 ** 9))
+
+        # a content hash still matches, so that file is not parsed again
+        disable_parsers(monkeypatch)
+        assert create_from_json_file(json_file, cache=cache).find(lookup='mtu') == [1500, 9000]
+
+    def test_verify_content(self, cache, json_file):
+        create_from_json_file(json_file, cache=cache)
+        info = os.stat(json_file)
+        with open(json_file, 'r+') as stream:
+            data = stream.read()
+            stream.seek(0)
+            stream.write(data.replace('1500', '1400'))
+        os.utime(json_file, ns=(info.st_atime_ns, info.st_mtime_ns))
+
+        assert create_from_json_file(json_file, cache=cache).find(lookup='mtu') == [1500, 9000]
+        cache.verify = True
+        assert create_from_json_file(json_file, cache=cache).find(lookup='mtu') == [1400, 9000]
+
+    def test_parser_options(self, cache):
+        filename = path.join(test_path, 'data', 'sample.csv')
+        rows = create_from_csv_file(filename, cache=cache)
+        table = create_from_csv_file(filename, columnar=True, cache=cache)
+        assert list(table.data) == rows.data
+        assert len(list_snapshots(cache)) == 2
+
+        filename = path.join(test_path, 'data', 'sample.yaml')
+        create_from_yaml_file(filename, loader=yaml.SafeLoader, cache=cache)
+        create_from_yaml_file(filename, loader=yaml.BaseLoader, cache=cache)
+        assert len(list_snapshots(cache)) == 4
+
+    def test_not_cached(self, cache, json_file):
+        with open(json_file) as stream:
+            query_obj = create_from_json_file(stream, cache=cache)
+        assert query_obj.snapshot is None
+
+        query_obj = create_from_json_file(json_file, cache=cache, parse_int=str)
+        assert query_obj.find(lookup='mtu') == ['1500', '9000']
+        assert query_obj.snapshot is None
+
+        query_obj = create_from_json_file(json_file)
+        assert query_obj.snapshot is None
+        with pytest.raises(SnapshotError):
+            query_obj.save_snapshot()
+        assert not path.exists(cache.directory)
+
+    def test_save_snapshot_with_indexes(self, monkeypatch, cache, json_file):
+        query_obj = create_from_json_file(json_file, cache=cache)
+        query_obj.build_trigram_index()
+        query_obj.build_token_index()
+        query_obj.build_node_table()
+        query_obj.build_key_summary()
+        assert query_obj.save_snapshot()
+
+        disable_parsers(monkeypatch)
+        other = create_from_json_file(json_file, cache=cache)
+        assert other.trigram_index.values == query_obj.trigram_index.values
+        assert other.token_index.get_position(other.data[1]) == 1
+        assert other.node_table.value[0] is other.data
+        assert other.key_summary.masks[id(other.data)] == query_obj.key_summary.masks[id(query_obj.data)]
+        for lookup, select in [('hostname=_wildcard(s*)', ''), ('hostname', 'where hostname has_word r1')]:
+            assert other.find(lookup=lookup, select=select) == query_obj.find(lookup=lookup, select=select)
+
+    def test_save_snapshot_of_modified_file(self, cache, json_file):
+        query_obj = create_from_json_file(json_file, cache=cache)
+        with open(json_file, 'a') as stream:
+            stream.write('\n')
+        assert not query_obj.save_snapshot()
+
+    def test_corrupted_snapshot(self, cache, json_file):
+        create_from_json_file(json_file, cache=cache)
+        snapshot_file = path.join(cache.directory, list_snapshots(cache)[0])
+        with open(snapshot_file, 'r+b') as stream:
+            stream.truncate(40)
+
+        query_obj = create_from_json_file(json_file, cache=cache)
+        assert query_obj.find(lookup='mtu') == [1500, 9000]
+        assert path.getsize(snapshot_file) > 40
+
+    def test_evict(self, tmp_path, cache):
+        filenames = []
+        for index in range(3):
+            filename = str(tmp_path / 'sample{}.json'.format(index))
+            with open(filename, 'w') as stream:
+                json.dump(list(range(100)), stream)
+            filenames.append(filename)
+            create_from_json_file(filename, cache=cache)
+        names = list_snapshots(cache)
+        assert len(names) == 3
+
+        size = path.getsize(path.join(cache.directory, names[0]))
+        now = time.time()
+        snapshot_files = []
+        for age, filename in zip([3, 2, 1], filenames):
+            snapshot_file = create_from_json_file(filename, cache=cache).snapshot.path
+            os.utime(snapshot_file, (now - age, now - age))
+            snapshot_files.append(snapshot_file)
+
+        # the least recently used snapshot is evicted first
+        cache.max_size = size * 2
+        cache.evict()
+        assert [path.exists(name) for name in snapshot_files] == [False, True, True]
+
+        cache.max_age = 0.5
+        cache.evict()
+        assert list_snapshots(cache) == []
+
+        create_from_json_file(filenames[0], cache=cache)
+        cache.clear()
+        assert list_snapshots(cache) == []
+
+    @pytest.mark.skipif(not hasattr(os, 'getuid'), reason='requires POSIX permissions')
+    def test_unsafe_directory(self, cache, json_file):
+        os.makedirs(cache.directory)
+        os.chmod(cache.directory, 0o777)
+        query_obj = create_from_json_file(json_file, cache=cache)
+        assert query_obj.snapshot is None
+        assert os.listdir(cache.directory) == []
+
+    def test_cache_argument(self, monkeypatch, tmp_path, json_file):
+        dirname = str(tmp_path / 'dlapp')
+        monkeypatch.setenv('DLAPP_CACHE_DIR', dirname)
+        assert get_default_cache_dir() == dirname
+        create_from_json_file(json_file, cache=True)
+        assert len(os.listdir(dirname)) == 1
+
+        other = str(tmp_path / 'other')
+        create_from_json_file(json_file, cache=other)
+        assert len(os.listdir(other)) == 1
+        assert os.stat(other).st_mode & 0o777 == 0o700
+
+        monkeypatch.delenv('DLAPP_CACHE_DIR')
+        monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+        assert get_default_cache_dir() == dirname
+
+    def test_columnar_snapshot(self, monkeypatch, cache):
+        data = 'a,b\r\n1,x\r\n2,x\r\n'
+        filename = cache.directory + '.csv'
+        with open(filename, 'w', newline='') as stream:
+            stream.write(data)
+        query_obj = create_from_csv_file(filename, columnar=True, numeric=True, cache=cache)
+
+        disable_parsers(monkeypatch)
+        other = create_from_csv_file(filename, columnar=True, numeric=True, cache=cache)
+        assert list(other.data) == list(query_obj.data) == [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'x'}]
+        assert other.find(lookup='a', select='where b eq x') == [1, 2]
+
@@ -0,0 +1,269 @@
+import io
+import json
+
+import pytest
+import yaml
+
+from dlapp import DLQuery
+from dlapp import stream_find_json
+from dlapp import stream_find_jsonl
+from dlapp import stream_find_yaml
+from dlapp import iter_from_yaml_file
+from dlapp import iter_from_yaml_data
+from dlapp.collection import LookupCls
+from dlapp.exceptions import ArgumentError
+from dlapp.exceptions import JSONStreamError
+from dlapp.parser import SelectParser
+from dlapp.stream import JSONTokenizer
+from dlapp.stream import StreamSearcher
+from dlapp.stream import build_from_events
+from dlapp.stream import get_line_chunks
+from dlapp.stream import iter_jsonl_records
+from dlapp.stream import iterfind_jsonl_records
+from dlapp.stream import iterfind_yaml_documents
+from dlapp.stream import parallel_find_jsonl
+from dlapp.stream import stream_iterfind_json
+from dlapp.stream import stream_iterfind_jsonl
+from dlapp.stream import stream_iterfind_yaml
+from dlapp.factory import get_backend_names
+
+
+@pytest.fixture
+def data():
+    obj = {
+        "devices": [
+            {"hostname": "r1", "interfaces": [{"name": "Gi1", "mtu": 1500}]},
+            {"hostname": "r2", "interfaces": [{"name": "Gi1", "mtu": 9000}, {}]},
+        ],
+        "name": "inventory",
+        "empty": [],
+        "values": [None, True, False, -1.5e3, "café \U0001f600", "\"quoted\""],
+    }
+    yield obj
+
+
+class TestJSONTokenizer:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 7, 65536])
+    @pytest.mark.parametrize("is_binary", [False, True])
+    def test_build(self, data, chunk_size, is_binary):
+        text = json.dumps(data, ensure_ascii=False)
+        stream = io.BytesIO(text.encode('utf-8')) if is_binary else io.StringIO(text)
+        tokenizer = JSONTokenizer(stream, chunk_size=chunk_size)
+        assert build_from_events(tokenizer) == data
+
+    def test_events(self):
+        tokenizer = JSONTokenizer(io.StringIO('{"a": [1, "x"]}'))
+        assert list(tokenizer) == [
+            ('start_map', None), ('key', 'a'), ('start_array', None),
+            ('scalar', 1), ('scalar', 'x'), ('end_array', None), ('end_map', None),
+        ]
+
+    @pytest.mark.parametrize(
+        "text",
+        ['', '{', '[1,]', '{"a" 1}', '{"a": 1,}', '[1 2]', '01', 'tru',
+         '{"a": 1}}', '"abc', '[1.]', '["\\x"]']
+    )
+    @pytest.mark.parametrize("chunk_size", [1, 65536])
+    def test_invalid_json(self, text, chunk_size):
+        with pytest.raises(JSONStreamError):
+            build_from_events(JSONTokenizer(io.StringIO(text), chunk_size=chunk_size))
+
+
+class TestStreamFindJson:
+    @pytest.mark.parametrize(
+        "lookup,select_statement,kwargs",
+        [
+            ('name', '', {}),
+            ('name=Gi1', 'mtu', {}),
+            ('hostname', 'interfaces', {}),
+            ('mtu', 'name where mtu gt 1500', {}),
+            ('=_wildcard(r*)', '*', {}),
+            ('_wildcard(*name)', '', {}),
+            ('interfaces', '', {}),
+            ('name', '', dict(max_depth=1)),
+            ('name', 'limit 1', {}),
+            ('name', '', dict(limit=2)),
+            ('missing', '', {}),
+            ('$.devices[*].interfaces[*].name', '', {}),
+            ('$..mtu', '', {}),
+            ('$.devices[1].hostname', '', {}),
+            ('', 'hostname', {}),
+        ]
+    )
+    @pytest.mark.parametrize("chunk_size", [3, 65536])
+    def test_find(self, data, lookup, select_statement, kwargs, chunk_size):
+        expected_result = DLQuery(data).find(lookup=lookup, select=select_statement,
+                                             **kwargs)
+        stream = io.StringIO(json.dumps(data))
+        result = stream_find_json(stream, lookup=lookup, select=select_statement,
+                                  chunk_size=chunk_size, **kwargs)
+        assert result == expected_result
+
+    def test_find_file(self, data, tmpdir):
+        filename = str(tmpdir.join('inventory.json'))
+        with open(filename, 'w') as stream:
+            json.dump(data, stream)
+        assert stream_find_json(filename, 'hostname') == ['r1', 'r2']
+        assert stream_find_json(filename) == data
+
+    def test_limit_stops_reading(self, data):
+        text = json.dumps(data)
+        stream = io.StringIO(text + ' garbage')
+        generator = stream_iterfind_json(stream, 'hostname', chunk_size=16)
+        assert next(generator) == 'r1'
+        assert stream.tell() < len(text)
+        generator.close()
+
+    def test_select_keeps_needed_keys_only(self):
+        text = json.dumps([{'name': 'a', 'blob': {'x': [1, 2]}, 'mtu': 1}])
+        select_obj = SelectParser('mtu where name eq a')
+        select_obj.parse_statement()
+        searcher = StreamSearcher(LookupCls('name'), select_obj)
+        events = JSONTokenizer(io.StringIO(text))
+        records = list(searcher.iterfind(events))
+        assert len(records) == 1
+        assert records[0].parent.data == {'name': 'a', 'mtu': 1}
+
+    def test_errors(self):
+        with pytest.raises(ArgumentError):
+            stream_find_json(io.StringIO('[]'), '$.a[-1].name')
+
+        with pytest.raises(JSONStreamError):
+            stream_find_json(io.StringIO('[{"name": 1}, '), 'name')
+
+
+@pytest.fixture
+def records():
+    obj = [
+        {'name': 'r{}'.format(i), 'mtu': 1500 + i % 3,
+         'interfaces': [{'name': 'e{}'.format(i)}]}
+        for i in range(50)
+    ]
+    yield obj
+
+
+@pytest.fixture
+def jsonl_file(records, tmpdir):
+    filename = str(tmpdir.join('records.jsonl'))
+    with open(filename, 'w') as stream:
+        for i, record in enumerate(records):
+            stream.write(json.dumps(record) + ('\n\n' if i % 7 == 0 else '\n'))
+    yield filename
+
+
+class TestStreamFindJsonl:
+    @pytest.mark.parametrize(
+        "lookup,select_statement,kwargs",
+        [
+            ('name', '', {}),
+            ('name=_wildcard(e*)', '', {}),
+            ('mtu', 'name where mtu gt 1500', {}),
+            ('name', 'LIMIT 7', {}),
+            ('name', '', dict(limit=33)),
+            ('name', '', dict(max_depth=2)),
+            ('$[*].interfaces[*].name', '', {}),
+            ('', '', {}),
+        ]
+    )
+    def test_find(self, records, jsonl_file, lookup, select_statement, kwargs):
+        expected_result = DLQuery(records).find(lookup=lookup, select=select_statement,
+                                                **kwargs)
+        result = stream_find_jsonl(jsonl_file, lookup=lookup,
+                                   select=select_statement, **kwargs)
+        assert result == expected_result
+
+        result = parallel_find_jsonl(jsonl_file, lookup=lookup,
+                                     select=select_statement, workers=2, **kwargs)
+        assert result == expected_result
+
+        result = iterfind_jsonl_records(records, lookup=lookup,
+                                        select=select_statement, **kwargs)
+        assert list(result) == expected_result
+
+    @pytest.mark.parametrize("count", [1, 2, 3, 8, 1000])
+    def test_get_line_chunks(self, records, jsonl_file, count):
+        chunks = get_line_chunks(jsonl_file, count)
+        assert chunks[0][0] == 0
+        with open(jsonl_file, 'rb') as stream:
+            result = [record for start, stop in chunks
+                      for record in iter_jsonl_records(stream, start=start, stop=stop)]
+        assert result == records
+
+    def test_limit_stops_reading(self, records):
+        text = ''.join(json.dumps(record) + '\n' for record in records)
+        stream = io.StringIO(text + 'garbage\n')
+        generator = stream_iterfind_jsonl(stream, 'name', select='limit 1')
+        assert list(generator) == ['r0']
+
+    def test_errors(self, records, jsonl_file):
+        with pytest.raises(ArgumentError):
+            stream_find_jsonl(jsonl_file, '$[0].name')
+
+        with pytest.raises(ArgumentError):
+            list(iterfind_jsonl_records(records, '$[0].name'))
+
+        with pytest.raises(JSONStreamError, match='line 2'):
+            stream_find_jsonl(io.StringIO('{"name": 1}\n{"name": \n'), 'name')
+
+
+@pytest.fixture
+def yaml_file(records, tmpdir):
+    filename = str(tmpdir.join('manifests.yaml'))
+    with open(filename, 'w') as stream:
+        stream.write('---\n')
+        for record in records:
+            stream.write(yaml.safe_dump(record) + '---\n')
+    yield filename
+
+
+class TestStreamFindYaml:
+    @pytest.mark.parametrize(
+        "lookup,select_statement,kwargs",
+        [
+            ('name', '', {}),
+            ('name=_wildcard(e*)', '', {}),
+            ('mtu', 'name where mtu gt 1500', {}),
+            ('name', 'LIMIT 7', {}),
+            ('name', '', dict(limit=33)),
+            ('name', '', dict(max_depth=0)),
+            ('$.interfaces[*].name', '', {}),
+        ]
+    )
+    @pytest.mark.parametrize("backend", get_backend_names('yaml'))
+    def test_find(self, yaml_file, lookup, select_statement, kwargs, backend):
+        with open(yaml_file) as stream:
+            documents = [doc for doc in yaml.safe_load_all(stream) if doc is not None]
+        expected_result = []
+        for document in documents:
+            expected_result.extend(DLQuery(document).find(lookup=lookup,
+                                                        select=select_statement,
+                                                        max_depth=kwargs.get('max_depth')))
+        limit = kwargs.get('limit') or (7 if 'LIMIT' in select_statement else None)
+        expected_result = expected_result[:limit]
+        result = stream_find_yaml(yaml_file, lookup=lookup, select=select_statement,
+                                  backend=backend, **kwargs)
+        assert result == expected_result
+
+        result = iterfind_yaml_documents(documents, lookup=lookup,
+                                         select=select_statement, **kwargs)
+        assert list(result) == expected_result
+
+    def test_documents(self, records, yaml_file):
+        assert stream_find_yaml(yaml_file) == records
+        assert [obj.data for obj in iter_from_yaml_file(yaml_file)] == records
+        with open(yaml_file) as stream:
+            assert [obj.data for obj in iter_from_yaml_file(stream)] == records
+        assert [obj.data for obj in iter_from_yaml_data('a: 1\n---\n- 2\n')] == [
+            {'a': 1}, [2]
+        ]
+
+    def test_lazy_parsing(self):
+        data = 'name: a\n---\nname: b\n---\nname: [\n'
+        query_objs = iter_from_yaml_data(data)
+        assert next(query_objs).get('name') == 'a'
+        assert next(query_objs).get('name') == 'b'
+        with pytest.raises(yaml.YAMLError):
+            next(query_objs)
+
+        result = stream_iterfind_yaml(io.StringIO(data), 'name')
+        assert list(zip(range(2), result)) == [(0, 'a'), (1, 'b')]
@@ -0,0 +1,91 @@
+import pytest
+
+from dlapp import DLQuery
+from dlapp.collection import Element
+from dlapp.table import NodeTable
+from dlapp.table import DICT
+from dlapp.table import LIST
+from dlapp.table import SCALAR
+
+
+@pytest.fixture
+def data():
+    obj = {
+        "devices": [
+            {"hostname": "r1", "interfaces": [{"name": "Gi1", "mtu": 1500}]},
+            {"hostname": "r2", "interfaces": [{"name": "Gi1", "mtu": 9000}, {}]},
+        ],
+        "name": "inventory",
+        "empty": [],
+    }
+    yield obj
+
+
+class TestNodeTable:
+    def test_build(self, data):
+        table = NodeTable(data)
+        assert len(table) == 17
+        assert table.parent[0] == -1
+        assert table.depth[0] == 0
+        assert table.kind[0] == DICT
+        assert table.key[1] == 'devices'
+        assert table.kind[1] == LIST
+        assert table.kind[table.key.index('hostname')] == SCALAR
+
+        pos = table.value.index(9000)
+        assert table.get_path(pos) == ['devices', 1, 'interfaces', 0, 'mtu']
+        assert table.depth[pos] == 5
+
+    @pytest.mark.parametrize(
+        "lookup,select_statement",
+        [
+            ('name', ''),
+            ('name=Gi1', 'mtu'),
+            ('hostname', 'interfaces'),
+            ('mtu', 'name where mtu gt 1500'),
+            ('=_wildcard(r*)', '*'),
+            ('interfaces', ''),
+        ]
+    )
+    def test_find(self, data, lookup, select_statement):
+        expected_result = Element(data).find(lookup, select=select_statement)
+        result = NodeTable(data).find(lookup, select=select_statement)
+        assert result == expected_result
+
+    def test_dlquery_uses_node_table(self, data):
+        query_obj = DLQuery(data)
+        expected_result = query_obj.find(lookup='name', select='mtu')
+        table = query_obj.build_node_table()
+        assert query_obj.node_table is table
+        assert query_obj.find(lookup='name', select='mtu') == expected_result
+
+    @pytest.mark.parametrize(
+        "lookup,limit,max_depth",
+        [
+            ('name', None, None),
+            ('name', 1, None),
+            ('name', 2, 5),
+            ('mtu', None, 4),
+            ('hostname', 1, 3),
+        ]
+    )
+    def test_find_bfs(self, data, lookup, limit, max_depth):
+        elm_obj = Element(data)
+        expected_result = elm_obj.find(lookup, limit=limit, max_depth=max_depth,
+                                       order='bfs')
+        table = NodeTable(data)
+        result = table.find(lookup, limit=limit, max_depth=max_depth, order='bfs')
+        assert result == expected_result
+
+    def test_bfs_limit_stops_early(self, data):
+        table = NodeTable(data)
+        visited = []
+
+        def iter_positions():
+            for pos in NodeTable(data).bfs_positions:
+                visited.append(pos)
+                yield pos
+
+        table._bfs_positions = iter_positions()
+        assert table.find('name', limit=1, order='bfs') == ['inventory']
+        assert len(visited) < len(table) // 2